@@ -2,7 +2,12 @@ import json
 import os
 import random
 import re
+import uuid
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
 from gws_core import SpaceSendMailToMailsDTO, SpaceService
 from gws_streamlit_main import StreamlitMainState
@@ -10,16 +15,70 @@ from gws_streamlit_main import StreamlitMainState
 # Initialize GWS - MUST be at the top
 StreamlitMainState.initialize()
 
+from gws_forms.dashboard.banner_optimizer import find_banner_path
+from gws_forms.form_conditions.form_conditions import (
+    compile_dependency_graph,
+    get_visible_questions,
+    is_empty_answer,
+    update_visible_questions,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.answers_migration import (
+    get_form_fingerprint,
+    load_draft_answers,
+    save_form_questions,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.form_answers import (
+    freeze_form,
+    get_answered_questions,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.form_registry import (
+    get_form_folder,
+    load_form_definition,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.funnel_statistics import compute_progress
+from gws_forms.dashboard._form_dashboard_code.session_management.rate_limiter import (
+    AdmissionControl,
+    RateLimiter,
+)
 from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    SAVED_SESSIONS_DIR,
+    SESSIONS_TOKEN_FILE,
+    SUBMITTED_SESSIONS_DIR,
+    list_submissions,
+    load_funnel,
     load_session,
+    load_submissions_table,
+    load_submission,
+    mark_draft_submitted,
+    prepare_form_folder,
     save_current_session,
+    save_draft,
+    search_submissions,
 )
 
 sources = StreamlitMainState.get_sources()
 params = StreamlitMainState.get_params()
 
-json_questions = sources[0]
-folder_path_session = sources[1].path
+# Number of submissions listed in the results tab
+SUBMISSIONS_LIST_LIMIT = 500
+# Number of submissions listed by a search of the answers
+SEARCH_RESULTS_LIMIT = 20
+# Number of bars of the charts of the numeric answers
+CHART_BINS = 20
+# In multi form mode, a form definition not used for this time (in seconds) is unloaded
+FORM_CACHE_TTL = 3600
+FORM_CACHE_MAX_ENTRIES = 100
+# Rate limits (bucket capacity, refilled tokens per second) of the autosaves and submissions of a token
+# and of the mails sent to an email
+AUTOSAVE_RATE_LIMIT = (30, 2)
+SUBMIT_RATE_LIMIT = (3, 1 / 60)
+MAIL_RATE_LIMIT = (3, 1 / 300)
+# Interval (in seconds) of the retries of an autosave refused by its rate limit
+AUTOSAVE_RETRY_INTERVAL = 5
+# Maximum number of respondents using the app at the same time, a respondent inactive for
+# ACTIVE_SESSION_TIMEOUT seconds leaves its place
+MAX_ACTIVE_SESSIONS = 200
+ACTIVE_SESSION_TIMEOUT = 600
 
 st.markdown(
     "<style>[data-testid='stMain'] {display: flex; flex-direction: column;} [data-testid='stMainBlockContainer'] {max-width: 60rem; margin: 0 auto;} [data-testid='stExpander'] {background-color: #eaeaea;} </style>",
@@ -43,60 +102,223 @@ def border_left_red(component: str):
     st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
 
-st.image(image=params["banner"])
+@st.cache_resource
+def load_banner(banner: str):
+    # read the banner once per process, it is then served from memory to every respondent
+    if os.path.isfile(banner):
+        with open(banner, "rb") as f:
+            return f.read()
+    return banner
+
+
+@st.cache_resource(ttl=FORM_CACHE_TTL, max_entries=FORM_CACHE_MAX_ENTRIES)
+def load_form(answers_path: str, form_id: str) -> dict:
+    # the form definition is loaded on first access and shared (read-only) by all the sessions of the process
+    definition = load_form_definition(answers_path, form_id)
+    definition["fingerprint"] = get_form_fingerprint(definition["questions"])
+    return freeze_form(definition)
+
+
+@st.cache_resource
+def get_rate_limiters() -> dict:
+    # shared by all the sessions of the process
+    return {
+        "autosave": RateLimiter(*AUTOSAVE_RATE_LIMIT),
+        "submit": RateLimiter(*SUBMIT_RATE_LIMIT),
+        "mail": RateLimiter(*MAIL_RATE_LIMIT),
+    }
+
+
+@st.cache_resource
+def get_admission_control() -> AdmissionControl:
+    return AdmissionControl(MAX_ACTIVE_SESSIONS, ACTIVE_SESSION_TIMEOUT)
+
+
+@st.cache_resource
+def load_single_form(form_folder: str, _questions_file, _dependency_graph) -> dict:
+    # the form definition is frozen once and shared (read-only) by all the sessions of the process
+    definition = dict(_questions_file.get_data())
+    # the apps generated before the conditions have no dependency graph
+    definition["dependency_graph"] = _dependency_graph or compile_dependency_graph(definition["questions"])
+    definition["fingerprint"] = get_form_fingerprint(definition["questions"])
+    return freeze_form(definition)
+
+
+def show_forms_list():
+    st.title(params["title"])
+    st.markdown(params["description"])
+    if not params["forms"]:
+        st.write("No form available.")
+    for form in params["forms"]:
+        if st.button(form["title"], key=f"open-form-{form['id']}"):
+            st.query_params["form"] = form["id"]
+            st.rerun()
+
 
-st.title(params["title"])
-st.markdown(params["description"])
+if params.get("multi_form"):
+    # One app hosts several forms, the form is selected with the 'form' query parameter
+    # sources : [answers folder, optimized banner]
+    answers_path = sources[0].path
+    banner_source = find_banner_path(sources) or params["banner"]
+    if banner_source:
+        st.image(image=load_banner(banner_source))
+
+    form_id = st.query_params.get("form")
+    if form_id not in [form["id"] for form in params["forms"]]:
+        show_forms_list()
+        st.stop()
+
+    # the session state (email, token, answers) belongs to one form
+    if st.session_state.get("form_id") != form_id:
+        st.session_state.clear()
+        st.session_state["form_id"] = form_id
+    if st.button("All forms", icon=":material/arrow_back:"):
+        del st.query_params["form"]
+        st.rerun()
+
+    json_questions = load_form(answers_path, form_id)
+    dependency_graph = json_questions["dependency_graph"]
+    folder_path_session = get_form_folder(answers_path, form_id)
+    form_title = json_questions["title"]
+    form_description = json_questions["description"]
+else:
+    # sources : [questions, answers folder, optimized banner]
+    folder_path_session = sources[1].path
+    json_questions = load_single_form(folder_path_session, sources[0], params.get("dependency_graph"))
+    dependency_graph = json_questions["dependency_graph"]
+    form_title = params["title"]
+    form_description = params["description"]
+    # the original banner is used for the apps generated before the banner optimization
+    st.image(image=load_banner(find_banner_path(sources) or params["banner"]))
+
+st.title(form_title)
+st.markdown(form_description)
 
 # Fonction pour regrouper les questions par section et sous-section
 
 
 def get_questions_by_section(questions):
+    # the position of each question is kept, it identifies the question in the dependency graph
     sections = {}
-    for question in questions:
+    for index, question in enumerate(questions):
         section = question["section"]
         if section not in sections:
             sections[section] = []
-        sections[section].append(question)
+        sections[section].append((index, question))
     return sections
 
 
-# Function to check if all required questions are answered
-def all_required_answered(answer_questions, conf_questions):
-    for question_data in conf_questions:
-        for answer_question in answer_questions:
-            if (
-                question_data["section"] == answer_question["section"]
-                and question_data["question"] == answer_question["question"]
-            ):
-                question_data["answer"] = answer_question["answer"]
-                break
-
-        if question_data["required"] and (
-            question_data["answer"] is None or question_data["answer"] == ""
-        ):
-            return False
-    return True
+def get_section_blocks(section_questions):
+    """Split the questions of a section in blocks rendered by one fragment each.
+
+    The questions linked by conditions are in the same block, so a changed answer only re-renders its block.
+    """
+    group_of_question = {
+        index: group_index
+        for group_index, group in enumerate(dependency_graph["groups"])
+        for index in group
+    }
+    blocks = []
+    block_of_group = {}
+    for index, question in section_questions:
+        group_index = group_of_question.get(index)
+        if group_index is None:
+            blocks.append([(index, question)])
+        elif group_index in block_of_group:
+            blocks[block_of_group[group_index]].append((index, question))
+        else:
+            block_of_group[group_index] = len(blocks)
+            blocks.append([(index, question)])
+    return blocks
+
+
+def update_missing_required(missing_required: set, answers, visible, indexes):
+    # the hidden questions are not required
+    for index in indexes:
+        if visible[index] and json_questions["questions"][index]["required"] and is_empty_answer(answers[index]):
+            missing_required.add(index)
+        else:
+            missing_required.discard(index)
+
+
+def init_answers_state(answers):
+    """Evaluate once per run of the app the visibility of the questions and the unanswered required questions.
+
+    The fragments then update them from the dependency graph for each changed answer.
+    """
+    visible = get_visible_questions(dependency_graph, answers)
+    missing_required = set()
+    update_missing_required(missing_required, answers, visible, range(len(answers)))
+    st.session_state["visible_questions"] = visible
+    st.session_state["missing_required"] = missing_required
+
+
+def get_progress(answers):
+    # number of answered, required and required answered visible questions of each section
+    return compute_progress(json_questions["questions"], dependency_graph, answers)
+
+
+@st.cache_resource
+def register_form_questions(session_directory: str, form_fingerprint: str, _form_questions) -> str:
+    # the questions of each version of the form are kept once per process next to the drafts, which store
+    # their fingerprint
+    return save_form_questions(session_directory, _form_questions)
+
+
+def load_draft():
+    # the draft of the session token, with its answers indexed by question position
+    draft = load_session(session_directory=SESSIONS_DIR, token=st.session_state["token"])
+    draft["answers"] = load_draft_answers(SESSIONS_DIR, draft, json_questions["questions"], FORM_FINGERPRINT)
+    return draft
+
+
+def show_funnel(session_directory: str, submitted_directory: str):
+    funnel = load_funnel(session_directory, submitted_directory)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Started", funnel["started"])
+    col2.metric("Submissions", funnel["submitted"])
+    col3.metric(
+        "Respondents who submitted",
+        f"{funnel['submitted_tokens'] / funnel['respondents']:.0%}" if funnel["respondents"] else "-",
+        help="Tokens that submitted the form among the tokens that started a draft or submitted the form",
+    )
+    # sections in the order of the form
+    sections = list(dict.fromkeys(question["section"] for question in json_questions["questions"]))
+    st.dataframe(
+        pd.DataFrame(
+            [
+                {
+                    "Section": section,
+                    "Started": funnel["sections"].get(section, {}).get("started", 0),
+                    "Completed": funnel["sections"].get(section, {}).get("completed", 0),
+                }
+                for section in sections
+            ]
+        ),
+        hide_index=True,
+    )
 
 
 def show_submitted_sessions(submitted_directory: str):
-    # List all JSON files in the submitted directory
-    files = [f.split(".json")[0] for f in os.listdir(submitted_directory) if f.endswith(".json")]
-    # If there are files, show a selectbox to choose one
-    if files:
-        selected_file = st.selectbox(
+    # List the most recent submissions of the ledger
+    submissions = list_submissions(submitted_directory, limit=SUBMISSIONS_LIST_LIMIT)
+    # If there are submissions, show a selectbox to choose one
+    if submissions:
+        options = {
+            submission["seq"]: f"#{submission['seq']} - session {submission['token']} - {submission['timestamp']}"
+            for submission in submissions
+        }
+        selected_seq = st.selectbox(
             label="Choose an existing session",
-            options=files,
+            options=list(options.keys()),
+            format_func=lambda seq: options[seq],
             index=None,
             placeholder="Select a session",
         )
 
-        # Load the selected file and display its contents
-        if selected_file:
-            selected_file = selected_file + ".json"
-            file_path = os.path.join(submitted_directory, selected_file)
-            with open(file_path, "r", encoding="utf-8") as f:
-                submitted_data = json.load(f)
+        # Load the selected submission and display its contents
+        if selected_seq:
+            submitted_data = load_submission(submitted_directory, selected_seq)
 
             # Download answers as JSON file
             st.download_button(
@@ -112,6 +334,96 @@ def show_submitted_sessions(submitted_directory: str):
         st.write("No submitted session found.")
 
 
+def show_submissions_search(submitted_directory: str):
+    query = st.text_input(label="Search the answers", placeholder="Words to search in the text answers")
+    if not query:
+        return
+    results = search_submissions(submitted_directory, query, limit=SEARCH_RESULTS_LIMIT)
+    if not results:
+        st.write("No submitted session matches the search.")
+    for result in results:
+        with st.container(border=True):
+            st.markdown(f"**#{result['seq']}** - session {result['token']} - {result['timestamp']}")
+            for question, snippet in result["highlights"]:
+                st.markdown(f"*{question}* : {snippet}")
+
+
+def filter_submissions(submissions: pa.Table, column_name: str) -> pa.Table:
+    column = submissions.column(column_name)
+    if pa.types.is_floating(column.type):
+        min_max = pc.min_max(column).as_py()
+        if min_max["min"] is None or min_max["min"] == min_max["max"]:
+            return submissions
+        selected_min, selected_max = st.slider(
+            label="Answers between",
+            min_value=min_max["min"],
+            max_value=min_max["max"],
+            value=(min_max["min"], min_max["max"]),
+        )
+        mask = pc.and_(pc.greater_equal(column, selected_min), pc.less_equal(column, selected_max))
+        return submissions.filter(mask)
+
+    values = pc.list_flatten(column) if pa.types.is_list(column.type) else column
+    selected_values = st.multiselect(
+        label="Answers equal to", options=pc.unique(values.drop_null()).to_pylist()
+    )
+    if not selected_values:
+        return submissions
+    if pa.types.is_list(column.type):
+        # keep the submissions having at least one of the selected values
+        matched_rows = pc.filter(
+            pc.list_parent_indices(column), pc.is_in(values, value_set=pa.array(selected_values))
+        )
+        mask = pc.is_in(pa.array(range(submissions.num_rows)), value_set=pc.unique(matched_rows))
+    else:
+        mask = pc.is_in(column, value_set=pa.array(selected_values))
+    return submissions.filter(pc.fill_null(mask, False))
+
+
+def show_submissions_charts(submitted_directory: str):
+    # The submissions are read from the memory mapped Arrow cache, nothing is parsed
+    submissions = load_submissions_table(submitted_directory, json_questions["questions"])
+    if submissions.num_rows == 0:
+        return
+    question_columns = submissions.column_names[3:]
+
+    filter_column = st.selectbox(
+        label="Filter the submissions on a question",
+        options=question_columns,
+        index=None,
+        placeholder="Select a question",
+    )
+    if filter_column:
+        submissions = filter_submissions(submissions, filter_column)
+    st.write(f"{submissions.num_rows} submission(s)")
+
+    chart_column = st.selectbox(label="Chart of the answers to a question", options=question_columns)
+    column = submissions.column(chart_column)
+    if pa.types.is_list(column.type):
+        column = pc.list_flatten(column)
+    column = column.drop_null()
+    if len(column) == 0:
+        st.write("No answer to this question.")
+    elif pa.types.is_floating(column.type):
+        counts, bin_edges = np.histogram(column.to_numpy(), bins=CHART_BINS)
+        st.bar_chart(pd.DataFrame({"answer": bin_edges[:-1], "count": counts}), x="answer", y="count")
+    else:
+        value_counts = pc.value_counts(column)
+        st.bar_chart(
+            pd.DataFrame(
+                {
+                    "answer": value_counts.field("values").to_pylist(),
+                    "count": value_counts.field("counts").to_pylist(),
+                }
+            ),
+            x="answer",
+            y="count",
+        )
+
+    # only the last rows are converted to be displayed
+    st.dataframe(submissions.slice(max(submissions.num_rows - SUBMISSIONS_LIST_LIMIT, 0)).to_pandas())
+
+
 def is_valid_email(email: str):
     if not email:
         return False
@@ -124,37 +436,40 @@ def generate_session_token(email: str) -> int:
     return random.randint(100000, 999999)
 
 
-def send_mail(email: str, token: int):
-    # Send an email with the session token
+def send_mail(email: str, token: int) -> bool:
+    # Send an email with the session token, return False if too many mails were sent to the email
+    if not get_rate_limiters()["mail"].allow(email):
+        return False
     print("Sending email to", email)
     mail_data = SpaceSendMailToMailsDTO(
         receiver_mails=[email],
         mail_template="generic",
         data={"content": f"Your form session token is : {token}."},
-        subject=f"Session token - Form {params['title']} - Constellab",
+        subject=f"Session token - Form {form_title} - Constellab",
     )
     SpaceService.get_instance().send_mail_to_mails(mail_data)
+    return True
 
 
 def store_session_token(email: str, token: int):
     # Store the session token in a file
-    with open(os.path.join(folder_path_session, "sessions-token.json"), "w", encoding="utf8") as f:
+    with open(os.path.join(folder_path_session, SESSIONS_TOKEN_FILE), "w", encoding="utf8") as f:
         json.dump({email: token}, f)
 
 
 def get_session_token(email: str) -> str:
     # Load the session token from the file
-    with open(os.path.join(folder_path_session, "sessions-token.json"), "r", encoding="utf8") as f:
+    with open(os.path.join(folder_path_session, SESSIONS_TOKEN_FILE), "r", encoding="utf8") as f:
         return json.load(f).get(email, None)
 
 
 def delete_session_token(email: str) -> None:
     # Delete the session token from the file
-    with open(os.path.join(folder_path_session, "sessions-token.json"), "r", encoding="utf8") as f:
+    with open(os.path.join(folder_path_session, SESSIONS_TOKEN_FILE), "r", encoding="utf8") as f:
         data = json.load(f)
         if email in data:
             del data[email]
-    with open(os.path.join(folder_path_session, "sessions-token.json"), "w", encoding="utf8") as f:
+    with open(os.path.join(folder_path_session, SESSIONS_TOKEN_FILE), "w", encoding="utf8") as f:
         json.dump(data, f)
 
 
@@ -165,12 +480,11 @@ def check_session_token(email: str, token: int) -> bool:
 
 def session_token_exists(email: str) -> bool:
     # Check if the session token exists
-    with open(os.path.join(folder_path_session, "sessions-token.json"), "r", encoding="utf8") as f:
+    with open(os.path.join(folder_path_session, SESSIONS_TOKEN_FILE), "r", encoding="utf8") as f:
         return email in json.load(f)
 
 
-@st.fragment
-def question_component(section, question_number, question_data):
+def question_component(section, question_number, question_data, index):
     with st.container(key=f"{section}-{question_number}"):
         border_left_red(f"{section}-{question_number}")
         question_key = question_data["question"]
@@ -178,15 +492,8 @@ def question_component(section, question_number, question_data):
         st.write(question_data["description"])
 
         # Populate answers from saved session if available
-        questions_json = st.session_state["saved_answers"].get("questions", [])
-        saved_answer = next(
-            (
-                question["answer"]
-                for question in questions_json
-                if question["section"] == section and question["question"] == question_key
-            ),
-            None,
-        )
+        answers = st.session_state["saved_answers"]["answers"]
+        saved_answer = answers[index]
 
         # Générer le champ correspondant au type de réponse attendu
         response = None
@@ -244,53 +551,115 @@ def question_component(section, question_number, question_data):
                     max_value=question_data.get("max_value", None),
                     placeholder="Select a range",
                 )
-        # Update the original JSON structure with the captured answer
-        question_data["answer"] = response
-        # check if question is in questions_json
-        question_exists = next(
-            (
-                question
-                for question in questions_json
-                if question["section"] == section and question["question"] == question_key
-            ),
-            None,
-        )
+        # Update the answers of the session, the form definition is shared and never modified
+        answers[index] = response
 
         # Si la question est obligatoire
-        if question_data.get("required", True) and (
-            response is None or response == "" or response == []
-        ):
+        if question_data.get("required", True) and is_empty_answer(response):
             st.write(":red[*Required]")
-            if question_exists:
-                # Update the saved answers with the current question
-                for question in questions_json:
-                    if question["section"] == section and question["question"] == question_key:
-                        question["answer"] = response
-        else:
-            if not question_exists:
-                # Add the current question to the saved answers
-                questions_json.append(question_data)
-            else:
-                # Update the saved answers with the current question
-                for question in questions_json:
-                    if question["section"] == section and question["question"] == question_key:
-                        question["answer"] = response
-
-        save_current_session(
-            questions=questions_json,
-            session_directory=SESSIONS_DIR,
-            token=st.session_state["token"],
-        )
+
+
+def autosave_answers(answers, base_draft):
+    """Save the answers of the session, return the saved draft and whether it changed, or None if the save
+    is refused by the rate limit.
+
+    The refused answers stay pending in the session, they are saved by the next change or by
+    save_pending_answers, from the draft they were edited from.
+    """
+    if st.session_state.get("answers_unsaved"):
+        base_draft = st.session_state["unsaved_base"]
+    if not get_rate_limiters()["autosave"].allow(f"{folder_path_session}-{st.session_state['token']}"):
+        if not st.session_state.get("answers_unsaved"):
+            st.toast("Too many changes, your answers will be saved in a few seconds.")
+            st.session_state["answers_unsaved"] = True
+            st.session_state["unsaved_base"] = base_draft
+        return None
+    st.session_state.pop("answers_unsaved", None)
+    st.session_state.pop("unsaved_base", None)
+    saved_draft, changed = save_draft(
+        answers=answers,
+        session_directory=SESSIONS_DIR,
+        token=st.session_state["token"],
+        base=base_draft,
+        get_progress=get_progress,
+        form_fingerprint=FORM_FINGERPRINT,
+    )
+    st.session_state["saved_answers"] = saved_draft
+    return saved_draft, changed
+
+
+@st.fragment(run_every=AUTOSAVE_RETRY_INTERVAL)
+def save_pending_answers():
+    # the answers refused by the rate limit are saved even if the respondent stops editing
+    if not st.session_state.get("answers_unsaved"):
+        return
+    answers = st.session_state["saved_answers"]["answers"]
+    saved = autosave_answers(answers, None)
+    if saved is not None and saved[1] and saved[0]["answers"] != answers:
+        # answers given in another tab were merged, show them
+        st.rerun()
+
+
+@st.fragment
+def question_block(section, first_question_number, block):
+    """Render a block of questions linked by conditions, a changed answer only re-renders its block"""
+    answers = st.session_state["saved_answers"]["answers"]
+    # the draft the answers are edited from, to merge them if the token saved its draft in another tab
+    base_draft = {"answers": list(answers), "version": st.session_state["saved_answers"]["version"]}
+    visible = st.session_state["visible_questions"]
+    missing_required = st.session_state["missing_required"]
+    required_answered_before = not missing_required
+
+    question_number = first_question_number
+    for index, question_data in block:
+        # the questions are rendered in order and a condition references an earlier question,
+        # so the visibility takes into account the answers given above in this run
+        if visible[index]:
+            question_component(section, question_number, question_data, index)
+            if answers[index] != base_draft["answers"][index]:
+                changed_visibility = update_visible_questions(dependency_graph, answers, visible, index)
+                update_missing_required(missing_required, answers, visible, [index] + changed_visibility)
+        question_number += 1
+
+    # the rate limit only counts the changes, rendering the block without change saves nothing
+    if answers == base_draft["answers"]:
+        return
+    saved = autosave_answers(answers, base_draft)
+    if saved is not None and saved[1] and saved[0]["answers"] != answers:
+        # answers given in another tab were merged, show them
+        st.rerun()
+
+    # rerun the whole app only if the change impacts something outside of this block :
+    # the submit button or a question depending on this block in another block
+    block_indexes = [index for index, _ in block]
+    changed_outside_dependents = any(
+        dependent not in block_indexes
+        for index in block_indexes
+        if base_draft["answers"][index] != answers[index]
+        for dependent in dependency_graph["dependents"][index]
+    )
+    if changed_outside_dependents or (not missing_required) != required_answered_before:
+        st.rerun()
 
 
 @st.fragment
 def submit():
+    if not get_rate_limiters()["submit"].allow(f"{folder_path_session}-{st.session_state['token']}"):
+        st.session_state["submit_rate_limited"] = True
+        return
+    answers = st.session_state["saved_answers"]["answers"]
+    # the answers of the questions hidden by their condition are not submitted
     save_current_session(
-        questions=st.session_state["saved_answers"]["questions"],
+        questions=get_answered_questions(
+            answers, json_questions["questions"], get_visible_questions(dependency_graph, answers)
+        ),
         session_directory=SESSIONS_SUBMITTED_DIR,
         token=st.session_state["token"],
         multi=True,
+        form_questions=json_questions["questions"],
     )
+    mark_draft_submitted(session_directory=SESSIONS_DIR, token=st.session_state["token"],
+                         submitted_directory=SESSIONS_SUBMITTED_DIR)
     st.session_state["submitted"] = True
 
 
@@ -345,7 +714,9 @@ def show_content():
             session_token = generate_session_token(st.session_state["email"])
             try:
                 session_token = generate_session_token(st.session_state["email"])
-                send_mail(st.session_state["email"], session_token)
+                if not send_mail(st.session_state["email"], session_token):
+                    st.error("Too many emails were sent to this address. Please try again in a few minutes.")
+                    st.stop()
                 st.session_state["first_email_run"] = True
                 st.write(
                     "A session token has been sent to your email. Please check your inbox and use it next time you come to this form."
@@ -388,8 +759,10 @@ def show_content():
                 )
 
             if resend_token_button:
-                send_mail(st.session_state["email"], get_session_token(st.session_state["email"]))
-                st.session_state["token_resended"] = True
+                if send_mail(st.session_state["email"], get_session_token(st.session_state["email"])):
+                    st.session_state["token_resended"] = True
+                else:
+                    st.error("Too many emails were sent to this address. Please try again in a few minutes.")
 
             if confirm_token_button is not None and confirm_token_button:
                 # check if token is numeric and valid
@@ -413,9 +786,8 @@ def show_content():
         st.markdown("---")
 
         if "saved_answers" not in st.session_state:
-            st.session_state["saved_answers"] = load_session(
-                session_directory=SESSIONS_DIR, token=st.session_state["token"]
-            )
+            st.session_state["saved_answers"] = load_draft()
+        init_answers_state(st.session_state["saved_answers"]["answers"])
 
         # Regrouper les questions par section
         sections = get_questions_by_section(json_questions["questions"])
@@ -425,20 +797,22 @@ def show_content():
         for section, questions in sections.items():
             st.header(section)
             with st.expander(section, expanded=True, icon=":material/edit_note:"):
-                # Loop through each question in the section
-                for question_data in questions:
-                    question_component(section, question_number, question_data)
-                    question_number += 1
+                # Loop through each block of linked questions in the section
+                for block in get_section_blocks(questions):
+                    question_block(section, question_number, block)
+                    question_number += len(block)
                 st.markdown("---")
-
-        st.session_state["saved_answers"] = load_session(
-            session_directory=SESSIONS_DIR, token=st.session_state["token"]
-        )
+        save_pending_answers()
+
+        # keep the answers whose autosave was rate limited, they are saved by save_pending_answers
+        if not st.session_state.get("answers_unsaved"):
+            rendered_answers = st.session_state["saved_answers"]["answers"]
+            st.session_state["saved_answers"] = load_draft()
+            if st.session_state["saved_answers"]["answers"] != rendered_answers:
+                # answers saved in another tab
+                init_answers_state(st.session_state["saved_answers"]["answers"])
         # Submit button will only be enabled if all required answers are filled
-        submit_disabled = not all_required_answered(
-            answer_questions=st.session_state["saved_answers"]["questions"],
-            conf_questions=json_questions["questions"],
-        )
+        submit_disabled = bool(st.session_state["missing_required"])
 
         # Bouton de soumission (disabled if not all required fields are filled)
         st.write(
@@ -457,26 +831,35 @@ def show_content():
             if "submitted" in st.session_state:
                 st.success("Form submitted successfully.")
                 del st.session_state["submitted"]
+            if "submit_rate_limited" in st.session_state:
+                st.error("Too many submissions, please try again in a minute.")
+                del st.session_state["submit_rate_limited"]
 
     if params["results_visible"]:
         with tab_visu:
+            st.write("## Completion")
+            show_funnel(session_directory=SESSIONS_DIR, submitted_directory=SESSIONS_SUBMITTED_DIR)
+            st.write("## Submitted answers")
+            show_submissions_charts(submitted_directory=SESSIONS_SUBMITTED_DIR)
+            st.write("## Search the answers")
+            show_submissions_search(submitted_directory=SESSIONS_SUBMITTED_DIR)
             st.write("## Viewing submitted sessions")
             show_submitted_sessions(submitted_directory=SESSIONS_SUBMITTED_DIR)
 
 
-# Create a directory for saving sessions if it doesn't exist
-SESSIONS_DIR = os.path.join(folder_path_session, "saved_sessions")
-if not os.path.exists(SESSIONS_DIR):
-    os.makedirs(SESSIONS_DIR)
-
-# Create a directory for saving submitted sessions if it doesn't exist
-SESSIONS_SUBMITTED_DIR = os.path.join(folder_path_session, "submitted_sessions")
-if not os.path.exists(SESSIONS_SUBMITTED_DIR):
-    os.makedirs(SESSIONS_SUBMITTED_DIR)
-
-# init sessions-token.json if it doesn't exist
-if not os.path.exists(os.path.join(folder_path_session, "sessions-token.json")):
-    with open(os.path.join(folder_path_session, "sessions-token.json"), "w", encoding="utf8") as f:
-        json.dump({}, f)
+# the folders and files of the form are created once per process
+prepare_form_folder(folder_path_session)
+SESSIONS_DIR = os.path.join(folder_path_session, SAVED_SESSIONS_DIR)
+SESSIONS_SUBMITTED_DIR = os.path.join(folder_path_session, SUBMITTED_SESSIONS_DIR)
+# the fingerprint is computed once when the form definition is loaded
+FORM_FINGERPRINT = register_form_questions(SESSIONS_DIR, json_questions["fingerprint"], json_questions["questions"])
+
+# admission control : above the maximum number of active respondents, the new ones wait for a place
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+if not get_admission_control().admit(st.session_state["session_id"]):
+    st.info("Many respondents are filling the form right now, please wait a moment and try again.")
+    st.button("Try again", key="admission_retry")
+    st.stop()
 
 show_content()
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock, write_json_atomic
+from gws_forms.dashboard._form_dashboard_code.session_management.form_answers import get_draft_answers
+from gws_forms.dashboard._form_dashboard_code.session_management.funnel_statistics import compute_progress
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    get_session_path,
+    load_session,
+)
+from gws_forms.form_conditions.form_conditions import compile_dependency_graph
+
+# How a question of the old form was matched to a question of the new form
+MATCH_ID = "id"
+MATCH_EXACT = "exact"
+MATCH_QUESTION = "question"
+MATCH_FUZZY = "fuzzy"
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+# Sub folder of the drafts folder holding the questions of each version of the form, by fingerprint
+FORM_DEFINITIONS_DIR = "forms"
+
+
+def get_form_fingerprint(questions: list) -> str:
+    # the frozen form definitions (mapping proxies) have the fingerprint of the original questions
+    return hashlib.sha1(json.dumps(questions, sort_keys=True, ensure_ascii=False, default=dict)
+                        .encode("utf-8")).hexdigest()
+
+
+def save_form_questions(session_directory: str, form_questions: list) -> str:
+    """Keep the questions of a version of the form next to the drafts and return its fingerprint.
+
+    The drafts store the fingerprint of the form they were saved with, so their answers can be moved to the
+    positions of the questions of a newer version of the form.
+    """
+    fingerprint = get_form_fingerprint(form_questions)
+    path = os.path.join(session_directory, FORM_DEFINITIONS_DIR, f"{fingerprint}.json")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json_atomic(path, json.dumps(form_questions, ensure_ascii=False, default=dict))
+    return fingerprint
+
+
+def load_draft_answers(session_directory: str, draft: dict, form_questions: list, fingerprint: str = None) -> list:
+    """Return the answers of a draft indexed by the positions of the questions of `form_questions`.
+
+    A draft saved with another version of the form has its answers moved to the matching questions. If the
+    questions of that version are unknown, the answers cannot be matched and none is returned. The drafts
+    saved before the fingerprints have the positions of the current form.
+    """
+    fingerprint = fingerprint or get_form_fingerprint(form_questions)
+    if draft.get("form") is None or draft["form"] == fingerprint:
+        return get_draft_answers(draft, form_questions)
+    path = os.path.join(session_directory, FORM_DEFINITIONS_DIR, f"{draft['form']}.json")
+    if not os.path.exists(path):
+        return [None] * len(form_questions)
+    with open(path, "r", encoding="utf-8") as f:
+        draft_questions = json.load(f)
+    mapping = compute_question_mapping(draft_questions, form_questions)
+    return remap_answers(get_draft_answers(draft, draft_questions), mapping, len(form_questions))
+
+
+def compute_question_mapping(old_questions: list, new_questions: list,
+                             similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+                             ) -> List[Optional[Tuple[int, str, float]]]:
+    """Match the questions of the old form to the questions of the new form.
+
+    Return for each old question (by position) None if it has no match, or (new position, match, similarity).
+    The questions are matched, in this order : by `id`, by section and question, by question if it is
+    unique in both forms (the question moved to another section), then by similarity of the question
+    texts (fixed typo, rephrasing) if it is at least `similarity_threshold`. A new question is matched once.
+    """
+    mapping: List[Optional[Tuple[int, str, float]]] = [None] * len(old_questions)
+    matched_new = set()
+
+    def match(key, match_type: str, unique: bool = False) -> None:
+        new_keys: Dict[object, List[int]] = {}
+        for new_index, question in enumerate(new_questions):
+            if new_index not in matched_new and key(question) is not None:
+                new_keys.setdefault(key(question), []).append(new_index)
+        old_keys: Dict[object, List[int]] = {}
+        for old_index, question in enumerate(old_questions):
+            if mapping[old_index] is None and key(question) is not None:
+                old_keys.setdefault(key(question), []).append(old_index)
+        for value, old_indexes in old_keys.items():
+            new_indexes = new_keys.get(value, [])
+            if unique and (len(old_indexes) > 1 or len(new_indexes) > 1):
+                continue
+            # duplicated questions are matched in order
+            for old_index, new_index in zip(old_indexes, new_indexes):
+                mapping[old_index] = (new_index, match_type, 1.0)
+                matched_new.add(new_index)
+
+    match(lambda question: question.get("id"), MATCH_ID)
+    match(lambda question: (question.get("section", ""), _normalize(question["question"])), MATCH_EXACT)
+    match(lambda question: _normalize(question["question"]), MATCH_QUESTION, unique=True)
+
+    # the remaining questions are matched by decreasing similarity
+    candidates = []
+    for old_index, old_question in enumerate(old_questions):
+        if mapping[old_index] is not None:
+            continue
+        for new_index, new_question in enumerate(new_questions):
+            if new_index in matched_new:
+                continue
+            similarity = SequenceMatcher(None, _normalize(old_question["question"]),
+                                         _normalize(new_question["question"])).ratio()
+            if similarity >= similarity_threshold:
+                # a question staying in its section wins a tie
+                same_section = old_question.get("section") == new_question.get("section")
+                candidates.append((similarity, same_section, old_index, new_index))
+    for similarity, _, old_index, new_index in sorted(candidates, reverse=True):
+        if mapping[old_index] is None and new_index not in matched_new:
+            mapping[old_index] = (new_index, MATCH_FUZZY, similarity)
+            matched_new.add(new_index)
+    return mapping
+
+
+def remap_answers(answers: list, mapping: List[Optional[tuple]], new_length: int) -> list:
+    """Move the answers of a draft (by old question position) to the positions of the new form"""
+    new_answers = [None] * new_length
+    for old_index, match in enumerate(mapping):
+        if match is not None and old_index < len(answers):
+            new_answers[match[0]] = answers[old_index]
+    return new_answers
+
+
+class SubmissionQuestionsRemapper:
+    """Rename the (section, question) of the answers of a submission after the form changed.
+
+    The answers of the questions without match are kept as they are, a submission keeps all its answers.
+    The remapper is picklable, the ledger segments are rewritten by worker processes.
+    """
+
+    renames: Dict[Tuple[str, str], Tuple[str, str]]
+
+    def __init__(self, old_questions: list, new_questions: list, mapping: List[Optional[tuple]]):
+        self.renames = {}
+        for old_index, match in enumerate(mapping):
+            if match is None:
+                continue
+            old_question, new_question = old_questions[old_index], new_questions[match[0]]
+            self.renames[(old_question.get("section", ""), old_question["question"])] = \
+                (new_question.get("section", ""), new_question["question"])
+
+    def __call__(self, questions: list) -> list:
+        remapped = []
+        for question in questions:
+            section, question_text = self.renames.get(
+                (question.get("section", ""), question["question"]),
+                (question.get("section", ""), question["question"]))
+            remapped.append({**question, "section": section, "question": question_text})
+        return remapped
+
+
+def migrate_drafts(session_directory: str, tokens: List[str], old_questions: list, new_questions: list,
+                   mapping: List[Optional[tuple]]) -> Tuple[int, List[dict]]:
+    """Move the answers of the drafts of `tokens` to the positions of the new form.
+
+    Each draft is rewritten under the lock of its token with the fingerprint of the new form, a draft that
+    already has it is skipped so an interrupted migration can be run again.
+    Return the number of migrated drafts and the progress of all the drafts, to rebuild the funnel.
+    """
+    fingerprint = save_form_questions(session_directory, new_questions)
+    dependency_graph = compile_dependency_graph(new_questions)
+    migrated_count = 0
+    progresses = []
+    for token in tokens:
+        path = get_session_path(session_directory, token)
+        if not os.path.exists(path):
+            continue
+        with file_lock(path[:-len(".json")] + ".lock"):
+            draft = load_session(session_directory, token)
+            # the draft was removed since it was listed
+            if not os.path.exists(path):
+                continue
+            if draft.get("form") != fingerprint:
+                answers = remap_answers(get_draft_answers(draft, old_questions), mapping, len(new_questions))
+                migrated_draft = {
+                    "answers": answers,
+                    "timestamp": draft.get("timestamp"),
+                    # the version changes so the sessions editing the draft merge their answers
+                    "version": draft["version"] + 1,
+                    "progress": compute_progress(new_questions, dependency_graph, answers),
+                    "form": fingerprint,
+                }
+                if draft.get("submitted"):
+                    migrated_draft["submitted"] = True
+                draft = migrated_draft
+                write_json_atomic(path, json.dumps(draft, ensure_ascii=False))
+                migrated_count += 1
+        # the drafts saved without progress are not counted in the funnel
+        progresses.append(draft.get("progress"))
+    return migrated_count, progresses
+
+
+def _normalize(text) -> str:
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
@@ -0,0 +1,30 @@
+import fcntl
+import os
+import threading
+from contextlib import contextmanager
+
+
+@contextmanager
+def file_lock(lock_path: str):
+    """Hold an exclusive advisory lock on `lock_path` for the duration of the block.
+
+    The lock is taken on a dedicated lock file so it works across the threads of the
+    streamlit process as well as across processes sharing the same Answers folder.
+    """
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def write_json_atomic(path: str, content: str) -> None:
+    """Write `content` to `path` through a temporary file so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
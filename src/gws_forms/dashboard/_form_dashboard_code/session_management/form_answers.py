@@ -0,0 +1,39 @@
+from types import MappingProxyType
+from typing import List
+
+
+def freeze_form(value):
+    """Return a read-only copy of a form definition : the dicts become mapping proxies and the lists tuples.
+
+    The form definition is shared by all the sessions of the process, it must never hold the answers of a session.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_form(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_form(item) for item in value)
+    return value
+
+
+def get_draft_answers(draft: dict, form_questions: list) -> list:
+    """Return the answers of a draft indexed by question position.
+
+    The drafts saved before the answers arrays hold the answered questions, their answers are matched to the
+    questions of the form by section and question.
+    """
+    if "answers" in draft:
+        answers = list(draft["answers"])
+    else:
+        saved_answers = {(question.get("section"), question["question"]): question.get("answer")
+                         for question in draft.get("questions", [])}
+        answers = [saved_answers.get((question["section"], question["question"])) for question in form_questions]
+    # the form may have been given more questions since the draft was saved
+    return (answers + [None] * len(form_questions))[:len(form_questions)]
+
+
+def get_answered_questions(answers: list, form_questions: list, visible: List[bool] = None) -> List[dict]:
+    """Return the (section, question, answer) of the visible questions, as stored in the submissions"""
+    return [
+        {"section": question["section"], "question": question["question"], "answer": answers[index]}
+        for index, question in enumerate(form_questions)
+        if visible is None or visible[index]
+    ]
@@ -0,0 +1,46 @@
+import json
+import os
+import re
+from typing import List
+
+# Sub folder of the Answers folder containing one folder per hosted form
+FORMS_DIR = "forms"
+FORM_DEFINITION_FILE = "form.json"
+
+
+def create_form_id(name: str, existing_ids: List[str]) -> str:
+    """Create an url-friendly form id from `name`, unique among `existing_ids`"""
+    base_id = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "form"
+    form_id = base_id
+    index = 2
+    while form_id in existing_ids:
+        form_id = f"{base_id}-{index}"
+        index += 1
+    return form_id
+
+
+def get_form_folder(answers_path: str, form_id: str) -> str:
+    """Return the folder of a hosted form, it contains the form definition and the answers of the form"""
+    return os.path.join(answers_path, FORMS_DIR, form_id)
+
+
+def write_form_definition(answers_path: str, form_id: str, definition: dict) -> None:
+    form_folder = get_form_folder(answers_path, form_id)
+    os.makedirs(form_folder, exist_ok=True)
+    with open(os.path.join(form_folder, FORM_DEFINITION_FILE), "w", encoding="utf-8") as f:
+        json.dump(definition, f, ensure_ascii=False)
+
+
+def load_form_definition(answers_path: str, form_id: str) -> dict:
+    with open(os.path.join(get_form_folder(answers_path, form_id), FORM_DEFINITION_FILE), "r",
+              encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_form_folders(answers_path: str) -> List[str]:
+    """Return the folders holding the answers of a form : the Answers folder itself for a single form app,
+    and the folder of each hosted form for a multi form app."""
+    forms_path = os.path.join(answers_path, FORMS_DIR)
+    if not os.path.isdir(forms_path):
+        return [answers_path]
+    return sorted(entry.path for entry in os.scandir(forms_path) if entry.is_dir())
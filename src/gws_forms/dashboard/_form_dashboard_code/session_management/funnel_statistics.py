@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+from typing import Dict, Iterable
+
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock, write_json_atomic
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+from gws_forms.form_conditions.form_conditions import get_visible_questions, is_empty_answer
+
+
+def compute_progress(form_questions: list, dependency_graph: dict, answers: list) -> Dict[str, dict]:
+    """Return the number of answered, required and required answered visible questions of each section"""
+    visible = get_visible_questions(dependency_graph, answers)
+    progress = {}
+    for index, question_data in enumerate(form_questions):
+        section_progress = progress.setdefault(
+            question_data["section"], {"answered": 0, "required": 0, "required_answered": 0}
+        )
+        if not visible[index]:
+            continue
+        answered = not is_empty_answer(answers[index])
+        section_progress["answered"] += int(answered)
+        if question_data.get("required"):
+            section_progress["required"] += 1
+            section_progress["required_answered"] += int(answered)
+    return progress
+
+
+def is_section_started(section_progress: dict) -> bool:
+    return section_progress["answered"] > 0
+
+
+def is_draft_started(progress: Dict[str, dict]) -> bool:
+    return progress is not None and any(is_section_started(section) for section in progress.values())
+
+
+def is_section_completed(section_progress: dict) -> bool:
+    # a section without required question is completed once a question is answered
+    if section_progress["required"] == 0:
+        return is_section_started(section_progress)
+    return section_progress["required_answered"] >= section_progress["required"]
+
+
+class FunnelStatistics:
+    """Completion funnel of the drafts of a form, stored in `funnel.json`.
+
+    Each draft keeps its progress, for each section : {"answered", "required", "required_answered"}.
+    When a draft is saved, the difference between its previous and its new progress is applied to the
+    funnel : the number of drafts started, and for each section the number of drafts that started and
+    that completed (all the required questions answered) the section. The number of started drafts whose
+    token submitted the form is also kept, to count each respondent once with the submissions. Reading
+    the funnel never lists the drafts.
+
+    The number of distinct tokens that submitted the form is counted from the ledger, from the last counted
+    submission (`submitted_tokens_seq`) : each token is marked once with an empty file in `submitted_tokens`.
+    """
+
+    FUNNEL_FILE = "funnel.json"
+    LOCK_FILE = "funnel.lock"
+    TOKENS_DIR = "submitted_tokens"
+
+    directory: str
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def update(self, previous_progress: Dict[str, dict], progress: Dict[str, dict],
+               submitted_drafts: int = 0) -> None:
+        """Apply the change of the progress of a draft, `previous_progress` is None for a new draft.
+
+        `submitted_drafts` is the change of the number of started drafts whose token submitted the form.
+        """
+        previous_progress = previous_progress or {}
+        deltas = {}
+        for section in set(previous_progress) | set(progress):
+            previous = previous_progress.get(section)
+            current = progress.get(section)
+            started = int(current is not None and is_section_started(current)) \
+                - int(previous is not None and is_section_started(previous))
+            completed = int(current is not None and is_section_completed(current)) \
+                - int(previous is not None and is_section_completed(previous))
+            if started or completed:
+                deltas[section] = (started, completed)
+        started = int(is_draft_started(progress)) - int(is_draft_started(previous_progress))
+        if not deltas and not started and not submitted_drafts:
+            return
+
+        with file_lock(os.path.join(self.directory, self.LOCK_FILE)):
+            funnel = self.read()
+            funnel["started"] += started
+            funnel["submitted_drafts"] += submitted_drafts
+            for section, (section_started, section_completed) in deltas.items():
+                section_funnel = funnel["sections"].setdefault(section, {"started": 0, "completed": 0})
+                section_funnel["started"] += section_started
+                section_funnel["completed"] += section_completed
+            write_json_atomic(self._funnel_path, json.dumps(funnel, ensure_ascii=False))
+
+    def rebuild(self, progresses: Iterable[Dict[str, dict]]) -> None:
+        """Replace the funnel by the funnel of the drafts with the given progresses (after a form migration),
+        the drafts without progress (None) are not counted.
+
+        The drafts whose token submitted the form do not change, their number is kept, as the submitted tokens.
+        """
+        funnel = {"started": 0, "submitted_drafts": 0, "sections": {}}
+        for progress in progresses:
+            if progress is None:
+                continue
+            funnel["started"] += int(is_draft_started(progress))
+            for section, section_progress in progress.items():
+                section_funnel = funnel["sections"].setdefault(section, {"started": 0, "completed": 0})
+                section_funnel["started"] += int(is_section_started(section_progress))
+                section_funnel["completed"] += int(is_section_completed(section_progress))
+        with file_lock(os.path.join(self.directory, self.LOCK_FILE)):
+            previous_funnel = self.read()
+            for key in ["submitted_drafts", "submitted_tokens", "submitted_tokens_seq"]:
+                funnel[key] = previous_funnel[key]
+            write_json_atomic(self._funnel_path, json.dumps(funnel, ensure_ascii=False))
+
+    def sync_submitted_tokens(self, submitted_directory: str) -> int:
+        """Count the tokens of the submissions appended to the ledger since the last sync, return the number of
+        tokens that submitted for the first time. Nothing is read when the ledger has no new submission."""
+        ledger = SubmissionLedger(submitted_directory)
+        if self.read()["submitted_tokens_seq"] >= ledger.count():
+            return 0
+        with file_lock(os.path.join(self.directory, self.LOCK_FILE)):
+            funnel = self.read()
+            new_tokens = 0
+            for record in ledger.iter_records(from_seq=funnel["submitted_tokens_seq"] + 1):
+                new_tokens += int(self._mark_token_submitted(record["token"]))
+                funnel["submitted_tokens_seq"] = record["seq"]
+            funnel["submitted_tokens"] += new_tokens
+            write_json_atomic(self._funnel_path, json.dumps(funnel, ensure_ascii=False))
+        return new_tokens
+
+    def read(self) -> dict:
+        """Return {"started", "submitted_drafts", "submitted_tokens", "submitted_tokens_seq",
+        "sections": {section: {"started", "completed"}}}"""
+        funnel = {"started": 0, "sections": {}}
+        if os.path.exists(self._funnel_path):
+            with open(self._funnel_path, "r", encoding="utf-8") as f:
+                funnel = json.load(f)
+        # funnels written before the submitted drafts and tokens were counted
+        for key in ["submitted_drafts", "submitted_tokens", "submitted_tokens_seq"]:
+            funnel.setdefault(key, 0)
+        return funnel
+
+    def _mark_token_submitted(self, token: str) -> bool:
+        # the tokens are hashed, the imported tokens can contain any character
+        token_hash = hashlib.sha1(str(token).encode("utf-8")).hexdigest()
+        marker_path = os.path.join(self.directory, self.TOKENS_DIR, token_hash[:2], token_hash)
+        os.makedirs(os.path.dirname(marker_path), exist_ok=True)
+        try:
+            os.close(os.open(marker_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+        except FileExistsError:
+            return False
+        return True
+
+    @property
+    def _funnel_path(self) -> str:
+        return os.path.join(self.directory, self.FUNNEL_FILE)
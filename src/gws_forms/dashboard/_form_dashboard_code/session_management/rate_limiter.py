@@ -0,0 +1,91 @@
+import threading
+import time
+from typing import Dict, Tuple
+
+
+class RateLimiter:
+    """Token bucket rate limiter shared by the sessions of the process, with one bucket per key.
+
+    A bucket holds at most `capacity` tokens and is refilled with `refill_per_second` tokens per second,
+    an action is allowed if a token can be taken from the bucket of its key. The buckets that are full again
+    are dropped, a key that is not rate limited costs no memory.
+    """
+
+    # Number of calls between two removals of the full buckets
+    PRUNE_INTERVAL = 1000
+
+    capacity: float
+    refill_per_second: float
+
+    _buckets: Dict[str, Tuple[float, float]]
+    _lock: threading.Lock
+    _calls: int
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def allow(self, key: str) -> bool:
+        """Take a token from the bucket of `key`, return False if the bucket is empty"""
+        now = time.monotonic()
+        with self._lock:
+            self._calls += 1
+            if self._calls % self.PRUNE_INTERVAL == 0:
+                self._prune(now)
+            tokens = self._get_tokens(key, now)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            return True
+
+    def _get_tokens(self, key: str, now: float) -> float:
+        if key not in self._buckets:
+            return self.capacity
+        tokens, updated_at = self._buckets[key]
+        return min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+    def _prune(self, now: float) -> None:
+        for key in [key for key in self._buckets if self._get_tokens(key, now) >= self.capacity]:
+            del self._buckets[key]
+
+
+class AdmissionControl:
+    """Limit the number of sessions active at the same time in the process.
+
+    A session is active while it was seen in the last `idle_timeout` seconds. A new session is admitted
+    if there are less than `max_active` active sessions, an admitted session stays admitted while active.
+    """
+
+    max_active: int
+    idle_timeout: float
+
+    _last_seen: Dict[str, float]
+    _lock: threading.Lock
+
+    def __init__(self, max_active: int, idle_timeout: float):
+        self.max_active = max_active
+        self.idle_timeout = idle_timeout
+        self._last_seen = {}
+        self._lock = threading.Lock()
+
+    def admit(self, session_id: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if session_id not in self._last_seen:
+                # release the sessions that left
+                for idle_session_id in [session for session, last_seen in self._last_seen.items()
+                                        if now - last_seen > self.idle_timeout]:
+                    del self._last_seen[idle_session_id]
+                if len(self._last_seen) >= self.max_active:
+                    return False
+            self._last_seen[session_id] = now
+            return True
+
+    def count_active(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for last_seen in self._last_seen.values() if now - last_seen <= self.idle_timeout)
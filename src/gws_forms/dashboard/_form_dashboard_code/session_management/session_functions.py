@@ -1,39 +1,281 @@
+import hashlib
 import json
 import os
 from datetime import datetime
+from typing import Callable, Optional, Tuple
 
 import pytz
-import streamlit as st
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock, write_json_atomic
+from gws_forms.dashboard._form_dashboard_code.session_management.funnel_statistics import (
+    FunnelStatistics,
+    is_draft_started,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_change_feed import (
+    SubmissionChangeFeed,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_arrow_cache import (
+    SubmissionsArrowCache,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_search_index import (
+    SubmissionsSearchIndex,
+)
+
+# Sub folders and files of the folder holding the answers of a form
+SAVED_SESSIONS_DIR = "saved_sessions"
+SUBMITTED_SESSIONS_DIR = "submitted_sessions"
+SESSIONS_TOKEN_FILE = "sessions-token.json"
+# Format of the timestamps of the drafts and of the submissions (Europe/Paris time)
+SESSION_TIMESTAMP_FORMAT = "%d-%m-%Y-%H-%M-%S"
+
+# Form folders already prepared by the current process
+_PREPARED_FORM_FOLDERS = set()
+
+
+def prepare_form_folder(form_folder: str) -> None:
+    """Create the sub folders and files of a form folder and import the legacy submissions.
+
+    The preparation runs once per form folder and per process, not on each rerun of each session.
+    """
+    if form_folder in _PREPARED_FORM_FOLDERS:
+        return
+    os.makedirs(os.path.join(form_folder, SAVED_SESSIONS_DIR), exist_ok=True)
+    submitted_directory = os.path.join(form_folder, SUBMITTED_SESSIONS_DIR)
+    os.makedirs(submitted_directory, exist_ok=True)
+    # Move the submissions saved as one file each (before the ledger) into the ledger
+    SubmissionLedger(submitted_directory).import_legacy_files()
+    token_path = os.path.join(form_folder, SESSIONS_TOKEN_FILE)
+    if not os.path.exists(token_path):
+        with open(token_path, "w", encoding="utf8") as f:
+            json.dump({}, f)
+    _PREPARED_FORM_FOLDERS.add(form_folder)
+
+
+# Drafts are stored in sub folders named after the first characters of the hash of the token,
+# so a folder never contains more than a fraction of the drafts
+SHARD_PREFIX_LENGTH = 2
+
+
+def get_session_shard(token: str) -> str:
+    return hashlib.sha1(str(token).encode("utf-8")).hexdigest()[:SHARD_PREFIX_LENGTH]
+
+
+def get_session_path(session_directory: str, token: str) -> str:
+    """Return the path of the draft of a token, this is the only place defining the drafts layout"""
+    return os.path.join(session_directory, get_session_shard(token), f"session_{token}.json")
+
+
+def iter_session_paths(session_directory: str):
+    """Iterate over the paths of all the drafts of the directory"""
+    for shard in os.scandir(session_directory):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.startswith("session_") and entry.name.endswith(".json"):
+                yield entry.path
+
+
+def migrate_sessions_to_sharded_layout(session_directory: str) -> int:
+    """Move the drafts stored directly in the directory to their shard, return the number of moved drafts"""
+    moved_count = 0
+    for entry in os.scandir(session_directory):
+        if entry.is_file() and entry.name.startswith("session_") and entry.name.endswith(".json"):
+            _move_to_shard(entry.path, session_directory, entry.name[len("session_"):-len(".json")])
+            moved_count += 1
+    return moved_count
+
+
+def _move_to_shard(flat_path: str, session_directory: str, token: str) -> None:
+    path = get_session_path(session_directory, token)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(flat_path, path)
 
 
 def load_session(session_directory: str, token: str) -> dict:
-    path = os.path.join(session_directory, f"session_{token}.json")
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return json.load(f)
-    return {'questions': []}
+    """Return the draft of the token {'answers', 'version'}, the version is 0 if the token has no draft"""
+    path = get_session_path(session_directory, token)
+    flat_path = os.path.join(session_directory, f"session_{token}.json")
+    if not os.path.exists(path) and os.path.exists(flat_path):
+        # draft saved before the sharded layout, move it on first access
+        _move_to_shard(flat_path, session_directory, token)
+    return _read_draft(path)
+
+
+def save_draft(answers: list, session_directory: str, token: str, base: dict = None,
+               get_progress: Callable[[list], dict] = None, form_fingerprint: str = None) -> Tuple[dict, bool]:
+    """Save the answers of a draft (indexed by question position) with a compare-and-swap on its version.
+
+    `base` is the draft the answers were edited from. If the draft was saved since (the same token
+    is used in another tab or on another device), the answers are merged question by question : the
+    answers changed from `base` are kept and the other answers are taken from the saved draft. Without
+    `base`, the saved draft is overwritten.
+
+    The compare-and-swap holds the lock of the token only, the drafts of other tokens are saved concurrently.
+    `get_progress` returns the progress of the saved answers by section, it is stored in the draft and the
+    funnel statistics are updated with its change.
+    `form_fingerprint` is the fingerprint of the form the answers are indexed by, stored in the draft. A draft
+    saved with another form is overwritten, its answers were moved to the positions of the form when loaded.
+    Return the saved draft and whether it changed.
+    """
+    path = get_session_path(session_directory, token)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with file_lock(path[:-len(".json")] + ".lock"):
+        current = _read_draft(path)
+        same_form = current.get("form", form_fingerprint) == form_fingerprint
+        # a draft saved before the answers arrays is overwritten
+        if base is not None and base.get("version", 0) != current["version"] and "answers" in current and same_form:
+            answers = merge_answers(base.get("answers", []), answers, current["answers"])
+        # only the answers are compared, the timestamp always differs
+        if answers == current.get("answers") and same_form:
+            return current, False
+        draft = {
+            "answers": answers,
+            "timestamp": datetime.now(tz=pytz.timezone('Europe/Paris')).strftime(SESSION_TIMESTAMP_FORMAT),
+            "version": current["version"] + 1,
+        }
+        if form_fingerprint is not None:
+            draft["form"] = form_fingerprint
+        if current.get("submitted"):
+            draft["submitted"] = True
+        if get_progress is not None:
+            draft["progress"] = get_progress(answers)
+        write_json_atomic(path, json.dumps(draft, ensure_ascii=False))
+        if get_progress is not None:
+            FunnelStatistics(session_directory).update(current.get("progress"), draft["progress"])
+    return draft, True
+
+
+def merge_answers(base_answers: list, local_answers: list, saved_answers: list) -> list:
+    """Merge the answers edited from `base_answers` into the answers saved concurrently"""
+    merged = list(saved_answers)
+    for index, answer in enumerate(local_answers):
+        base_answer = base_answers[index] if index < len(base_answers) else None
+        if answer != base_answer:
+            if index >= len(merged):
+                merged.extend([None] * (index + 1 - len(merged)))
+            merged[index] = answer
+    return merged
+
+
+def remove_draft(session_directory: str, token: str, modified_before: float = None) -> Optional[dict]:
+    """Remove the draft of a token and return it, or None if there is no draft.
+
+    With `modified_before` (a timestamp), the draft is only removed if it was not saved since, the check
+    and the removal are done under the lock of the token so a draft being saved is never removed.
+    The progress of the removed draft is removed from the funnel statistics, a respondent coming back
+    starts a new draft. The lock file of the token is kept, removing it while it is held would let
+    another process lock a new file of the same name.
+    """
+    path = get_session_path(session_directory, token)
+    if not os.path.exists(path):
+        return None
+    with file_lock(path[:-len(".json")] + ".lock"):
+        if not os.path.exists(path):
+            return None
+        if modified_before is not None and os.path.getmtime(path) >= modified_before:
+            return None
+        draft = _read_draft(path)
+        os.remove(path)
+        if draft.get("progress") is not None:
+            submitted_drafts = -1 if draft.get("submitted") and is_draft_started(draft["progress"]) else 0
+            FunnelStatistics(session_directory).update(draft["progress"], {}, submitted_drafts=submitted_drafts)
+    return draft
+
+
+def mark_draft_submitted(session_directory: str, token: str, submitted_directory: str = None) -> None:
+    """Mark the draft of a token as submitted, so the funnel counts its respondent once with the submissions.
+
+    The submitted tokens of the funnel are counted with the new submissions of `submitted_directory`.
+    """
+    if submitted_directory is not None:
+        FunnelStatistics(session_directory).sync_submitted_tokens(submitted_directory)
+    path = get_session_path(session_directory, token)
+    if not os.path.exists(path):
+        return
+    with file_lock(path[:-len(".json")] + ".lock"):
+        if not os.path.exists(path):
+            return
+        draft = _read_draft(path)
+        if draft.get("submitted"):
+            return
+        draft["submitted"] = True
+        write_json_atomic(path, json.dumps(draft, ensure_ascii=False))
+        if is_draft_started(draft.get("progress")):
+            FunnelStatistics(session_directory).update(draft["progress"], draft["progress"], submitted_drafts=1)
+
+
+def get_draft_token(session_path: str) -> str:
+    """Return the token of a draft from its path"""
+    return os.path.basename(session_path)[len("session_"):-len(".json")]
+
+
+def _read_draft(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"answers": [], "version": 0}
+    with open(path, "r", encoding="utf-8") as f:
+        draft = json.load(f)
+    # drafts saved before the versioning
+    draft.setdefault("version", 0)
+    return draft
 
 # Function to save the current session
 
 
-def save_current_session(questions: list, session_directory: str, token: str, multi: bool = False):
-    timestamp = datetime.now(tz=pytz.timezone('Europe/Paris')).strftime("%d-%m-%Y-%H-%M-%S")
-    path = os.path.join(session_directory, f"session_{token}.json")
-    session_data = {"questions": questions, "timestamp": timestamp}
-    # check if the file content is different from the current session, if it's different save the session + st.rerun
+def save_current_session(questions: list, session_directory: str, token: str, multi: bool = False,
+                         form_questions: list = None) -> bool:
+    """Save a submission (`multi`) made of question/answer pairs, or the answers array of the draft of the token.
+
+    Return True if the draft changed (always True for a submission).
+    """
     if multi:
-        path = os.path.join(session_directory, f"session_{token}_{timestamp}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(session_data, f, ensure_ascii=False)
-        return
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            data = json.load(f)
-            if data != session_data:
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump(session_data, f, ensure_ascii=False)
-                st.rerun()
-    else:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(session_data, f, ensure_ascii=False)
-            st.rerun()
+        timestamp = datetime.now(tz=pytz.timezone('Europe/Paris')).strftime(SESSION_TIMESTAMP_FORMAT)
+        # submissions are appended to the ledger, each one gets its own sequence id
+        SubmissionLedger(session_directory).append(token=token, questions=questions, timestamp=timestamp)
+        if form_questions is not None:
+            SubmissionsArrowCache(session_directory, form_questions).sync()
+        SubmissionsSearchIndex(session_directory).sync()
+        # notify the downstream consumers
+        SubmissionChangeFeed(session_directory).sync()
+        return True
+    return save_draft(questions, session_directory, token)[1]
+
+
+def list_submissions(session_directory: str, limit: int) -> list:
+    """Return the `limit` most recent submissions, most recent first"""
+    return SubmissionLedger(session_directory).list_latest(limit)
+
+
+def load_submission(session_directory: str, seq: int) -> dict:
+    return SubmissionLedger(session_directory).get(seq)
+
+
+def load_submissions_table(session_directory: str, form_questions: list):
+    """Return the submissions as an Arrow table with one column per question, read from the memory mapped cache"""
+    submissions_cache = SubmissionsArrowCache(session_directory, form_questions)
+    # add the submissions received since the last access (by another process or before the cache existed)
+    submissions_cache.sync()
+    return submissions_cache.read_table()
+
+
+def search_submissions(session_directory: str, query: str, limit: int) -> list:
+    """Return the `limit` submissions whose text answers best match `query`, best first"""
+    search_index = SubmissionsSearchIndex(session_directory)
+    # index the submissions received since the last access (by another process or before the index existed)
+    search_index.sync()
+    return search_index.search(query, limit)
+
+
+def load_funnel(session_directory: str, submitted_directory: str) -> dict:
+    """Return the funnel statistics of the drafts with the number of submissions.
+
+    `respondents` is the number of tokens that started a draft or submitted the form, each token counted
+    once, and `submitted_tokens` the number of tokens that submitted the form.
+    """
+    funnel_statistics = FunnelStatistics(session_directory)
+    # count the tokens of the submissions not written by the dashboard (imported, static form)
+    funnel_statistics.sync_submitted_tokens(submitted_directory)
+    funnel = funnel_statistics.read()
+    funnel["submitted"] = SubmissionLedger(submitted_directory).count()
+    # the started drafts whose token submitted are counted with the submissions
+    funnel["respondents"] = funnel["started"] - funnel["submitted_drafts"] + funnel["submitted_tokens"]
+    return funnel
@@ -0,0 +1,96 @@
+import json
+import os
+from typing import List, Optional, Tuple
+
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+
+# Size of the end of the feed read to find the last event
+_TAIL_SIZE = 64 * 1024
+
+
+class SubmissionChangeFeed:
+    """Append-only feed of the submissions of a form, for the downstream consumers, stored in `changes.jsonl`.
+
+    Each submission appends one json line {"seq", "token", "timestamp", "payload"} where the payload is
+    the location of the submission in the ledger {"segment", "offset", "length"} (relative to the submitted
+    sessions directory). The events are in sequence order.
+
+    A consumer reads the events from a byte offset and stores the returned offset to resume from it,
+    it never rescans the directory nor the events it already read.
+    """
+
+    FEED_FILE = "changes.jsonl"
+    LOCK_FILE = "changes.lock"
+
+    directory: str
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def sync(self) -> int:
+        """Append the events of the submissions of the ledger not yet in the feed, return their number"""
+        ledger = SubmissionLedger(self.directory)
+        with file_lock(os.path.join(self.directory, self.LOCK_FILE)):
+            last_seq = self._read_last_seq()
+            if last_seq >= ledger.count():
+                return 0
+            lines = []
+            for record in ledger.iter_records(from_seq=last_seq + 1):
+                event = {"seq": record["seq"], "token": record["token"], "timestamp": record["timestamp"],
+                         "payload": ledger.get_location(record["seq"])}
+                lines.append(json.dumps(event, ensure_ascii=False) + "\n")
+
+            with open(self._feed_path, "ab") as f:
+                if f.tell() > 0 and not self._ends_with_newline():
+                    # terminate a line left by an interrupted append
+                    f.write(b"\n")
+                f.write("".join(lines).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            return len(lines)
+
+    def read(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[dict], int]:
+        """Return the events written after the byte `offset` (at most `limit`) and the offset to resume from.
+
+        Only the complete lines are read, an event being appended is returned by the next read.
+        """
+        if not os.path.exists(self._feed_path):
+            return [], offset
+        events = []
+        with open(self._feed_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n") or (limit is not None and len(events) >= limit):
+                    break
+                offset += len(line)
+                # skip a line left by an interrupted append
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+        return events, offset
+
+    ####################################### INTERNAL #######################################
+
+    @property
+    def _feed_path(self) -> str:
+        return os.path.join(self.directory, self.FEED_FILE)
+
+    def _ends_with_newline(self) -> bool:
+        with open(self._feed_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _read_last_seq(self) -> int:
+        if not os.path.exists(self._feed_path):
+            return 0
+        with open(self._feed_path, "rb") as f:
+            f.seek(max(os.path.getsize(self._feed_path) - _TAIL_SIZE, 0))
+            lines = f.read().split(b"\n")
+        for line in reversed(lines):
+            try:
+                return json.loads(line)["seq"]
+            except (ValueError, KeyError):
+                continue
+        return 0
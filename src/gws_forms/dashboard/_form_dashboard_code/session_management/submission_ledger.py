@@ -0,0 +1,389 @@
+import json
+import os
+import re
+import shutil
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional
+
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock, write_json_atomic
+
+# One fixed-size entry per submission : seq, segment number, byte offset, byte length.
+# Seq ids are contiguous so the entry of a submission is found at (seq - 1) * ENTRY_SIZE.
+_ENTRY_FORMAT = "<QIQI"
+_ENTRY_SIZE = struct.calcsize(_ENTRY_FORMAT)
+# Number of index entries read at once when iterating over the submissions
+_READ_CHUNK_ENTRIES = 4096
+
+
+def get_question_column_name(section: str, question: str) -> str:
+    """Name of the column of a question in the tables built from the submissions"""
+    return f"{section} - {question}" if section else question
+
+
+class SubmissionLedger:
+    """Append-only store of the submitted sessions of a form.
+
+    Submissions are appended as json lines to segment files (`segment-000001.jsonl`, ...)
+    that are rotated when they reach `segment_max_bytes`. Each submission receives a
+    monotonic sequence id, and a small fixed-width offset index (`ledger.idx`) maps a
+    sequence id to its segment and byte range. Appends are serialized with a file lock,
+    so two submissions can never get the same id nor overwrite each other.
+    """
+
+    SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+    INDEX_FILE = "ledger.idx"
+    REWRITE_FILE = "ledger.rewrite"
+    LOCK_FILE = "ledger.lock"
+    LEGACY_DIR = "legacy"
+    IMPORTING_DIR = "importing"
+    LEGACY_LOCK_FILE = "legacy.lock"
+
+    directory: str
+    segment_max_bytes: int
+
+    def __init__(self, directory: str, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+
+    ####################################### WRITE #######################################
+
+    def append(self, token: str, questions: list, timestamp: str) -> dict:
+        """Append a submission and return the stored record (with its `seq`)."""
+        return self.append_many([(token, questions, timestamp)])[0]
+
+    def append_many(self, submissions: List[tuple]) -> List[dict]:
+        """Append the (token, questions, timestamp) submissions and return the stored records.
+
+        A submission can have a fourth item, the id given by its client, stored in the record as `submission_id`.
+        The submissions are written under a single lock and a single fsync of the segment and of the index.
+        """
+        if not submissions:
+            return []
+        with file_lock(self._lock_path):
+            self._repair_index()
+            last_entry = self._read_last_entry()
+            seq = last_entry[0] if last_entry else 0
+            segment = last_entry[1] if last_entry else 1
+
+            segment_path = self._segment_path(segment)
+            if os.path.exists(segment_path) and os.path.getsize(segment_path) >= self.segment_max_bytes:
+                segment += 1
+                segment_path = self._segment_path(segment)
+
+            records = []
+            entries = []
+            segment_file = open(segment_path, "ab")
+            try:
+                offset = segment_file.tell()
+                if offset > 0 and not self._ends_with_newline(segment_path):
+                    # terminate a line left by an interrupted append
+                    segment_file.write(b"\n")
+                    offset += 1
+                for submission in submissions:
+                    token, questions, timestamp = submission[:3]
+                    if offset >= self.segment_max_bytes:
+                        self._sync_file(segment_file)
+                        segment_file.close()
+                        segment += 1
+                        segment_file = open(self._segment_path(segment), "ab")
+                        offset = 0
+                    seq += 1
+                    record = {"seq": seq, "token": str(token), "timestamp": timestamp, "questions": questions}
+                    if len(submission) > 3 and submission[3] is not None:
+                        record["submission_id"] = submission[3]
+                    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                    segment_file.write(line)
+                    entries.append(struct.pack(_ENTRY_FORMAT, seq, segment, offset, len(line)))
+                    records.append(record)
+                    offset += len(line)
+                self._sync_file(segment_file)
+            finally:
+                segment_file.close()
+
+            # the submissions only become visible once their index entries are written
+            with open(self._index_path, "ab") as f:
+                f.write(b"".join(entries))
+                self._sync_file(f)
+
+        return records
+
+    def rewrite(self, transform: Callable[[list], list], max_workers: int = 1, rewrite_id: str = None) -> int:
+        """Replace the questions of every submission by `transform(questions)`, return the number of submissions.
+
+        The sequence ids, tokens and timestamps are kept. Each segment is rewritten to a new segment by a worker
+        process (`transform` must be picklable), the new segments are numbered after the current ones so the
+        current index stays valid until the new index replaces it : a reader or an interrupted rewrite never
+        sees a partially rewritten ledger. Appends wait for the end of the rewrite.
+
+        A transform that can not be applied twice is given a `rewrite_id` : it is recorded in `ledger.rewrite`
+        with the first new segment before the new index replaces the current one, so a rewrite with the same id
+        run again after the index swap (the last rewrite is recorded) only removes the old segments.
+        """
+        with file_lock(self._lock_path):
+            self._repair_index()
+            count = self.count()
+            if count == 0:
+                return 0
+            with open(self._index_path, "rb") as f:
+                entries = list(struct.iter_unpack(_ENTRY_FORMAT, f.read(count * _ENTRY_SIZE)))
+            first_segment, last_segment = entries[0][1], entries[-1][1]
+            # the segments of a rewrite interrupted after its index swap
+            self._remove_segments_before(first_segment)
+            if rewrite_id is not None and self._is_rewritten(rewrite_id, first_segment):
+                return count
+
+            # the indexed submissions of each segment, the lines not indexed are dropped
+            segment_entries = {}
+            for seq, segment, offset, length in entries:
+                segment_entries.setdefault(segment, []).append((seq, offset, length))
+            tasks = [
+                (self._segment_path(segment), self._segment_path(last_segment + 1 + segment - first_segment),
+                 segment_entries.get(segment, []), transform)
+                for segment in range(first_segment, last_segment + 1)
+            ]
+            if max_workers > 1 and len(tasks) > 1:
+                with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+                    results = list(executor.map(_rewrite_segment, tasks))
+            else:
+                results = [_rewrite_segment(task) for task in tasks]
+
+            new_entries = [
+                struct.pack(_ENTRY_FORMAT, seq, last_segment + 1 + segment_index, offset, length)
+                for segment_index, segment_entries in enumerate(results)
+                for seq, offset, length in segment_entries
+            ]
+            tmp_path = self._index_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(new_entries))
+                self._sync_file(f)
+            if rewrite_id is not None:
+                # the rewrite is done once the index refers to the new segments
+                write_json_atomic(os.path.join(self.directory, self.REWRITE_FILE),
+                                  json.dumps({"id": rewrite_id, "first_segment": last_segment + 1}))
+            # the new index makes the new segments visible at once
+            os.replace(tmp_path, self._index_path)
+            self._remove_segments_before(last_segment + 1)
+        return count
+
+    def import_legacy_files(self) -> int:
+        """Import the `session_{token}_{timestamp}.json` files written before the ledger existed.
+
+        Imported files are moved to the `legacy` sub folder. Return the number of imported files.
+        A file is moved to `legacy/importing` before it is appended, so an import interrupted after the
+        append is detected on the next import (the file is then the last submission) and not imported twice.
+        """
+        legacy_dir = os.path.join(self.directory, self.LEGACY_DIR)
+        importing_dir = os.path.join(legacy_dir, self.IMPORTING_DIR)
+        legacy_files = [
+            f for f in os.listdir(self.directory) if f.startswith("session_") and f.endswith(".json")
+        ]
+        if not legacy_files and not os.path.isdir(importing_dir):
+            return 0
+
+        os.makedirs(importing_dir, exist_ok=True)
+        imported_count = 0
+        with file_lock(os.path.join(self.directory, self.LEGACY_LOCK_FILE)):
+            # the file of an interrupted import
+            for file_name in os.listdir(importing_dir):
+                imported_count += self._import_legacy_file(importing_dir, file_name, legacy_dir,
+                                                           check_imported=True)
+            legacy_files = [
+                f for f in os.listdir(self.directory) if f.startswith("session_") and f.endswith(".json")
+            ]
+            legacy_files.sort(key=lambda f: os.path.getmtime(os.path.join(self.directory, f)))
+            for file_name in legacy_files:
+                os.replace(os.path.join(self.directory, file_name), os.path.join(importing_dir, file_name))
+                imported_count += self._import_legacy_file(importing_dir, file_name, legacy_dir)
+        return imported_count
+
+    def _import_legacy_file(self, importing_dir: str, file_name: str, legacy_dir: str,
+                            check_imported: bool = False) -> int:
+        file_path = os.path.join(importing_dir, file_name)
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # file name is session_{token}_{timestamp}.json
+        token = file_name[len("session_"):-len(".json")].split("_")[0]
+        submission = {"token": token, "timestamp": data.get("timestamp", ""), "questions": data.get("questions", [])}
+        last_record = self.get(self.count()) if check_imported else None
+        imported = last_record is None or \
+            {key: last_record.get(key) for key in submission} != submission
+        if imported:
+            self.append(**submission)
+        shutil.move(file_path, os.path.join(legacy_dir, file_name))
+        return int(imported)
+
+    ####################################### READ #######################################
+
+    def count(self) -> int:
+        if not os.path.exists(self._index_path):
+            return 0
+        return os.path.getsize(self._index_path) // _ENTRY_SIZE
+
+    def get(self, seq: int) -> Optional[dict]:
+        """Return the submission with the given sequence id, None if it does not exist."""
+        if seq < 1 or seq > self.count():
+            return None
+        try:
+            return self._read_record(seq)
+        except FileNotFoundError:
+            # the segment was replaced by a rewrite of the ledger between the index and the segment reads
+            return self._read_record(seq)
+
+    def get_location(self, seq: int) -> Optional[dict]:
+        """Return where the submission is stored : {"segment" (file name), "offset", "length"} in bytes."""
+        if seq < 1 or seq > self.count():
+            return None
+        _, segment, offset, length = self._read_entry(seq)
+        return {"segment": os.path.basename(self._segment_path(segment)), "offset": offset, "length": length}
+
+    def iter_records(self, from_seq: int = 1) -> Iterator[dict]:
+        """Iterate over all submissions with a sequence id >= `from_seq`, in order.
+
+        The submissions are read through the offset index, by chunks of entries, so the lines
+        left in the segments by an interrupted append are never returned. When a segment is replaced
+        by a rewrite of the ledger, the new index is read from the next submission. A missing segment
+        raises FileNotFoundError, the iteration never stops before the last submission.
+        """
+        last_seq = self.count()
+        seq = max(from_seq, 1)
+        retried_seq = None
+        while seq <= last_seq:
+            try:
+                for record_seq, record in self._iter_indexed_records(seq, last_seq):
+                    yield record
+                    seq = record_seq + 1
+                return
+            except FileNotFoundError:
+                # the index is read again from `seq`, its segment is also missing from the new index
+                if retried_seq == seq:
+                    raise
+                retried_seq = seq
+
+    def list_latest(self, limit: int) -> List[dict]:
+        """Return the `limit` most recent submissions, most recent first."""
+        last_seq = self.count()
+        first_seq = max(last_seq - limit + 1, 1)
+        return list(reversed(list(self.iter_records(from_seq=first_seq))))
+
+    ####################################### INTERNAL #######################################
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, self.INDEX_FILE)
+
+    @property
+    def _lock_path(self) -> str:
+        return os.path.join(self.directory, self.LOCK_FILE)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:06d}.jsonl")
+
+    def _read_record(self, seq: int) -> dict:
+        _, segment, offset, length = self._read_entry(seq)
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def _iter_indexed_records(self, from_seq: int, last_seq: int) -> Iterator[tuple]:
+        """Iterate over the (seq, record) of the submissions `from_seq` to `last_seq`, the segments are opened
+        when their first submission is read"""
+        segment_file = None
+        current_segment = None
+        try:
+            with open(self._index_path, "rb") as index:
+                index.seek((from_seq - 1) * _ENTRY_SIZE)
+                for chunk_start in range(from_seq, last_seq + 1, _READ_CHUNK_ENTRIES):
+                    chunk_size = min(_READ_CHUNK_ENTRIES, last_seq + 1 - chunk_start)
+                    for seq, segment, offset, length in struct.iter_unpack(
+                            _ENTRY_FORMAT, index.read(chunk_size * _ENTRY_SIZE)):
+                        if segment != current_segment:
+                            if segment_file is not None:
+                                segment_file.close()
+                                segment_file = None
+                            segment_file = open(self._segment_path(segment), "rb")
+                            current_segment = segment
+                        segment_file.seek(offset)
+                        yield seq, json.loads(segment_file.read(length))
+        finally:
+            if segment_file is not None:
+                segment_file.close()
+
+    def _read_entry(self, seq: int) -> tuple:
+        with open(self._index_path, "rb") as f:
+            f.seek((seq - 1) * _ENTRY_SIZE)
+            return struct.unpack(_ENTRY_FORMAT, f.read(_ENTRY_SIZE))
+
+    def _read_last_entry(self) -> Optional[tuple]:
+        count = self.count()
+        if count == 0:
+            return None
+        return self._read_entry(count)
+
+    def _sync_file(self, f) -> None:
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _ends_with_newline(self, path: str) -> bool:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _is_rewritten(self, rewrite_id: str, first_segment: int) -> bool:
+        rewrite_path = os.path.join(self.directory, self.REWRITE_FILE)
+        if not os.path.exists(rewrite_path):
+            return False
+        with open(rewrite_path, "r", encoding="utf-8") as f:
+            rewrite = json.load(f)
+        return rewrite["id"] == rewrite_id and first_segment >= rewrite["first_segment"]
+
+    def _remove_segments_before(self, first_segment: int) -> None:
+        for file_name in os.listdir(self.directory):
+            if re.fullmatch(r"segment-\d+\.jsonl", file_name) and int(file_name[8:-6]) < first_segment:
+                os.remove(os.path.join(self.directory, file_name))
+
+    def _repair_index(self) -> None:
+        """Drop what an interrupted append left after the last indexed submission : a partially written
+        index entry, the lines written to the segment without their index entry and the next segments.
+
+        Without the repair, the next append would give the sequence id of an orphan line to its submission.
+        """
+        if not os.path.exists(self._index_path):
+            return
+        size = os.path.getsize(self._index_path)
+        if size % _ENTRY_SIZE != 0:
+            with open(self._index_path, "r+b") as f:
+                f.truncate(size - size % _ENTRY_SIZE)
+        last_entry = self._read_last_entry()
+        if last_entry is None:
+            return
+        _, segment, offset, length = last_entry
+        segment_path = self._segment_path(segment)
+        if os.path.exists(segment_path) and os.path.getsize(segment_path) > offset + length:
+            with open(segment_path, "r+b") as f:
+                f.truncate(offset + length)
+        next_segment = segment + 1
+        while os.path.exists(self._segment_path(next_segment)):
+            os.remove(self._segment_path(next_segment))
+            next_segment += 1
+
+
+def _rewrite_segment(task: tuple) -> List[tuple]:
+    """Write the transformed submissions of a segment to a new segment, return their (seq, offset, length)"""
+    segment_path, new_segment_path, entries, transform = task
+    new_entries = []
+    offset = 0
+    with open(new_segment_path, "wb") as new_segment:
+        if entries:
+            with open(segment_path, "rb") as segment:
+                for seq, entry_offset, length in entries:
+                    segment.seek(entry_offset)
+                    record = json.loads(segment.read(length))
+                    record["questions"] = transform(record["questions"])
+                    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                    new_segment.write(line)
+                    new_entries.append((seq, offset, len(line)))
+                    offset += len(line)
+        new_segment.flush()
+        os.fsync(new_segment.fileno())
+    return new_entries
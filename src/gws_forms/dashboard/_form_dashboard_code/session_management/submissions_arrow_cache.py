@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Tuple
+
+import pyarrow as pa
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+    get_question_column_name,
+)
+
+SEQ_COLUMN = "seq"
+TOKEN_COLUMN = "token"
+TIMESTAMP_COLUMN = "timestamp"
+NUMERIC_RESPONSE_TYPES = ["numeric", "range", "number"]
+
+# Tables read from the part files, by path, with the (inode, mtime, size) of the file they were read from.
+# A part file is immutable, but another process rebuilding the cache replaces it with a new file of the same name
+_PART_TABLES: Dict[str, Tuple[tuple, pa.Table]] = {}
+
+
+class SubmissionsArrowCache:
+    """Columnar copy of the submission ledger, stored as Arrow IPC (Feather v2) files.
+
+    The cache has one column per question, typed from the question definition. New submissions
+    are written in small part files named after the range of sequence ids they contain
+    (`part-{first}-{last}.arrow`). The parts are merged by tiers, as the segments of the search index : the
+    last `merge_factor` parts are merged when their sizes are in the same power of `merge_factor`, so a
+    submission is rewritten once per tier. Reading the cache memory maps the part files, no data is parsed
+    nor copied.
+
+    The ledger stays the source of truth : the cache is rebuilt from it when it is missing or
+    when the question definition changed.
+    """
+
+    CACHE_DIR = "arrow_cache"
+    SCHEMA_FILE = "schema.json"
+    LOCK_FILE = "arrow_cache.lock"
+    MERGE_FACTOR = 8
+
+    submitted_directory: str
+    questions: list
+    merge_factor: int
+
+    def __init__(self, submitted_directory: str, questions: list, merge_factor: int = MERGE_FACTOR):
+        self.submitted_directory = submitted_directory
+        self.questions = questions
+        self.merge_factor = merge_factor
+
+    def get_schema(self) -> pa.Schema:
+        fields = [
+            pa.field(SEQ_COLUMN, pa.int64()),
+            pa.field(TOKEN_COLUMN, pa.string()),
+            pa.field(TIMESTAMP_COLUMN, pa.string()),
+        ]
+        for question in self.questions:
+            column_name = get_question_column_name(question.get("section", ""), question["question"])
+            if column_name not in [field.name for field in fields]:
+                fields.append(pa.field(column_name, _get_question_type(question)))
+        return pa.schema(fields)
+
+    def sync(self) -> int:
+        """Append to the cache the submissions of the ledger it does not contain yet.
+
+        Return the number of appended submissions.
+        """
+        ledger = SubmissionLedger(self.submitted_directory)
+        os.makedirs(self._cache_path, exist_ok=True)
+        with file_lock(os.path.join(self._cache_path, self.LOCK_FILE)):
+            if not self._is_schema_up_to_date():
+                self._clear()
+            last_seq = max((part[1] for part in self._list_parts()), default=0)
+            if last_seq >= ledger.count():
+                return 0
+
+            records = list(ledger.iter_records(from_seq=last_seq + 1))
+            # the ledger files may be missing (e.g. copied while being written)
+            if not records:
+                return 0
+            self._write_part(self._records_to_table(records))
+            self._merge_tiers()
+            return len(records)
+
+    def read_table(self) -> pa.Table:
+        """Return all the cached submissions, the part files are memory mapped (zero-copy)"""
+        self._forget_removed_parts()
+        try:
+            parts = self._select_parts(self._list_parts())
+            tables = [self._read_part(part[2]) for part in parts]
+        except FileNotFoundError:
+            # a part was removed by a merge while listing, the merged part is now available
+            parts = self._select_parts(self._list_parts())
+            tables = [self._read_part(part[2]) for part in parts]
+        if not tables:
+            return self.get_schema().empty_table()
+        return pa.concat_tables(tables)
+
+    ####################################### INTERNAL #######################################
+
+    @property
+    def _cache_path(self) -> str:
+        return os.path.join(self.submitted_directory, self.CACHE_DIR)
+
+    def _records_to_table(self, records: List[dict]) -> pa.Table:
+        schema = self.get_schema()
+        columns: Dict[str, list] = {field.name: [] for field in schema}
+        for record in records:
+            answers = {
+                get_question_column_name(question.get("section", ""), question["question"]): question.get("answer")
+                for question in record["questions"]
+            }
+            columns[SEQ_COLUMN].append(record["seq"])
+            columns[TOKEN_COLUMN].append(record["token"])
+            columns[TIMESTAMP_COLUMN].append(record["timestamp"])
+            for field in schema:
+                if field.name not in (SEQ_COLUMN, TOKEN_COLUMN, TIMESTAMP_COLUMN):
+                    columns[field.name].append(_convert_answer(answers.get(field.name), field.type))
+        return pa.table(columns, schema=schema)
+
+    def _write_part(self, table: pa.Table) -> None:
+        first_seq = table.column(SEQ_COLUMN)[0].as_py()
+        last_seq = table.column(SEQ_COLUMN)[-1].as_py()
+        part_path = os.path.join(self._cache_path, f"part-{first_seq:012d}-{last_seq:012d}.arrow")
+        tmp_path = part_path + ".tmp"
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, part_path)
+
+    def _merge_tiers(self) -> None:
+        # the parts are merged in order, so a merged part holds a continuous range of submissions
+        while True:
+            last_parts = self._select_parts(self._list_parts())[-self.merge_factor:]
+            if len(last_parts) < self.merge_factor or len({self._get_tier(part) for part in last_parts}) > 1:
+                return
+            self._merge(last_parts)
+
+    def _get_tier(self, part: tuple) -> int:
+        size = part[1] - part[0] + 1
+        tier = 0
+        while size >= self.merge_factor ** (tier + 1):
+            tier += 1
+        return tier
+
+    def _merge(self, parts: List[tuple]) -> None:
+        table = pa.concat_tables([self._read_part(part[2]) for part in parts]).combine_chunks()
+        self._write_part(table)
+        merged_part = (parts[0][0], parts[-1][1])
+        # the merged part is written before the parts are removed, readers never miss a submission
+        for part in self._list_parts():
+            if merged_part[0] <= part[0] and part[1] <= merged_part[1] and (part[0], part[1]) != merged_part:
+                self._remove_part(part[2])
+
+    def _clear(self) -> None:
+        for part in self._list_parts():
+            self._remove_part(part[2])
+        with open(os.path.join(self._cache_path, self.SCHEMA_FILE), "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self._get_schema_fingerprint()}, f)
+
+    def _remove_part(self, part_path: str) -> None:
+        _PART_TABLES.pop(part_path, None)
+        os.remove(part_path)
+
+    def _forget_removed_parts(self) -> None:
+        # the parts removed by another process (compaction, rebuild) are no longer kept in memory
+        for part_path in list(_PART_TABLES):
+            if os.path.dirname(part_path) == self._cache_path and not os.path.exists(part_path):
+                _PART_TABLES.pop(part_path, None)
+
+    def _list_parts(self) -> List[tuple]:
+        """Return the (first seq, last seq, path) of the part files"""
+        if not os.path.isdir(self._cache_path):
+            return []
+        parts = []
+        for file_name in os.listdir(self._cache_path):
+            if file_name.startswith("part-") and file_name.endswith(".arrow"):
+                first_seq, last_seq = file_name[len("part-"):-len(".arrow")].split("-")
+                parts.append((int(first_seq), int(last_seq), os.path.join(self._cache_path, file_name)))
+        return sorted(parts, key=lambda part: (part[0], -part[1]))
+
+    def _select_parts(self, parts: List[tuple]) -> List[tuple]:
+        # skip the parts already contained in a merged part that is not yet removed
+        selected_parts = []
+        last_seq = 0
+        for part in parts:
+            if part[0] > last_seq:
+                selected_parts.append(part)
+                last_seq = part[1]
+        return selected_parts
+
+    def _read_part(self, part_path: str) -> pa.Table:
+        stat = os.stat(part_path)
+        file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached_part = _PART_TABLES.get(part_path)
+        if cached_part is None or cached_part[0] != file_key:
+            cached_part = (file_key, pa.ipc.open_file(pa.memory_map(part_path, "r")).read_all())
+            _PART_TABLES[part_path] = cached_part
+        return cached_part[1]
+
+    def _get_schema_fingerprint(self) -> str:
+        return hashlib.sha1(self.get_schema().to_string().encode("utf-8")).hexdigest()
+
+    def _is_schema_up_to_date(self) -> bool:
+        schema_path = os.path.join(self._cache_path, self.SCHEMA_FILE)
+        if not os.path.exists(schema_path):
+            return False
+        with open(schema_path, "r", encoding="utf-8") as f:
+            return json.load(f)["fingerprint"] == self._get_schema_fingerprint()
+
+
+def _get_question_type(question: dict) -> pa.DataType:
+    if question.get("multiselect"):
+        return pa.list_(pa.string())
+    if question.get("response_type") in NUMERIC_RESPONSE_TYPES and not question.get("allowed_values"):
+        return pa.float64()
+    return pa.string()
+
+
+def _convert_answer(answer, data_type: pa.DataType):
+    if answer is None or answer == "" or answer == []:
+        return None
+    if pa.types.is_list(data_type):
+        return [str(value) for value in answer] if isinstance(answer, list) else [str(answer)]
+    if pa.types.is_floating(data_type):
+        try:
+            return float(answer)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(answer, list):
+        return ", ".join(str(value) for value in answer)
+    return str(answer)
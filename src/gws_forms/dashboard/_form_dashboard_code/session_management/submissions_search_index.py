@@ -0,0 +1,218 @@
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List
+
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock, write_json_atomic
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+    get_question_column_name,
+)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_CONTEXT = 60
+_WORD_REGEX = re.compile(r"\w+")
+
+# Segments read from the disk, the segment files are immutable so they are parsed only once
+_SEGMENTS: Dict[str, dict] = {}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a text in lower case terms without accents"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [term for term in _WORD_REGEX.findall(text) if len(term) > 1]
+
+
+class SubmissionsSearchIndex:
+    """Inverted index over the text answers of the submission ledger, to search the submissions.
+
+    The index is made of immutable segment files (`segment-{first}-{last}.json`) named after the range of
+    sequence ids they contain, each one holding the postings (term -> [[seq, term frequency], ...]) and the
+    number of terms of each submission. New submissions are indexed in a new segment. The segments are merged
+    by tiers : the segment sizes (number of submissions) are grouped by power of `merge_factor`, and the last
+    `merge_factor` segments are merged when they are in the same tier. A submit only merges small segments,
+    a submission is rewritten once per tier. The segments are parsed once per process.
+
+    Results are ranked with BM25 and the answers containing the terms are returned with the terms highlighted.
+    """
+
+    INDEX_DIR = "search_index"
+    LOCK_FILE = "search_index.lock"
+    MERGE_FACTOR = 4
+
+    submitted_directory: str
+    merge_factor: int
+
+    def __init__(self, submitted_directory: str, merge_factor: int = MERGE_FACTOR):
+        self.submitted_directory = submitted_directory
+        self.merge_factor = merge_factor
+
+    def sync(self) -> int:
+        """Index the submissions of the ledger the index does not contain yet, return their number"""
+        ledger = SubmissionLedger(self.submitted_directory)
+        os.makedirs(self._index_path, exist_ok=True)
+        with file_lock(os.path.join(self._index_path, self.LOCK_FILE)):
+            last_seq = max((segment[1] for segment in self._list_segments()), default=0)
+            if last_seq >= ledger.count():
+                return 0
+
+            postings: Dict[str, list] = {}
+            doc_lengths = {}
+            for record in ledger.iter_records(from_seq=last_seq + 1):
+                terms = Counter(term for text in _get_text_answers(record).values() for term in tokenize(text))
+                doc_lengths[record["seq"]] = sum(terms.values())
+                for term, frequency in terms.items():
+                    postings.setdefault(term, []).append([record["seq"], frequency])
+            # the ledger files may be missing (e.g. copied while being written)
+            if not doc_lengths:
+                return 0
+            self._write_segment(min(doc_lengths), max(doc_lengths), postings, doc_lengths)
+            self._merge_tiers()
+            return len(doc_lengths)
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """Return the `limit` submissions best matching `query`, best first.
+
+        Each result is {"seq", "token", "timestamp", "score", "highlights"} where highlights are
+        the (question, snippet) of the answers containing a term of the query, the terms being in bold.
+        """
+        terms = set(tokenize(query))
+        segments = [self._read_segment(segment[2]) for segment in self._select_segments(self._list_segments())]
+        doc_count = sum(len(segment["doc_lengths"]) for segment in segments)
+        if not terms or doc_count == 0:
+            return []
+        average_length = sum(length for segment in segments for length in segment["doc_lengths"].values()) \
+            / doc_count
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            term_postings = [(segment, posting) for segment in segments
+                             for posting in segment["postings"].get(term, [])]
+            idf = math.log(1 + (doc_count - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for segment, (seq, frequency) in term_postings:
+                length_ratio = segment["doc_lengths"][str(seq)] / average_length if average_length else 0
+                scores[seq] = scores.get(seq, 0) + idf * frequency * (BM25_K1 + 1) \
+                    / (frequency + BM25_K1 * (1 - BM25_B + BM25_B * length_ratio))
+
+        # only the returned submissions are read from the ledger, to highlight their answers
+        ledger = SubmissionLedger(self.submitted_directory)
+        results = []
+        for seq, score in sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:limit]:
+            record = ledger.get(seq)
+            highlights = [(question, _highlight(text, terms))
+                          for question, text in _get_text_answers(record).items()
+                          if terms.intersection(tokenize(text))]
+            results.append({"seq": seq, "token": record["token"], "timestamp": record["timestamp"],
+                            "score": score, "highlights": highlights})
+        return results
+
+    ####################################### INTERNAL #######################################
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.submitted_directory, self.INDEX_DIR)
+
+    def _write_segment(self, first_seq: int, last_seq: int, postings: dict, doc_lengths: dict) -> None:
+        segment_path = os.path.join(self._index_path, f"segment-{first_seq:012d}-{last_seq:012d}.json")
+        write_json_atomic(segment_path, json.dumps({"postings": postings, "doc_lengths": doc_lengths},
+                                                   ensure_ascii=False))
+
+    def _merge_tiers(self) -> None:
+        # the segments are merged in order, so a merged segment holds a continuous range of submissions
+        while True:
+            last_segments = self._select_segments(self._list_segments())[-self.merge_factor:]
+            if len(last_segments) < self.merge_factor \
+                    or len({self._get_tier(segment) for segment in last_segments}) > 1:
+                return
+            self._merge(last_segments)
+
+    def _get_tier(self, segment: tuple) -> int:
+        size = segment[1] - segment[0] + 1
+        tier = 0
+        while size >= self.merge_factor ** (tier + 1):
+            tier += 1
+        return tier
+
+    def _merge(self, segments: List[tuple]) -> None:
+        postings: Dict[str, list] = {}
+        doc_lengths = {}
+        for segment in segments:
+            content = self._read_segment(segment[2])
+            for term, term_postings in content["postings"].items():
+                postings.setdefault(term, []).extend(term_postings)
+            doc_lengths.update(content["doc_lengths"])
+        merged_segment = (segments[0][0], segments[-1][1])
+        self._write_segment(merged_segment[0], merged_segment[1], postings, doc_lengths)
+        # the merged segment is written before the segments are removed, searches never miss a submission
+        for segment in self._list_segments():
+            if merged_segment[0] <= segment[0] and segment[1] <= merged_segment[1] \
+                    and (segment[0], segment[1]) != merged_segment:
+                _SEGMENTS.pop(segment[2], None)
+                os.remove(segment[2])
+
+    def _list_segments(self) -> List[tuple]:
+        """Return the (first seq, last seq, path) of the segment files"""
+        if not os.path.isdir(self._index_path):
+            return []
+        segments = []
+        for file_name in os.listdir(self._index_path):
+            if file_name.startswith("segment-") and file_name.endswith(".json"):
+                first_seq, last_seq = file_name[len("segment-"):-len(".json")].split("-")
+                segments.append((int(first_seq), int(last_seq), os.path.join(self._index_path, file_name)))
+        return sorted(segments, key=lambda segment: (segment[0], -segment[1]))
+
+    def _select_segments(self, segments: List[tuple]) -> List[tuple]:
+        # skip the segments already contained in a merged segment that is not yet removed
+        selected_segments = []
+        last_seq = 0
+        for segment in segments:
+            if segment[0] > last_seq:
+                selected_segments.append(segment)
+                last_seq = segment[1]
+        return selected_segments
+
+    def _read_segment(self, segment_path: str) -> dict:
+        if segment_path not in _SEGMENTS:
+            with open(segment_path, "r", encoding="utf-8") as f:
+                _SEGMENTS[segment_path] = json.load(f)
+        return _SEGMENTS[segment_path]
+
+
+def _get_text_answers(record: dict) -> Dict[str, str]:
+    """Return the text answers of a submission by question column name"""
+    text_answers = {}
+    for question in record["questions"]:
+        answer = question.get("answer")
+        if isinstance(answer, list):
+            answer = ", ".join(str(value) for value in answer)
+        if isinstance(answer, str) and answer:
+            text_answers[get_question_column_name(question.get("section", ""), question["question"])] = answer
+    return text_answers
+
+
+def _highlight(text: str, terms: set) -> str:
+    """Return the part of `text` around the first matched term, with the matched words in bold (markdown)"""
+    matches = [match for match in _WORD_REGEX.finditer(text) if terms.intersection(tokenize(match.group()))]
+    start = max(matches[0].start() - SNIPPET_CONTEXT, 0)
+    end = min(matches[0].end() + 3 * SNIPPET_CONTEXT, len(text))
+
+    snippet = []
+    position = start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        snippet.append(_escape_markdown(text[position:match.start()]))
+        snippet.append(f"**{_escape_markdown(match.group())}**")
+        position = match.end()
+    snippet.append(_escape_markdown(text[position:end]))
+    return ("…" if start > 0 else "") + "".join(snippet) + ("…" if end < len(text) else "")
+
+
+def _escape_markdown(text: str) -> str:
+    return re.sub(r"([\\`*_\[\]#<>|~])", r"\\\1", text.replace("\n", " "))
@@ -0,0 +1,58 @@
+import os
+import urllib.request
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Maximum width of the form page (60rem), the banner is never displayed larger
+BANNER_MAX_WIDTH = 960
+BANNER_QUALITY = 80
+BANNER_FILE_NAME = "banner.webp"
+# Name of the banner resource added to the app, the app finds it among its sources by this name
+BANNER_RESOURCE_NAME = "Banner"
+DOWNLOAD_TIMEOUT = 10
+
+
+def optimize_banner(image_path: str, output_dir: str, max_width: int = BANNER_MAX_WIDTH) -> str:
+    """Downscale the banner image to `max_width` and recompress it in WebP.
+
+    Return the path of the optimized banner, or None if the file is not an image Pillow can read
+    (e.g. a SVG file) in which case the original file should be used as is.
+    """
+    try:
+        with Image.open(image_path) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.width > max_width:
+                height = round(image.height * max_width / image.width)
+                image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+            output_path = os.path.join(output_dir, BANNER_FILE_NAME)
+            image.save(output_path, format="WEBP", quality=BANNER_QUALITY, method=6)
+    except (UnidentifiedImageError, OSError):
+        return None
+
+    # keep the original if it was already smaller (e.g. a small well compressed png)
+    if os.path.getsize(output_path) >= os.path.getsize(image_path):
+        os.remove(output_path)
+        return None
+    return output_path
+
+
+def download_banner(url: str, output_dir: str) -> str:
+    """Download the banner at `url`, return the downloaded file path or None if the download failed"""
+    output_path = os.path.join(output_dir, "banner_original")
+    try:
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response, open(output_path, "wb") as f:
+            f.write(response.read())
+    except (OSError, ValueError):
+        return None
+    return output_path
+
+
+def find_banner_path(resources: list) -> str:
+    """Return the path of the banner resource among the sources of an app, or None if the app has none"""
+    for resource in resources:
+        if getattr(resource, "name", None) == BANNER_RESOURCE_NAME:
+            return resource.path
+    return None
@@ -13,6 +13,7 @@ from gws_core import (
     JSONDict,
     OutputSpec,
     OutputSpecs,
+    ResourceSet,
     StreamlitResource,
     StrParam,
     Task,
@@ -24,6 +25,16 @@ from gws_core import (
     app_decorator,
     task_decorator,
 )
+from gws_forms.dashboard._form_dashboard_code.session_management.form_registry import (
+    create_form_id,
+    write_form_definition,
+)
+from gws_forms.dashboard.banner_optimizer import (
+    BANNER_RESOURCE_NAME,
+    download_banner,
+    optimize_banner,
+)
+from gws_forms.form_conditions.form_conditions import compile_dependency_graph
 
 
 @app_decorator("GenerateFormsDashboard", app_type=AppType.STREAMLIT)
@@ -34,6 +45,33 @@ class GenerateFormsDashboard(AppConfig):
         return os.path.join(os.path.abspath(os.path.dirname(__file__)), "_form_dashboard_code")
 
 
+def prepare_banner(task: Task, banner: File | Text) -> File | None:
+    """Downscale and recompress the banner once, so the app does not serve the original asset"""
+    tmp_dir = task.create_tmp_dir()
+    if isinstance(banner, File):
+        original_path = banner.path
+    else:
+        # the banner is an url, download it so it is served by the app
+        original_path = download_banner(banner.get_data(), tmp_dir)
+        if original_path is None:
+            task.log_warning_message("The banner could not be downloaded, the url will be used as is")
+            return None
+
+    banner_path = optimize_banner(original_path, tmp_dir)
+    if banner_path is None:
+        task.log_info_message("The banner is used without optimization")
+        if isinstance(banner, File):
+            return None
+        banner_path = original_path
+    else:
+        task.log_info_message(
+            f"Banner optimized from {os.path.getsize(original_path)} to {os.path.getsize(banner_path)} bytes")
+
+    banner_file = File(banner_path)
+    banner_file.name = BANNER_RESOURCE_NAME
+    return banner_file
+
+
 @task_decorator(
     "StreamlitFormsDashbaordGenerator",
     human_name="Forms dashboard",
@@ -82,6 +120,7 @@ class StreamlitFormsDashbaordGenerator(Task):
     def run(self, params: ConfigParams, inputs: TaskInputs) -> TaskOutputs:
 
         banner = inputs.get("banner")
+        banner_file = prepare_banner(self, banner)
         if isinstance(banner, File):
             banner = banner.path
         elif isinstance(banner, Text):
@@ -95,8 +134,13 @@ class StreamlitFormsDashbaordGenerator(Task):
 
         # set the input in the streamlit resource
         questions_file: JSONDict = inputs.get("questions_file")
+        # compile the question conditions once, the app only re-renders the dependents of a changed answer
+        params["dependency_graph"] = compile_dependency_graph(questions_file.get_data()["questions"])
         streamlit_resource.add_resource(questions_file, create_new_resource=False)
         streamlit_resource.add_resource(folder_sessions, create_new_resource=True)
+        # the optimized banner is served by the app, the original banner is only used as fallback
+        if banner_file is not None:
+            streamlit_resource.add_resource(banner_file, create_new_resource=True)
         params["banner"] = banner
         streamlit_resource.set_params(params)
         # set the app folder
@@ -104,3 +148,100 @@ class StreamlitFormsDashbaordGenerator(Task):
 
         # build the streamlit responses app resource with the code and the resources
         return {"streamlit_form_app": streamlit_resource}
+
+
+@task_decorator(
+    "StreamlitMultiFormsDashboardGenerator",
+    human_name="Multi forms dashboard",
+    short_description="Task to generate a single Streamlit dashboard hosting several forms",
+    style=TypingStyle.material_icon(
+        material_icon_name="dynamic_feed", background_color="#413ebb"
+    ),
+)
+class StreamlitMultiFormsDashboardGenerator(Task):
+    """
+    StreamlitMultiFormsDashboardGenerator is a task that generates one Streamlit dashboard hosting several forms,
+    so all the forms are served by the same app process.
+
+    Each form is routed by its id with the `form` query parameter of the app url, the app home page lists the forms.
+    The form definitions are stored once in the Answers folder, they are loaded by the app when a form is opened
+    and shared by all the respondents of the form. Each form has its own folder for its answers.
+
+    Input :  a ResourceSet of JSONDict containing the questions of each form. The title and the description of a
+    form are read from the `title` and `description` keys of its JSONDict, the resource name is used by default.
+    Output : a Streamlit app.
+
+    """
+
+    input_specs: InputSpecs = InputSpecs(
+        {
+            "questions_files": InputSpec(ResourceSet, human_name="Set of JSONDict containing the questions"),
+            "banner": InputSpec([File, Text], human_name="Banner", optional=True),
+        }
+    )
+    output_specs: OutputSpecs = OutputSpecs(
+        {"streamlit_form_app": OutputSpec(StreamlitResource, human_name="Streamlit Forms app")}
+    )
+    config_specs: ConfigSpecs = ConfigSpecs(
+        {
+            "title": StrParam(
+                human_name="Title", short_description="Title of the forms home page", optional=False
+            ),
+            "description": TextParam(
+                human_name="Description",
+                short_description="Description of the forms home page",
+                optional=False,
+            ),
+            "results_visible": BoolParam(
+                human_name="Results visible",
+                short_description="If True, users will be able to see all results of the forms",
+                default_value=True,
+            ),
+        }
+    )
+
+    def run(self, params: ConfigParams, inputs: TaskInputs) -> TaskOutputs:
+
+        folder_sessions: Folder = Folder(self.create_tmp_dir())
+        folder_sessions.name = "Answers"
+
+        # store each form definition in its own folder, the app only loads the opened forms
+        questions_files: ResourceSet = inputs.get("questions_files")
+        forms = []
+        for name, questions_file in questions_files.get_resources().items():
+            if not isinstance(questions_file, JSONDict):
+                self.log_warning_message(f"Resource '{name}' is not a JSONDict, it is ignored")
+                continue
+            data = questions_file.get_data()
+            form_id = create_form_id(name, [form["id"] for form in forms])
+            form = {
+                "id": form_id,
+                "title": data.get("title") or name,
+                "description": data.get("description", ""),
+            }
+            write_form_definition(folder_sessions.path, form_id, {
+                **form,
+                "questions": data["questions"],
+                "dependency_graph": compile_dependency_graph(data["questions"]),
+            })
+            forms.append(form)
+        self.log_info_message(f"{len(forms)} form(s) hosted by the app")
+
+        streamlit_resource = StreamlitResource()
+        streamlit_resource.add_resource(folder_sessions, create_new_resource=True)
+
+        banner = inputs.get("banner")
+        if banner is not None:
+            banner_file = prepare_banner(self, banner)
+            if banner_file is not None:
+                streamlit_resource.add_resource(banner_file, create_new_resource=True)
+            params["banner"] = banner.path if isinstance(banner, File) else banner.get_data()
+        else:
+            params["banner"] = None
+        params["multi_form"] = True
+        params["forms"] = forms
+        streamlit_resource.set_params(params)
+        # the same app as the single form dashboard, it switches to multi form mode with the params
+        streamlit_resource.set_app_config(GenerateFormsDashboard())
+
+        return {"streamlit_form_app": streamlit_resource}
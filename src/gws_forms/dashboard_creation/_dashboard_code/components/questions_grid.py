@@ -0,0 +1,156 @@
+import json
+from typing import Tuple
+
+import pandas as pd
+import streamlit as st
+
+# Columns of the grid, in display order
+GRID_COLUMNS = [
+    "section",
+    "subsection",
+    "question_head",
+    "question",
+    "helper_text",
+    "response_type",
+    "required",
+    "allowed_values",
+    "multiselect",
+    "min_value",
+    "max_value",
+]
+RESPONSE_TYPES = ["long_text", "short_text", "option", "numeric"]
+GRID_HEIGHT = 500
+
+
+def question_to_row(question: dict) -> dict:
+    row = {column: question.get(column) for column in GRID_COLUMNS}
+    # lists are edited as comma-separated text in the grid
+    row["allowed_values"] = ",".join(question.get("allowed_values") or [])
+    for column in ["required", "multiselect"]:
+        row[column] = bool(question.get(column))
+    return row
+
+
+def questions_to_rows(questions: list) -> pd.DataFrame:
+    return pd.DataFrame([question_to_row(question) for question in questions], columns=GRID_COLUMNS)
+
+
+def row_to_question(row: dict, question: dict) -> dict:
+    updated_question = dict(question)
+    for column in GRID_COLUMNS:
+        if column in ["allowed_values", "required", "multiselect"]:
+            continue
+        value = row.get(column)
+        # the grid returns NaN for the emptied numeric cells
+        if isinstance(value, float) and pd.isna(value):
+            value = None
+        if value is None and column not in question:
+            continue
+        updated_question[column] = value
+    allowed_values = [value for value in (row.get("allowed_values") or "").split(",") if value != ""]
+    if allowed_values or "allowed_values" in question:
+        updated_question["allowed_values"] = allowed_values
+    for column in ["required", "multiselect"]:
+        if row.get(column) or column in question:
+            updated_question[column] = bool(row.get(column))
+    return updated_question
+
+
+def apply_row_deltas(questions: list, deltas: dict) -> Tuple[int, bool]:
+    """Apply the changes made in the grid to `questions`.
+
+    `deltas` is the state of the grid editor : the edited cells by row position ("edited_rows"), the added
+    rows ("added_rows") and the positions of the deleted rows ("deleted_rows"), the positions being those
+    of the rows given to the editor. Only these rows are read. The added rows without question are skipped
+    until their question is filled.
+    Return the number of updated questions and whether questions were added or deleted, the positions
+    of the grid rows no longer match the questions then.
+    """
+    updated_count = 0
+    for position, cells in deltas.get("edited_rows", {}).items():
+        index = int(position)
+        if index >= len(questions):
+            continue
+        # the edits are cumulative, applying the same edits again does not change the question
+        updated_question = row_to_question({**question_to_row(questions[index]), **cells}, questions[index])
+        if updated_question != questions[index]:
+            questions[index] = updated_question
+            updated_count += 1
+
+    deleted_indexes = sorted({int(position) for position in deltas.get("deleted_rows", [])}, reverse=True)
+    for index in deleted_indexes:
+        if index < len(questions):
+            del questions[index]
+    added_rows = [row for row in deltas.get("added_rows", []) if row.get("question")]
+    for row in added_rows:
+        questions.append(row_to_question({"response_type": "short_text", **row}, {}))
+    return updated_count, bool(deleted_indexes or added_rows)
+
+
+def bump_questions_version(reload_grid: bool = True):
+    """Mark the questions as modified, derived data (grid rows, download payload) is cached per version.
+
+    `reload_grid` must be True when the questions were modified outside of the grid, so the grid
+    is rebuilt with the new rows.
+    """
+    st.session_state["questions_version"] = st.session_state.get("questions_version", 0) + 1
+    if reload_grid:
+        st.session_state["questions_grid_version"] = st.session_state.get("questions_grid_version", 0) + 1
+
+
+def _apply_grid_changes(grid_key: str, questions: list):
+    updated_count, rows_changed = apply_row_deltas(questions, st.session_state[grid_key])
+    if updated_count > 0 or rows_changed:
+        # after an edit the grid already shows the edited values, it does not need to be rebuilt
+        bump_questions_version(reload_grid=rows_changed)
+
+
+def show_questions_grid(questions: list):
+    """Show the questions in an editable grid.
+
+    The grid only renders the visible rows and only the rows changed in the grid are written back to
+    `questions`, from the changes kept by the editor in the session state.
+    """
+    grid_version = st.session_state.get("questions_grid_version", 0)
+    cached_rows = st.session_state.get("questions_grid_rows")
+    if cached_rows is None or cached_rows[0] != grid_version:
+        cached_rows = (grid_version, questions_to_rows(questions))
+        st.session_state["questions_grid_rows"] = cached_rows
+
+    grid_key = f"questions_grid_{grid_version}"
+    st.data_editor(
+        cached_rows[1],
+        column_config={
+            "response_type": st.column_config.SelectboxColumn(options=RESPONSE_TYPES),
+            "required": st.column_config.CheckboxColumn(),
+            "multiselect": st.column_config.CheckboxColumn(),
+            "min_value": st.column_config.NumberColumn(),
+            "max_value": st.column_config.NumberColumn(),
+        },
+        height=GRID_HEIGHT,
+        hide_index=True,
+        num_rows="dynamic",
+        key=grid_key,
+        on_change=_apply_grid_changes,
+        args=(grid_key, questions),
+    )
+
+
+def show_questions_download(questions: list):
+    """Build the JSON download payload only when requested, and only once per version of the questions"""
+    version = st.session_state.get("questions_version", 0)
+    cached_payload = st.session_state.get("questions_download")
+
+    if cached_payload is None or cached_payload[0] != version:
+        if st.button("Prepare questions JSON download"):
+            cached_payload = (version, json.dumps({"questions": questions}, indent=4))
+            st.session_state["questions_download"] = cached_payload
+        else:
+            return
+
+    st.download_button(
+        label="Download Questions JSON",
+        data=cached_payload[1],
+        file_name="questions.json",
+        mime="application/json",
+    )
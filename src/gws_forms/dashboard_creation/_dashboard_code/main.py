@@ -1,5 +1,6 @@
-import json
+import math
 import os
+from datetime import datetime
 
 import streamlit as st
 from gws_core import FrontService, JSONDict, ResourceModel, ResourceOrigin
@@ -8,10 +9,18 @@ from gws_streamlit_main import StreamlitMainState
 # Initialize GWS - MUST be at the top
 StreamlitMainState.initialize()
 
+from gws_forms.dashboard_creation._dashboard_code.components.questions_grid import (
+    bump_questions_version,
+    show_questions_download,
+    show_questions_grid,
+)
 from gws_forms.dashboard_creation._dashboard_code.session_management.session_functions import (
+    delete_session,
+    list_session_versions,
     list_sessions,
     load_session,
     save_current_session,
+    save_session_version,
 )
 
 sources = StreamlitMainState.get_sources()
@@ -22,6 +31,9 @@ params = StreamlitMainState.get_params()
 
 folder_path_session = sources[0].path
 
+# Number of sessions listed per page in the session picker
+SESSIONS_PAGE_SIZE = 20
+
 # Create a directory for saving sessions if it doesn't exist
 SESSIONS_DIR = os.path.join(folder_path_session, "saved_sessions")
 if not os.path.exists(SESSIONS_DIR):
@@ -73,6 +85,242 @@ def clear_fields():
     st.session_state["Response_type"] = "long_text"
 
 
+def format_session_entry(entry: dict) -> str:
+    modified = datetime.fromtimestamp(entry["modified_time"]).strftime("%d-%m-%Y %H:%M")
+    return (
+        f"{entry['owner']} - {entry['question_count']} questions - "
+        f"modified {modified} - {entry['size'] / 1024:.1f} kB"
+    )
+
+
+# Function to pick a previous session in the sorted, searchable and paginated list of sessions
+def select_session():
+    search = st.text_input(
+        label="Search a previous session", placeholder="Name of the owner or of the session"
+    )
+    session_entries = list_sessions(session_directory=SESSIONS_DIR, search=search)
+    if not session_entries:
+        if search:
+            st.write("No session found.")
+        return None
+
+    page_count = math.ceil(len(session_entries) / SESSIONS_PAGE_SIZE)
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Page (out of {page_count})", min_value=1, max_value=page_count, step=1)
+    page_entries = {
+        entry["name"]: entry
+        for entry in session_entries[(page - 1) * SESSIONS_PAGE_SIZE : page * SESSIONS_PAGE_SIZE]
+    }
+    return st.selectbox(
+        "Select a previous session to load it.",
+        options=list(page_entries.keys()),
+        format_func=lambda name: format_session_entry(page_entries[name]),
+        index=None,
+    )
+
+
+# The session picker, the builder form, the save buttons and the question list are fragments :
+# a widget only reruns the fragment it belongs to. The whole app is only rerun when the questions
+# are replaced (a session is loaded) or a question is added.
+
+
+@st.fragment
+def show_session_picker():
+    # User choice: new session or continue previous one
+    session_choice = select_session()
+    if session_choice:
+        # Each save of a session is kept as a version, the last one is loaded by default
+        versions = {
+            version["version"]: version
+            for version in list_session_versions(session_name=session_choice, session_directory=SESSIONS_DIR)
+        }
+        version_choice = st.selectbox(
+            "Version",
+            options=list(reversed(versions.keys())),
+            format_func=lambda v: f"Version {v} - saved {versions[v]['timestamp']}",
+        )
+        # Load the data only the first time a session version is selected
+        if st.session_state.get("loaded_session") != (session_choice, version_choice):
+            saved_answers = load_session(
+                session_name=session_choice, session_directory=SESSIONS_DIR, version=version_choice
+            )
+            st.session_state.loaded_session = (session_choice, version_choice)
+            st.session_state.draft_id = session_choice
+            st.session_state.questions = saved_answers.get("questions", [])
+            st.session_state["Name_user"] = saved_answers.get("owner", "")
+            bump_questions_version()
+            # the builder, the buttons and the question list show the loaded questions
+            st.rerun(scope="app")
+    elif "loaded_session" in st.session_state:
+        # The selection was cleared : the next save creates a new session instead of a version of the last one
+        del st.session_state.loaded_session
+        st.session_state.pop("draft_id", None)
+
+    # User name
+    st.text_input(label="Enter a name", placeholder="Enter a response", key="Name_user")
+
+
+@st.fragment
+def show_question_builder():
+    st.write("**Create a new question**")
+    # Initiate values
+    min_value = None
+    max_value = None
+    allowed_values = None
+
+    # Input fields for question details
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        section = st.text_input(
+            label="Section", placeholder="Enter a section name", key="Section"
+        )
+    with col2:
+        st.text_input(
+            label="Subsection", placeholder="Enter a subsection name", key="Subsection"
+        )
+    with col3:
+        st.text_input(
+            label="Question_head",
+            placeholder="Enter a keyword for your question",
+            key="Question_head",
+        )
+    question = st.text_input(label="Question", placeholder="Enter the question", key="Question")
+    st.text_input(
+        "Helper Text", placeholder="Provide some context for the question", key="Helper_text"
+    )
+    st.checkbox("Is this question required?", key="Is_required")
+
+    response_type = st.selectbox(
+        "Response Type", ["long_text", "short_text", "option", "numeric"], key="Response_type"
+    )
+    if response_type == "option":
+        allowed_values = st.text_area(
+            "Allowed Values (comma-separated)",
+            placeholder="e.g., Yes, No, Maybe",
+            key="Allowed_values",
+        )
+        st.checkbox("Allow Multiple Selections", key="Multi_select")
+    if response_type == "numeric":
+        min_value = st.number_input("Minimum Value", key="Min_value")
+        max_value = st.number_input("Maximum Value", key="Max_value")
+
+    if section == "" or question == "" or allowed_values == "":
+        submit_disabled = True
+        st.write(":red[Please complete all the fields]")
+    else:
+        submit_disabled = False
+
+    if "question_added" in st.session_state:
+        st.success(f"Question {st.session_state.pop('question_added') + 1} added!")
+
+    # Submit button to add the question
+    if st.button("Submit Question", disabled=submit_disabled, on_click=clear_fields):
+        question = {
+            "section": st.session_state["section"],
+            "subsection": st.session_state["subsection"],
+            "question_head": st.session_state["question_head"],
+            "question": st.session_state["question"],
+            "response_type": st.session_state["response_type"],
+            "allowed_values": st.session_state["allowed_values"].split(",")
+            if "allowed_values" in st.session_state
+            else [],
+            "multiselect": st.session_state["multi_select"]
+            if "multi_select" in st.session_state
+            else False,
+            "min_value": st.session_state["min_value"]
+            if "min_value" in st.session_state
+            else None,
+            "max_value": st.session_state["max_value"]
+            if "max_value" in st.session_state
+            else None,
+            "required": st.session_state["is_required"],
+            "helper_text": st.session_state["helper_text"],
+        }
+        # Store question in the dictionary with an index as the key
+        index = len(st.session_state.questions)  # next index
+        st.session_state.questions.append(question)
+        bump_questions_version()
+        st.session_state["question_added"] = index
+        # the buttons and the question list show the new question
+        st.rerun(scope="app")
+
+
+@st.fragment
+def show_session_actions():
+    name_user = st.session_state.get("Name_user", "")
+
+    if "session_action_message" in st.session_state:
+        st.success(st.session_state.pop("session_action_message"))
+
+    # Save button
+    st.write("Save the session to complete your questions later.")
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col2:
+        if st.button("Save session", use_container_width=True, key="save_end"):
+            # Save a new version of the session, the previous versions are kept
+            st.session_state.draft_id = save_session_version(
+                questions=st.session_state.questions,
+                session_directory=SESSIONS_DIR,
+                name_user=name_user,
+                session_name=st.session_state.get("draft_id"),
+            )
+            if "loaded_session" in st.session_state:
+                # the picker selects the new version, it has the questions already shown
+                versions = list_session_versions(
+                    session_name=st.session_state.draft_id, session_directory=SESSIONS_DIR
+                )
+                st.session_state.loaded_session = (st.session_state.draft_id, versions[-1]["version"])
+            st.session_state["session_action_message"] = "Session saved !"
+            # the session picker lists the saved session
+            st.rerun(scope="app")
+
+    # Submit button
+    st.write(
+        "Submit the form when finished. Please note that after submission, the form can no longer be edited."
+    )
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col2:
+        if st.button("Submit", type="primary", use_container_width=True):
+            save_current_session(
+                questions=st.session_state.questions,
+                session_directory=SESSIONS_SUBMITTED_DIR,
+                name_user=name_user,
+            )
+            # Delete the saved session and its versions if it's not a new session
+            if st.session_state.get("draft_id"):
+                delete_session(
+                    session_name=st.session_state.draft_id, session_directory=SESSIONS_DIR
+                )
+                del st.session_state.draft_id
+            # Create a Json Dict
+            json_dict: JSONDict = JSONDict()
+            json_dict.data = {"questions": st.session_state.questions}
+            json_resource = ResourceModel.save_from_resource(
+                json_dict, ResourceOrigin.UPLOADED, flagged=True
+            )
+
+            st.session_state["session_action_message"] = (
+                f"Form successfully submitted! A JsonDict Resource has been created : {FrontService().get_resource_url(json_resource.id)}"
+            )
+            # the session picker no longer lists the deleted session
+            st.rerun(scope="app")
+
+
+@st.fragment
+def show_questions_list():
+    # Display the submitted questions
+    if st.session_state.questions:
+        # Download JSON button, the payload is only built when requested
+        show_questions_download(st.session_state.questions)
+
+        # Editable grid of the questions, only the visible rows are rendered
+        show_questions_grid(st.session_state.questions)
+
+    else:
+        st.write("No questions submitted yet.")
+
+
 # Function to show content in tabs
 
 
@@ -81,183 +329,17 @@ def show_content():
     tab_creation, tab_questions = st.tabs(["Create a new question", "Submitted questions"])
 
     with tab_creation:
-        # User choice: new session or continue previous one
-        session_list = list_sessions(session_directory=SESSIONS_DIR)
-        session_choice = (
-            st.selectbox("Select a previous session to load it.", options=session_list, index=None)
-            if session_list
-            else None
-        )
-        if session_choice:
-            session_choice = session_choice + ".json"
-            # Load previous answers if available
-            saved_answers = (
-                load_session(session_name=session_choice, session_directory=SESSIONS_DIR)
-                if session_choice
-                else {}
-            )
-            # Initialize session state to store the first time to load data
-            if "load_data" not in st.session_state:
-                st.session_state.load_data = []
-                st.session_state.questions = saved_answers.get("questions", [])
-
-        # User name
-        name_user = st.text_input(
-            label="Enter a name",
-            placeholder="Enter a response",
-            value=session_choice.split("-")[1] if session_choice else "",
-        )
+        show_session_picker()
         st.markdown("---")
 
-        st.write("**Create a new question**")
-        # Initiate values
-        multi_select = False
-        min_value = None
-        max_value = None
-        allowed_values = None
-
-        # Input fields for question details
-        col1, col2, col3 = st.columns([1, 1, 1])
-        with col1:
-            section = st.text_input(
-                label="Section", placeholder="Enter a section name", key="Section"
-            )
-        with col2:
-            subsection = st.text_input(
-                label="Subsection", placeholder="Enter a subsection name", key="Subsection"
-            )
-        with col3:
-            question_head = st.text_input(
-                label="Question_head",
-                placeholder="Enter a keyword for your question",
-                key="Question_head",
-            )
-        question = st.text_input(label="Question", placeholder="Enter the question", key="Question")
-        helper_text = st.text_input(
-            "Helper Text", placeholder="Provide some context for the question", key="Helper_text"
-        )
-        is_required = st.checkbox("Is this question required?", key="Is_required")
-
-        response_type = st.selectbox(
-            "Response Type", ["long_text", "short_text", "option", "numeric"], key="Response_type"
-        )
-        if response_type == "option":
-            allowed_values = st.text_area(
-                "Allowed Values (comma-separated)",
-                placeholder="e.g., Yes, No, Maybe",
-                key="Allowed_values",
-            )
-            multi_select = st.checkbox("Allow Multiple Selections", key="Multi_select")
-        if response_type == "numeric":
-            min_value = st.number_input("Minimum Value", key="Min_value")
-            max_value = st.number_input("Maximum Value", key="Max_value")
-
-        if section == "" or question == "" or allowed_values == "":
-            submit_disabled = True
-            st.write(":red[Please complete all the fields]")
-        else:
-            submit_disabled = False
-
-        # Submit button to add the question
-        if st.button("Submit Question", disabled=submit_disabled, on_click=clear_fields):
-            question = {
-                "section": st.session_state["section"],
-                "subsection": st.session_state["subsection"],
-                "question_head": st.session_state["question_head"],
-                "question": st.session_state["question"],
-                "response_type": st.session_state["response_type"],
-                "allowed_values": st.session_state["allowed_values"].split(",")
-                if "allowed_values" in st.session_state
-                else [],
-                "multiselect": st.session_state["multi_select"]
-                if "multi_select" in st.session_state
-                else False,
-                "min_value": st.session_state["min_value"]
-                if "min_value" in st.session_state
-                else None,
-                "max_value": st.session_state["max_value"]
-                if "max_value" in st.session_state
-                else None,
-                "required": st.session_state["is_required"],
-                "helper_text": st.session_state["helper_text"],
-            }
-            # Store question in the dictionary with an index as the key
-            index = len(st.session_state.questions)  # next index
-            st.session_state.questions.append(question)
-            st.success(f"Question {index + 1} added!")
+        show_question_builder()
 
         if st.session_state.questions:
             st.markdown("---")
-
-            # Save button
-            st.write("Save the session to complete your questions later.")
-            col1, col2, col3 = st.columns([1, 1, 1])
-            with col2:
-                if st.button("Save session", use_container_width=True, key="save_end"):
-                    save_current_session(
-                        questions=st.session_state.questions,
-                        session_directory=SESSIONS_DIR,
-                        name_user=name_user,
-                    )
-                    # Delete the file where the session was saved if it's not a new session
-                    if session_choice:
-                        session_path = os.path.join(SESSIONS_DIR, session_choice)
-                        # Check if the file exists and delete it
-                        if os.path.exists(session_path):
-                            os.remove(session_path)
-                    st.success("Session saved !")
-
-            # Submit button
-            st.write(
-                "Submit the form when finished. Please note that after submission, the form can no longer be edited."
-            )
-            col1, col2, col3 = st.columns([1, 1, 1])
-            with col2:
-                if st.button("Submit", type="primary", use_container_width=True):
-                    save_current_session(
-                        questions=st.session_state.questions,
-                        session_directory=SESSIONS_SUBMITTED_DIR,
-                        name_user=name_user,
-                    )
-                    # Delete the file where the session was saved if it's not a new session
-                    if session_choice:
-                        session_path = os.path.join(SESSIONS_DIR, session_choice)
-                        # Check if the file exists and delete it
-                        if os.path.exists(session_path):
-                            os.remove(session_path)
-                    # Create a Json Dict
-                    json_dict: JSONDict = JSONDict()
-                    json_dict.data = {"questions": st.session_state.questions}
-                    json_resource = ResourceModel.save_from_resource(
-                        json_dict, ResourceOrigin.UPLOADED, flagged=True
-                    )
-
-                    st.success(
-                        f"Form successfully submitted! A JsonDict Resource has been created : {FrontService().get_resource_url(json_resource.id)}"
-                    )
+            show_session_actions()
 
     with tab_questions:
-        # Display the submitted questions
-        if st.session_state.questions:
-            # Download JSON button
-            formatted_questions = {"questions": st.session_state.questions}
-            # Convert questions to JSON
-            json_data = json.dumps(formatted_questions, indent=4)
-            st.download_button(
-                label="Download Questions JSON",
-                data=json_data,
-                file_name="questions.json",
-                mime="application/json",
-            )
-
-            idx = 0
-            for question in st.session_state.questions:
-                st.write(f"**Question {idx + 1}:**")
-                st.json(question)
-                idx += 1
-
-        else:
-            st.write("No questions submitted yet.")
+        show_questions_list()
 
 
 # ""
@@ -0,0 +1,261 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock, write_json_atomic
+from gws_forms.dashboard_creation._dashboard_code.session_management.session_manifest import SessionManifest
+
+# Last saved version of each draft, so a save only has to compute a diff against memory
+_HEAD_CACHE: Dict[str, Tuple[int, list]] = {}
+
+
+class DraftStore:
+    """Versioned store of the drafts (saved sessions) of the creation dashboard.
+
+    Each draft is a folder containing :
+    - `draft.json` : owner, dates, head version, list of snapshot versions and save date of each version
+    - `snapshot-{version}.json` : full copy of the questions at a given version
+    - `diffs-{snapshot}.jsonl` : one line per version saved after the snapshot, containing only
+      the changes with the previous version
+
+    A save appends a diff line, a new snapshot is written every `rebase_interval` versions so
+    restoring any version never replays more than `rebase_interval` diffs. The saves of a draft are
+    serialized with the lock file `draft.lock`, so two sessions saving the same draft never lose a version.
+    """
+
+    REBASE_INTERVAL = 20
+    META_FILE = "draft.json"
+    LOCK_FILE = "draft.lock"
+
+    directory: str
+    rebase_interval: int
+
+    def __init__(self, directory: str, rebase_interval: int = REBASE_INTERVAL):
+        self.directory = directory
+        self.rebase_interval = rebase_interval
+
+    ####################################### WRITE #######################################
+
+    def create_draft_id(self, owner: str, key: str = None) -> str:
+        """Return a new draft id, or the id of the draft created from `key` (e.g. an imported file name)"""
+        owner_slug = re.sub(r"[^a-zA-Z0-9]+", "_", owner).strip("_") or "draft"
+        suffix = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8] if key is not None else uuid.uuid4().hex[:8]
+        return f"{owner_slug}-{suffix}"
+
+    def save(self, draft_id: str, questions: list, owner: str) -> int:
+        """Save a new version of the draft and return its version number"""
+        draft_path = self._draft_path(draft_id)
+        os.makedirs(draft_path, exist_ok=True)
+        with file_lock(os.path.join(draft_path, self.LOCK_FILE)):
+            version = self._save(draft_id, questions, owner)
+        SessionManifest(self.directory).update(draft_id, owner, len(questions))
+        return version
+
+    def _save(self, draft_id: str, questions: list, owner: str) -> int:
+        timestamp = _now()
+        draft_path = self._draft_path(draft_id)
+        meta = self.get_meta(draft_id)
+        if meta is None:
+            meta = {"owner": owner, "created_at": timestamp, "head": 0, "snapshots": [], "versions": []}
+
+        previous_version, previous_questions = self._get_head(draft_id, meta)
+        if previous_version > 0 and previous_questions == questions and meta["owner"] == owner:
+            return previous_version
+
+        version = previous_version + 1
+        last_snapshot = meta["snapshots"][-1] if meta["snapshots"] else None
+        if last_snapshot is None or version - last_snapshot >= self.rebase_interval:
+            self._write_json(os.path.join(draft_path, f"snapshot-{version:06d}.json"),
+                             {"version": version, "timestamp": timestamp, "questions": questions})
+            meta["snapshots"].append(version)
+        else:
+            diff = {"version": version, "timestamp": timestamp,
+                    "ops": compute_diff(previous_questions, questions)}
+            with open(self._diffs_path(draft_id, last_snapshot), "a", encoding="utf-8") as f:
+                f.write(json.dumps(diff, ensure_ascii=False) + "\n")
+
+        meta["versions"] = self._get_versions(draft_id, meta) + [{"version": version, "timestamp": timestamp}]
+        meta["owner"] = owner
+        meta["head"] = version
+        meta["modified_at"] = timestamp
+        self._write_json(os.path.join(draft_path, self.META_FILE), meta)
+        _HEAD_CACHE[draft_path] = (version, copy.deepcopy(questions))
+        return version
+
+    def delete(self, draft_id: str) -> None:
+        draft_path = self._draft_path(draft_id)
+        _HEAD_CACHE.pop(draft_path, None)
+        if os.path.exists(draft_path):
+            with file_lock(os.path.join(draft_path, self.LOCK_FILE)):
+                shutil.rmtree(draft_path)
+        SessionManifest(self.directory).remove(draft_id)
+
+    def rebuild_manifest(self) -> None:
+        """Create the manifest of the drafts saved before the manifest existed, or rebuild it after the
+        drafts folder was modified by hand (the entries of the deleted drafts are removed)"""
+        manifest = SessionManifest(self.directory)
+        draft_ids = self.list_draft_ids()
+        for draft_id in draft_ids:
+            meta = self.get_meta(draft_id)
+            manifest.update(draft_id, meta["owner"], len(self.load(draft_id)))
+        for entry in manifest.list_entries():
+            if entry["name"] not in draft_ids:
+                manifest.remove(entry["name"])
+
+    def import_legacy_files(self) -> int:
+        """Import the `session-{name}-{date}.json` files written before the draft store existed.
+
+        Each file becomes the first version of a new draft and is deleted. Return the number of imported files.
+        The id of the draft is computed from the file name, so a file imported again after an interrupted
+        import is saved to the same draft, without a new version.
+        """
+        legacy_files = [f for f in os.listdir(self.directory)
+                        if f.startswith("session-") and f.endswith(".json")]
+        for file_name in legacy_files:
+            file_path = os.path.join(self.directory, file_name)
+            with open(file_path, "r", encoding="utf-8") as f:
+                questions = json.load(f).get("questions", [])
+            # file name is session-{name}-{date}.json
+            owner = file_name[len("session-"):-len(".json")].rsplit("-", 2)[0]
+            self.save(self.create_draft_id(owner, key=file_name), questions, owner)
+            os.remove(file_path)
+        return len(legacy_files)
+
+    ####################################### READ #######################################
+
+    def list_draft_ids(self) -> List[str]:
+        return [f for f in os.listdir(self.directory)
+                if os.path.exists(os.path.join(self.directory, f, self.META_FILE))]
+
+    def get_meta(self, draft_id: str) -> Optional[dict]:
+        meta_path = os.path.join(self._draft_path(draft_id), self.META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_versions(self, draft_id: str) -> List[dict]:
+        """Return the version number and the save date of each version of the draft"""
+        meta = self.get_meta(draft_id)
+        if meta is None:
+            return []
+        return self._get_versions(draft_id, meta)
+
+    def load(self, draft_id: str, version: int = None) -> list:
+        """Return the questions of the given version of the draft (the last version by default)"""
+        meta = self.get_meta(draft_id)
+        if meta is None:
+            return []
+        if version is None or version == meta["head"]:
+            return copy.deepcopy(self._get_head(draft_id, meta)[1])
+        return self._restore(draft_id, meta, version)
+
+    ####################################### INTERNAL #######################################
+
+    def _get_head(self, draft_id: str, meta: dict) -> Tuple[int, list]:
+        if meta["head"] == 0:
+            return 0, []
+        cached_head = _HEAD_CACHE.get(self._draft_path(draft_id))
+        if cached_head is None or cached_head[0] != meta["head"]:
+            cached_head = (meta["head"], self._restore(draft_id, meta, meta["head"]))
+            _HEAD_CACHE[self._draft_path(draft_id)] = cached_head
+        return cached_head
+
+    def _get_versions(self, draft_id: str, meta: dict) -> List[dict]:
+        if "versions" in meta:
+            return [version for version in meta["versions"] if version["version"] <= meta["head"]]
+        # the drafts saved before the dates were kept in draft.json, until their next save
+        versions = []
+        for snapshot in meta["snapshots"]:
+            with open(self._snapshot_path(draft_id, snapshot), "r", encoding="utf-8") as f:
+                versions.append({"version": snapshot, "timestamp": json.load(f)["timestamp"]})
+            versions.extend({"version": diff["version"], "timestamp": diff["timestamp"]}
+                            for diff in self._read_diffs(draft_id, snapshot))
+        return [version for version in versions if version["version"] <= meta["head"]]
+
+    def _restore(self, draft_id: str, meta: dict, version: int) -> list:
+        # start from the closest snapshot and replay the diffs saved after it
+        snapshot = max((s for s in meta["snapshots"] if s <= version), default=None)
+        if snapshot is None:
+            return []
+        with open(self._snapshot_path(draft_id, snapshot), "r", encoding="utf-8") as f:
+            questions = json.load(f)["questions"]
+        for diff in self._read_diffs(draft_id, snapshot):
+            if diff["version"] > version:
+                break
+            questions = apply_diff(questions, diff["ops"])
+        return questions
+
+    def _read_diffs(self, draft_id: str, snapshot: int) -> List[dict]:
+        diffs_path = self._diffs_path(draft_id, snapshot)
+        if not os.path.exists(diffs_path):
+            return []
+        diffs = {}
+        with open(diffs_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    diff = json.loads(line)
+                    # a diff written by a save interrupted before updating the head is superseded
+                    diffs[diff["version"]] = diff
+        return [diffs[version] for version in sorted(diffs)]
+
+    def _draft_path(self, draft_id: str) -> str:
+        return os.path.join(self.directory, draft_id)
+
+    def _snapshot_path(self, draft_id: str, snapshot: int) -> str:
+        return os.path.join(self._draft_path(draft_id), f"snapshot-{snapshot:06d}.json")
+
+    def _diffs_path(self, draft_id: str, snapshot: int) -> str:
+        return os.path.join(self._draft_path(draft_id), f"diffs-{snapshot:06d}.jsonl")
+
+    def _write_json(self, path: str, data: dict) -> None:
+        # write in a temporary file first so a draft is never left half written
+        write_json_atomic(path, json.dumps(data, ensure_ascii=False))
+
+
+def compute_diff(old_questions: list, new_questions: list) -> list:
+    """Return the operations transforming `old_questions` into `new_questions`.
+
+    Only the modified fields of the modified questions are stored.
+    """
+    ops = []
+    for index in range(min(len(old_questions), len(new_questions))):
+        old_question, new_question = old_questions[index], new_questions[index]
+        if old_question == new_question:
+            continue
+        fields = {key: value for key, value in new_question.items()
+                  if key not in old_question or old_question[key] != value}
+        removed = [key for key in old_question if key not in new_question]
+        ops.append({"op": "update", "index": index, "fields": fields, "removed": removed})
+    if len(new_questions) > len(old_questions):
+        ops.append({"op": "append", "values": new_questions[len(old_questions):]})
+    elif len(new_questions) < len(old_questions):
+        ops.append({"op": "truncate", "length": len(new_questions)})
+    return ops
+
+
+def apply_diff(questions: list, ops: list) -> list:
+    questions = list(questions)
+    for op in ops:
+        if op["op"] == "update":
+            question = dict(questions[op["index"]])
+            question.update(op["fields"])
+            for key in op["removed"]:
+                question.pop(key, None)
+            questions[op["index"]] = question
+        elif op["op"] == "append":
+            questions.extend(op["values"])
+        elif op["op"] == "truncate":
+            del questions[op["length"]:]
+    return questions
+
+
+def _now() -> str:
+    return datetime.now(tz=pytz.timezone("Europe/Paris")).strftime("%d-%m-%Y %H:%M:%S")
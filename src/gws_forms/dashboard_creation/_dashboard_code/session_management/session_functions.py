@@ -3,20 +3,53 @@ import os
 from datetime import datetime
 
 import pytz
+from gws_forms.dashboard_creation._dashboard_code.session_management.draft_store import DraftStore
+from gws_forms.dashboard_creation._dashboard_code.session_management.session_manifest import SessionManifest
 
 
-# Function to load previous sessions (returns list of session filenames)
-def list_sessions(session_directory: str):
-    return [f.split(".json")[0] for f in os.listdir(session_directory) if f.endswith(".json")]
+# Directories already prepared by the current process
+_PREPARED_DIRECTORIES = set()
 
 
-# Function to load a specific session
-def load_session(session_name: str, session_directory: str):
-    session_path = os.path.join(session_directory, session_name)
-    if os.path.exists(session_path):
-        with open(session_path, "r") as f:
-            return json.load(f)
-    return {}
+# Function to list previous sessions (returns the manifest entries, most recently modified first)
+def list_sessions(session_directory: str, search: str = ""):
+    manifest = SessionManifest(session_directory)
+    if session_directory not in _PREPARED_DIRECTORIES:
+        draft_store = DraftStore(session_directory)
+        if not manifest.exists():
+            draft_store.rebuild_manifest()
+        # the sessions saved as single files before the draft store are converted to drafts
+        draft_store.import_legacy_files()
+        _PREPARED_DIRECTORIES.add(session_directory)
+    return manifest.list_entries(search)
+
+
+# Function to load a specific session, at its last version by default
+def load_session(session_name: str, session_directory: str, version: int = None):
+    draft_store = DraftStore(session_directory)
+    meta = draft_store.get_meta(session_name)
+    if meta is None:
+        return {}
+    return {"questions": draft_store.load(session_name, version), "owner": meta["owner"]}
+
+
+# Function to list the saved versions of a session
+def list_session_versions(session_name: str, session_directory: str):
+    return DraftStore(session_directory).list_versions(session_name)
+
+
+# Function to save a new version of a session, return the session name
+def save_session_version(questions, session_directory: str, name_user: str, session_name: str = None) -> str:
+    draft_store = DraftStore(session_directory)
+    if session_name is None:
+        session_name = draft_store.create_draft_id(name_user)
+    draft_store.save(session_name, questions, name_user)
+    return session_name
+
+
+# Function to delete a session and all its versions
+def delete_session(session_name: str, session_directory: str):
+    DraftStore(session_directory).delete(session_name)
 
 
 # Function to save the current session
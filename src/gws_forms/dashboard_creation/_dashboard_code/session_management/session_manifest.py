@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import file_lock, write_json_atomic
+
+# Content of each manifest file with the modification time it was read at
+_MANIFEST_CACHE: Dict[str, Tuple[float, dict]] = {}
+
+
+class SessionManifest:
+    """Index of the saved sessions of the creation dashboard, stored in `manifest.json`.
+
+    For each session the manifest keeps the owner, the last modification time, the number
+    of questions and the size on disk. It is updated when a session is saved or deleted so
+    the session picker never has to list the sessions directory. The updates are serialized with
+    the lock file `manifest.lock`, so two sessions saved at the same time are both listed.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+    LOCK_FILE = "manifest.lock"
+
+    directory: str
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def update(self, session_name: str, owner: str, question_count: int) -> None:
+        with file_lock(self._lock_path):
+            entries = self._read()
+            entries[session_name] = {
+                "owner": owner,
+                "modified_time": time.time(),
+                "question_count": question_count,
+                "size": self._get_session_size(session_name),
+            }
+            self._write(entries)
+
+    def remove(self, session_name: str) -> None:
+        with file_lock(self._lock_path):
+            entries = self._read()
+            if session_name in entries:
+                del entries[session_name]
+                self._write(entries)
+
+    def exists(self) -> bool:
+        return os.path.exists(self._manifest_path)
+
+    def list_entries(self, search: str = "") -> List[dict]:
+        """Return the sessions matching `search` (owner or session name), most recently modified first"""
+        search = search.strip().lower()
+        entries = [
+            {"name": name, **entry}
+            for name, entry in self._read().items()
+            if not search or search in name.lower() or search in entry["owner"].lower()
+        ]
+        entries.sort(key=lambda entry: entry["modified_time"], reverse=True)
+        return entries
+
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, self.MANIFEST_FILE)
+
+    @property
+    def _lock_path(self) -> str:
+        return os.path.join(self.directory, self.LOCK_FILE)
+
+    def _session_path(self, session_name: str) -> str:
+        return os.path.join(self.directory, session_name)
+
+    def _get_session_size(self, session_name: str) -> int:
+        with os.scandir(self._session_path(session_name)) as files:
+            return sum(f.stat().st_size for f in files if f.is_file())
+
+    def _read(self) -> dict:
+        if not self.exists():
+            return {}
+        # the manifest is only parsed again when it was modified
+        mtime = os.path.getmtime(self._manifest_path)
+        cached = _MANIFEST_CACHE.get(self._manifest_path)
+        if cached is None or cached[0] != mtime:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                cached = (mtime, json.load(f))
+            _MANIFEST_CACHE[self._manifest_path] = cached
+        return dict(cached[1])
+
+    def _write(self, entries: dict) -> None:
+        write_json_atomic(self._manifest_path, json.dumps(entries, ensure_ascii=False))
+        _MANIFEST_CACHE[self._manifest_path] = (os.path.getmtime(self._manifest_path), entries)
@@ -1,3 +1,6 @@
+import math
+import time
+
 import pandas as pd
 from gws_core import (
     ConfigSpecs,
@@ -14,6 +17,17 @@ from gws_core import (
     task_decorator,
 )
 
+# Columns of the Excel form file, in order
+EXCEL_FORM_COLUMNS = ['Section', 'Title', 'Question', 'Description', 'Response Type', 'Is Required',
+                      'Allowed Values', 'Min Value', 'Max Value', 'MultiSelect']
+# Optional columns defining the condition to show a question, see gws_forms.form_conditions
+EXCEL_FORM_CONDITION_COLUMNS = ['Condition Question', 'Condition Operator', 'Condition Value']
+# Share of the progress bar of each step : reading the file, then converting the rows
+READ_PROGRESS = 30
+CONVERT_PROGRESS = 95
+# Number of progress updates while converting the rows
+PROGRESS_UPDATES = 100
+
 
 @task_decorator("ExcelFormFileToJsonDict", human_name="Excel Form File to Json Dict",
                 short_description="Converts an Excel file containing form questions data to a JSON dictionary")
@@ -29,13 +43,19 @@ class ExcelFormFileToJsonDict(Task):
         excel_file_path = inputs['excel_file'].path
 
         # Read the Excel file into a DataFrame
+        self.update_progress_value(0, "Reading the Excel file")
+        start = time.perf_counter()
         df = pd.read_excel(excel_file_path)
+        read_time = time.perf_counter() - start
+        self.update_progress_value(READ_PROGRESS, f"{len(df)} rows read")
 
         # Create a list to hold the questions
         questions = []
+        start = time.perf_counter()
+        progress_interval = max(math.ceil(len(df) / PROGRESS_UPDATES), 1)
 
         # Iterate over the rows of the DataFrame
-        for _, row in df.iterrows():
+        for row_index, (_, row) in enumerate(df.iterrows()):
             question_dict = {
                 "section": row['Section'] if pd.notna(row['Section']) else "",
                 "title": row['Title'] if pd.notna(row['Title']) else "",
@@ -54,11 +74,37 @@ class ExcelFormFileToJsonDict(Task):
                 question_dict['max_value'] = row['Max Value']
             if pd.notna(row['MultiSelect']):
                 question_dict['multiselect'] = bool(row['MultiSelect'])
+            # Handle the optional condition columns, the question is shown only if the condition is satisfied
+            if 'Condition Question' in df.columns and pd.notna(row['Condition Question']):
+                question_dict['condition'] = self._read_condition(row)
 
             # Append the question to the list
             questions.append(question_dict)
+            if (row_index + 1) % progress_interval == 0 or row_index + 1 == len(df):
+                self.update_progress_value(
+                    READ_PROGRESS + (CONVERT_PROGRESS - READ_PROGRESS) * (row_index + 1) / len(df),
+                    f"{row_index + 1}/{len(df)} rows converted")
+        normalize_time = time.perf_counter() - start
 
         # Create the final dictionary
+        start = time.perf_counter()
         data = {"language": params['language'], "questions": questions}
+        json_dict = JSONDict(data)
+        build_time = time.perf_counter() - start
+
+        conditions_count = sum(1 for question in questions if 'condition' in question)
+        self.log_info_message(f"{len(df)} rows read, {len(questions)} questions built "
+                              f"({conditions_count} with a condition)")
+        self.log_info_message(f"Timing : read {read_time:.3f}s, normalize {normalize_time:.3f}s, "
+                              f"build {build_time:.3f}s")
+        return {'json_dict': json_dict}
 
-        return {'json_dict': JSONDict(data)}
+    def _read_condition(self, row) -> dict:
+        operator = row.get('Condition Operator')
+        operator = operator.strip() if isinstance(operator, str) else "equals"
+        value = row.get('Condition Value')
+        if pd.isna(value):
+            value = None
+        elif operator == "in" and isinstance(value, str):
+            value = [val.strip() for val in value.split(',')]
+        return {"question": row['Condition Question'], "operator": operator, "value": value}
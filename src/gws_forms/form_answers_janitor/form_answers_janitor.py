@@ -0,0 +1,153 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytz
+from gws_core import (
+    BoolParam,
+    ConfigSpecs,
+    Folder,
+    InputSpec,
+    InputSpecs,
+    IntParam,
+    OutputSpec,
+    OutputSpecs,
+    Table,
+    Task,
+    TaskInputs,
+    TaskOutputs,
+    TypingStyle,
+    task_decorator,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import write_json_atomic
+from gws_forms.dashboard._form_dashboard_code.session_management.form_registry import list_form_folders
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    SAVED_SESSIONS_DIR,
+    SESSION_TIMESTAMP_FORMAT,
+    SESSIONS_TOKEN_FILE,
+    SUBMITTED_SESSIONS_DIR,
+    get_draft_token,
+    iter_session_paths,
+    load_session,
+    remove_draft,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+
+
+@task_decorator("FormAnswersJanitor", human_name="Form answers janitor",
+                short_description="Removes the drafts of a forms dashboard that are submitted or abandoned",
+                style=TypingStyle.material_icon(material_icon_name="cleaning_services", background_color="#413ebb"))
+class FormAnswersJanitor(Task):
+    """
+    FormAnswersJanitor keeps the working set of an Answers folder generated by a forms dashboard small :
+    - the drafts not modified since the submission of their token are deleted, the submission holds the answers
+    - the drafts not modified for `idle_days` days are moved to a gzip compressed archive
+      (`saved_sessions/archive/archive-{date}.jsonl.gz`, one json line per draft)
+    - the session tokens of the removed drafts are pruned from the sessions token file, the respondent
+      receives the same token by email if they come back
+    - the removed drafts are removed from the completion funnel, a respondent coming back is counted once
+
+    The task is incremental, only the submissions received since the previous run are checked (the sequence
+    id of the last checked submission is stored in `saved_sessions/janitor.json`). It can be scheduled.
+
+    Input : the Answers folder, it is cleaned in place.
+    Output : a Table with the number of removed drafts and pruned tokens for each form.
+    """
+
+    ARCHIVE_DIR = "archive"
+    STATE_FILE = "janitor.json"
+
+    input_specs: InputSpecs = InputSpecs({'answers_folder': InputSpec(Folder, human_name="Answers folder")})
+    output_specs: OutputSpecs = OutputSpecs({'report': OutputSpec(Table, human_name="Cleaning report")})
+    config_specs: ConfigSpecs = ConfigSpecs({
+        'idle_days': IntParam(default_value=90, min_value=1, human_name="Idle days",
+                              short_description="Drafts not modified for this number of days are archived"),
+        'prune_tokens': BoolParam(default_value=True, human_name="Prune tokens",
+                                  short_description="Remove the session tokens of the removed drafts")
+    })
+
+    def run(self, params, inputs: TaskInputs) -> TaskOutputs:
+        answers_folder: Folder = inputs['answers_folder']
+        idle_before = time.time() - params['idle_days'] * 24 * 3600
+
+        report = []
+        for form_folder in list_form_folders(answers_folder.path):
+            sessions_dir = os.path.join(form_folder, SAVED_SESSIONS_DIR)
+            if not os.path.isdir(sessions_dir):
+                continue
+
+            submitted_tokens = self._delete_submitted_drafts(sessions_dir,
+                                                             os.path.join(form_folder, SUBMITTED_SESSIONS_DIR))
+            archived_tokens = self._archive_idle_drafts(sessions_dir, idle_before)
+            pruned_count = self._prune_tokens(form_folder, submitted_tokens | archived_tokens) \
+                if params['prune_tokens'] else 0
+
+            form_name = os.path.relpath(form_folder, answers_folder.path)
+            self.log_info_message(f"Form '{form_name}' : {len(submitted_tokens)} submitted draft(s) deleted, "
+                                  f"{len(archived_tokens)} idle draft(s) archived, {pruned_count} token(s) pruned")
+            report.append({"Form": form_name, "Submitted drafts deleted": len(submitted_tokens),
+                           "Idle drafts archived": len(archived_tokens), "Tokens pruned": pruned_count})
+
+        return {'report': Table(pd.DataFrame(report))}
+
+    def _delete_submitted_drafts(self, sessions_dir: str, submitted_dir: str) -> set:
+        """Delete the drafts not modified since the last submission of their token, return their tokens"""
+        state_path = os.path.join(sessions_dir, self.STATE_FILE)
+        last_seq = 0
+        if os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                last_seq = json.load(f)["last_seq"]
+
+        # submission time of the last submission of each token received since the previous run
+        submitted_times = {}
+        for record in SubmissionLedger(submitted_dir).iter_records(from_seq=last_seq + 1):
+            submitted_at = pytz.timezone('Europe/Paris').localize(
+                datetime.strptime(record["timestamp"], SESSION_TIMESTAMP_FORMAT)).timestamp()
+            # the timestamps have a one second resolution
+            submitted_times[record["token"]] = submitted_at + 1
+            last_seq = record["seq"]
+
+        deleted_tokens = set()
+        for token, submitted_at in submitted_times.items():
+            if remove_draft(sessions_dir, token, modified_before=submitted_at) is not None:
+                deleted_tokens.add(token)
+
+        write_json_atomic(state_path, json.dumps({"last_seq": last_seq}))
+        return deleted_tokens
+
+    def _archive_idle_drafts(self, sessions_dir: str, idle_before: float) -> set:
+        """Move the drafts not modified since `idle_before` to a compressed archive, return their tokens"""
+        idle_tokens = [get_draft_token(path) for path in iter_session_paths(sessions_dir)
+                       if os.path.getmtime(path) < idle_before]
+        if not idle_tokens:
+            return set()
+
+        archive_dir = os.path.join(sessions_dir, self.ARCHIVE_DIR)
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_name = f"archive-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+        archived_tokens = set()
+        # gzip members can be appended, a file written by two runs in the same second stays readable
+        with gzip.open(os.path.join(archive_dir, archive_name), "at", encoding="utf-8") as f:
+            for token in idle_tokens:
+                # the draft is archived before it is removed so it is never lost, it is only removed
+                # if it was not saved since it was listed (the archived copy is then a backup)
+                f.write(json.dumps({"token": token, "draft": load_session(sessions_dir, token)},
+                                   ensure_ascii=False) + "\n")
+                f.flush()
+                if remove_draft(sessions_dir, token, modified_before=idle_before) is not None:
+                    archived_tokens.add(token)
+        return archived_tokens
+
+    def _prune_tokens(self, form_folder: str, removed_tokens: set) -> int:
+        token_path = os.path.join(form_folder, SESSIONS_TOKEN_FILE)
+        if not removed_tokens or not os.path.exists(token_path):
+            return 0
+        with open(token_path, "r", encoding="utf8") as f:
+            tokens = json.load(f)
+        kept_tokens = {email: token for email, token in tokens.items() if str(token) not in removed_tokens}
+        if len(kept_tokens) < len(tokens):
+            write_json_atomic(token_path, json.dumps(kept_tokens))
+        return len(tokens) - len(kept_tokens)
@@ -0,0 +1,62 @@
+import os
+
+import pandas as pd
+from gws_core import (
+    ConfigSpecs,
+    Folder,
+    InputSpec,
+    InputSpecs,
+    OutputSpec,
+    OutputSpecs,
+    Table,
+    Task,
+    TaskInputs,
+    TaskOutputs,
+    TypingStyle,
+    task_decorator,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.form_registry import list_form_folders
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    migrate_sessions_to_sharded_layout,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+
+
+@task_decorator("FormAnswersLayoutMigrator", human_name="Form answers layout migrator",
+                short_description="Migrates an Answers folder of a forms dashboard to the current storage layout",
+                style=TypingStyle.material_icon(material_icon_name="drive_file_move", background_color="#413ebb"))
+class FormAnswersLayoutMigrator(Task):
+    """
+    FormAnswersLayoutMigrator migrates an Answers folder generated by a forms dashboard to the current layout :
+    - the drafts stored directly in `saved_sessions` are moved to their hash-prefix sub folder
+    - the submissions stored as one file each in `submitted_sessions` are imported in the submission ledger
+
+    The dashboard also migrates the files it accesses, this task migrates a whole folder at once.
+
+    Input : the Answers folder, it is migrated in place.
+    Output : a Table with the number of migrated files for each form.
+    """
+
+    input_specs: InputSpecs = InputSpecs({'answers_folder': InputSpec(Folder, human_name="Answers folder")})
+    output_specs: OutputSpecs = OutputSpecs({'report': OutputSpec(Table, human_name="Migration report")})
+    config_specs: ConfigSpecs = ConfigSpecs({})
+
+    def run(self, params, inputs: TaskInputs) -> TaskOutputs:
+        answers_folder: Folder = inputs['answers_folder']
+
+        report = []
+        for form_folder in list_form_folders(answers_folder.path):
+            sessions_dir = os.path.join(form_folder, "saved_sessions")
+            submitted_dir = os.path.join(form_folder, "submitted_sessions")
+
+            moved_drafts = migrate_sessions_to_sharded_layout(sessions_dir) if os.path.isdir(sessions_dir) else 0
+            imported_submissions = SubmissionLedger(submitted_dir).import_legacy_files() \
+                if os.path.isdir(submitted_dir) else 0
+
+            form_name = os.path.relpath(form_folder, answers_folder.path)
+            self.log_info_message(f"Form '{form_name}' : {moved_drafts} draft(s) moved, "
+                                  f"{imported_submissions} submission(s) imported")
+            report.append({"Form": form_name, "Drafts moved": moved_drafts,
+                           "Submissions imported": imported_submissions})
+
+        return {'report': Table(pd.DataFrame(report))}
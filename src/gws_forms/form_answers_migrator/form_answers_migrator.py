@@ -0,0 +1,196 @@
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+from gws_core import (
+    ConfigSpecs,
+    FloatParam,
+    Folder,
+    InputSpec,
+    InputSpecs,
+    IntParam,
+    JSONDict,
+    OutputSpec,
+    OutputSpecs,
+    Table,
+    Task,
+    TaskInputs,
+    TaskOutputs,
+    TypingStyle,
+    task_decorator,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.answers_migration import (
+    DEFAULT_SIMILARITY_THRESHOLD,
+    SubmissionQuestionsRemapper,
+    compute_question_mapping,
+    get_form_fingerprint,
+    migrate_drafts,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.file_lock import write_json_atomic
+from gws_forms.dashboard._form_dashboard_code.session_management.funnel_statistics import FunnelStatistics
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    SAVED_SESSIONS_DIR,
+    SUBMITTED_SESSIONS_DIR,
+    get_draft_token,
+    iter_session_paths,
+    migrate_sessions_to_sharded_layout,
+    prepare_form_folder,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_change_feed import (
+    SubmissionChangeFeed,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_arrow_cache import (
+    SubmissionsArrowCache,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_search_index import (
+    SubmissionsSearchIndex,
+)
+
+# Number of batches of drafts given to each worker, so the workers stay busy until the end
+BATCHES_PER_WORKER = 4
+# Share of the progress bar of each step : the drafts, then the submissions, then the derived files
+DRAFTS_PROGRESS = 50
+SUBMISSIONS_PROGRESS = 85
+
+
+@task_decorator("FormAnswersMigrator", human_name="Form answers migrator",
+                short_description="Migrates the drafts and submissions of a form to a new version of its questions",
+                style=TypingStyle.material_icon(material_icon_name="swap_horiz", background_color="#413ebb"))
+class FormAnswersMigrator(Task):
+    """
+    FormAnswersMigrator migrates the answers of a form when its questions are modified (typo fixed, question
+    moved to another section, questions added or removed), so the respondents keep their progress.
+
+    The questions of the old form are matched to the questions of the new form by `id`, by section and
+    question, by question, then by similarity of the question texts (at least `similarity_threshold`).
+    Then, in one pass with `max_workers` processes :
+    - the answers of the drafts are moved to the positions of the new questions, the answers of the removed
+      questions are dropped, and the funnel statistics are rebuilt
+    - the submissions are rewritten with the new section and question of the matched questions, the answers
+      of the removed questions are kept
+    - the Arrow cache, the search index and the change feed are rebuilt. The change feed consumers must read
+      the feed again from the start (the sequence ids do not change)
+
+    The Answers folder is copied, the copy is migrated. The migration is recorded in `form_migration.json`,
+    running it again on the migrated folder with the same forms does nothing.
+
+    Input : the Answers folder of the form and the JSONDicts of the old and new questions.
+    Output : a Table with the match of each question and the migrated Answers folder.
+    """
+
+    STATE_FILE = "form_migration.json"
+
+    input_specs: InputSpecs = InputSpecs({
+        'answers_folder': InputSpec(Folder, human_name="Answers folder"),
+        'old_questions_file': InputSpec(JSONDict, human_name="JSONDict containing the old questions"),
+        'new_questions_file': InputSpec(JSONDict, human_name="JSONDict containing the new questions")
+    })
+    output_specs: OutputSpecs = OutputSpecs({
+        'mapping': OutputSpec(Table, human_name="Questions mapping"),
+        'answers_folder': OutputSpec(Folder, human_name="Answers")
+    })
+    config_specs: ConfigSpecs = ConfigSpecs({
+        'similarity_threshold': FloatParam(
+            default_value=DEFAULT_SIMILARITY_THRESHOLD, min_value=0, max_value=1, human_name="Similarity threshold",
+            short_description="Minimum similarity (0 to 1) of the texts of two questions to match them"),
+        'max_workers': IntParam(default_value=4, min_value=1, human_name="Workers",
+                                short_description="Number of processes rewriting the drafts and submissions")
+    })
+
+    def run(self, params, inputs: TaskInputs) -> TaskOutputs:
+        answers_folder = Folder(os.path.join(self.create_tmp_dir(), "Answers"))
+        answers_folder.name = "Answers"
+        shutil.copytree(inputs['answers_folder'].path, answers_folder.path)
+        answers_path = answers_folder.path
+        old_questions = inputs['old_questions_file'].get_data()["questions"]
+        new_questions = inputs['new_questions_file'].get_data()["questions"]
+        mapping = compute_question_mapping(old_questions, new_questions, params['similarity_threshold'])
+        mapping_table = Table(self._get_mapping_dataframe(old_questions, new_questions, mapping))
+        matched_count = sum(1 for match in mapping if match is not None)
+        self.log_info_message(f"{matched_count}/{len(old_questions)} old questions matched")
+
+        prepare_form_folder(answers_path)
+        state_path = os.path.join(answers_path, self.STATE_FILE)
+        state = {"from": get_form_fingerprint(old_questions), "to": get_form_fingerprint(new_questions),
+                 "drafts": False, "submissions": False}
+        if os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                previous_state = json.load(f)
+            # resume an interrupted migration between the same forms
+            if (previous_state["from"], previous_state["to"]) == (state["from"], state["to"]):
+                state = previous_state
+        if state["drafts"] and state["submissions"]:
+            self.log_info_message("The answers are already migrated to the new form")
+            return {'mapping': mapping_table, 'answers_folder': answers_folder}
+
+        max_workers = params['max_workers']
+        if not state["drafts"]:
+            self.update_progress_value(0, "Migrating the drafts")
+            sessions_dir = os.path.join(answers_path, SAVED_SESSIONS_DIR)
+            # the drafts saved before the shards are listed with the others
+            migrate_sessions_to_sharded_layout(sessions_dir)
+            tokens = [get_draft_token(path) for path in iter_session_paths(sessions_dir)]
+            batch_count = max_workers * BATCHES_PER_WORKER
+            batches = [tokens[index::batch_count] for index in range(batch_count) if tokens[index::batch_count]]
+            migrate_batch = partial(migrate_drafts, sessions_dir, old_questions=old_questions,
+                                    new_questions=new_questions, mapping=mapping)
+            if max_workers > 1 and len(batches) > 1:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(migrate_batch, batches))
+            else:
+                results = [migrate_batch(batch) for batch in batches]
+            FunnelStatistics(sessions_dir).rebuild(
+                progress for _, progresses in results for progress in progresses)
+            self.log_info_message(f"{sum(count for count, _ in results)} draft(s) migrated")
+            state["drafts"] = True
+            write_json_atomic(state_path, json.dumps(state))
+
+        submitted_dir = os.path.join(answers_path, SUBMITTED_SESSIONS_DIR)
+        if not state["submissions"]:
+            self.update_progress_value(DRAFTS_PROGRESS, "Migrating the submissions")
+            # the renames can not be applied twice (A to B then B to C), the ledger records the rewrite
+            submission_count = SubmissionLedger(submitted_dir).rewrite(
+                SubmissionQuestionsRemapper(old_questions, new_questions, mapping), max_workers=max_workers,
+                rewrite_id=f"{state['from']}-{state['to']}")
+            self.log_info_message(f"{submission_count} submission(s) migrated")
+            state["submissions"] = True
+            write_json_atomic(state_path, json.dumps(state))
+
+        # the derived files hold the locations and the questions of the submissions, they are rebuilt
+        self.update_progress_value(SUBMISSIONS_PROGRESS, "Rebuilding the submissions indexes")
+        for derived_path in [os.path.join(submitted_dir, SubmissionsArrowCache.CACHE_DIR),
+                             os.path.join(submitted_dir, SubmissionsSearchIndex.INDEX_DIR)]:
+            shutil.rmtree(derived_path, ignore_errors=True)
+        feed_path = os.path.join(submitted_dir, SubmissionChangeFeed.FEED_FILE)
+        if os.path.exists(feed_path):
+            os.remove(feed_path)
+            self.log_warning_message("The change feed is rebuilt, its consumers must read it again from the start")
+        SubmissionsArrowCache(submitted_dir, new_questions).sync()
+        SubmissionsSearchIndex(submitted_dir).sync()
+        SubmissionChangeFeed(submitted_dir).sync()
+
+        return {'mapping': mapping_table, 'answers_folder': answers_folder}
+
+    def _get_mapping_dataframe(self, old_questions: list, new_questions: list, mapping: list) -> pd.DataFrame:
+        rows = []
+        for old_index, match in enumerate(mapping):
+            new_question = new_questions[match[0]] if match is not None else {}
+            rows.append({
+                "Old section": old_questions[old_index].get("section", ""),
+                "Old question": old_questions[old_index]["question"],
+                "New section": new_question.get("section"),
+                "New question": new_question.get("question"),
+                "Match": match[1] if match is not None else "removed",
+                "Similarity": match[2] if match is not None else None,
+            })
+        matched_new = {match[0] for match in mapping if match is not None}
+        for new_index, new_question in enumerate(new_questions):
+            if new_index not in matched_new:
+                rows.append({"Old section": None, "Old question": None,
+                             "New section": new_question.get("section", ""),
+                             "New question": new_question["question"], "Match": "added", "Similarity": None})
+        return pd.DataFrame(rows)
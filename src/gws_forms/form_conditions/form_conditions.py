@@ -0,0 +1,144 @@
+from typing import List
+
+# Operators of the question conditions, the condition value is compared to the answer of the referenced question
+CONDITION_OPERATORS = ["equals", "not_equals", "in", "contains", "greater_than", "less_than", "answered"]
+
+
+def is_empty_answer(answer) -> bool:
+    return answer is None or answer == "" or answer == []
+
+
+def evaluate_condition(operator: str, value, answer) -> bool:
+    """Return True if the `answer` of the referenced question satisfies the condition"""
+    if operator == "answered":
+        return not is_empty_answer(answer)
+    if is_empty_answer(answer):
+        return False
+
+    answers = answer if isinstance(answer, list) else [answer]
+    if operator == "equals":
+        return answer_to_str(answer) == answer_to_str(value)
+    if operator == "not_equals":
+        return answer_to_str(answer) != answer_to_str(value)
+    if operator == "in":
+        values = [answer_to_str(v) for v in (value if isinstance(value, list) else [value])]
+        return any(answer_to_str(a) in values for a in answers)
+    if operator == "contains":
+        return any(answer_to_str(value) == answer_to_str(a) or answer_to_str(value) in answer_to_str(a) for a in answers)
+    if operator in ("greater_than", "less_than"):
+        try:
+            answer_number, value_number = float(answer), float(value)
+        except (TypeError, ValueError):
+            return False
+        return answer_number > value_number if operator == "greater_than" else answer_number < value_number
+    raise ValueError(f"Unknown condition operator '{operator}', expected one of {CONDITION_OPERATORS}")
+
+
+def compile_dependency_graph(questions: List[dict]) -> dict:
+    """Resolve the conditions of the questions and compile the dependency graph of the form.
+
+    A condition references an earlier question by its `id`, its question text or its title.
+    Return a json-serializable dict with, for each question (by position) :
+    - `conditions` : None or the resolved condition {"question_index", "operator", "value"}
+    - `dependents` : the positions of the questions whose condition references it
+    - `groups` : the positions of the questions linked by conditions (connected components of
+      more than one question), a group is rendered and refreshed together.
+
+    Raise a ValueError if a condition is invalid.
+    """
+    conditions = []
+    dependents: List[List[int]] = [[] for _ in questions]
+    for index, question in enumerate(questions):
+        condition = question.get("condition")
+        if not condition:
+            conditions.append(None)
+            continue
+
+        operator = condition.get("operator", "equals")
+        if operator not in CONDITION_OPERATORS:
+            raise ValueError(f"Unknown condition operator '{operator}' for question '{question.get('question')}', "
+                             f"expected one of {CONDITION_OPERATORS}")
+        controller_index = _find_question_index(questions[:index], condition.get("question"))
+        if controller_index is None:
+            raise ValueError(f"The condition of question '{question.get('question')}' references "
+                             f"'{condition.get('question')}' which is not an earlier question of the form")
+        conditions.append({"question_index": controller_index, "operator": operator,
+                           "value": condition.get("value")})
+        dependents[controller_index].append(index)
+
+    # connected components of the questions linked by conditions
+    parents = list(range(len(questions)))
+
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    for index, condition in enumerate(conditions):
+        if condition is not None:
+            parents[find(index)] = find(condition["question_index"])
+    components = {}
+    for index in range(len(questions)):
+        components.setdefault(find(index), []).append(index)
+    groups = [component for component in components.values() if len(component) > 1]
+
+    return {"conditions": conditions, "dependents": dependents, "groups": groups}
+
+
+def get_visible_questions(dependency_graph: dict, answers: list) -> List[bool]:
+    """Return for each question whether it is visible, given the answers of the questions (by position).
+
+    A question is hidden if its condition is not satisfied or if the question it depends on is hidden.
+    """
+    visible = []
+    for condition in dependency_graph["conditions"]:
+        if condition is None:
+            visible.append(True)
+            continue
+        controller_index = condition["question_index"]
+        visible.append(visible[controller_index]
+                       and evaluate_condition(condition["operator"], condition["value"], answers[controller_index]))
+    return visible
+
+
+def update_visible_questions(dependency_graph: dict, answers: list, visible: List[bool], index: int) -> List[int]:
+    """Update `visible` in place after the answer of the question `index` changed.
+
+    Only the questions depending, directly or not, on the question are evaluated again.
+    Return the positions of the questions whose visibility changed.
+    """
+    changed = []
+    pending = list(dependency_graph["dependents"][index])
+    while pending:
+        dependent = pending.pop()
+        condition = dependency_graph["conditions"][dependent]
+        controller_index = condition["question_index"]
+        is_visible = visible[controller_index] and evaluate_condition(
+            condition["operator"], condition["value"], answers[controller_index])
+        if is_visible != visible[dependent]:
+            visible[dependent] = is_visible
+            changed.append(dependent)
+            # the visibility of its own dependents depends on it
+            pending.extend(dependency_graph["dependents"][dependent])
+    return changed
+
+
+def _find_question_index(questions: List[dict], reference) -> int:
+    if reference is None or reference == "":
+        return None
+    reference = answer_to_str(reference)
+    for key in ["id", "question", "title"]:
+        for index, question in enumerate(questions):
+            if question.get(key) is not None and answer_to_str(question[key]) == reference:
+                return index
+    return None
+
+
+def answer_to_str(value) -> str:
+    # numbers read from Excel are floats, 3.0 and '3' must be equal
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, list):
+        return ",".join(answer_to_str(v) for v in value)
+    return str(value).strip()
@@ -0,0 +1,303 @@
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytz
+from gws_core import (
+    ConfigSpecs,
+    File,
+    Folder,
+    InputSpec,
+    InputSpecs,
+    JSONDict,
+    OutputSpec,
+    OutputSpecs,
+    Table,
+    Task,
+    TaskInputs,
+    TaskOutputs,
+    TypingStyle,
+    task_decorator,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    SESSION_TIMESTAMP_FORMAT,
+    SUBMITTED_SESSIONS_DIR,
+    prepare_form_folder,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_change_feed import (
+    SubmissionChangeFeed,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+    get_question_column_name,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_arrow_cache import (
+    SubmissionsArrowCache,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_search_index import (
+    SubmissionsSearchIndex,
+)
+from gws_forms.form_conditions.form_conditions import answer_to_str, compile_dependency_graph
+from gws_forms.form_submissions_aggregator.form_submissions_aggregator import TOKEN_COLUMN
+
+# Columns of the rejection report
+ROW_COLUMN = "Row"
+QUESTION_COLUMN = "Question"
+ERROR_COLUMN = "Error"
+# Number of submissions appended to the ledger at once
+WRITE_BATCH_SIZE = 10000
+# Keys of the two 64 bits hashes of a row giving the token of a response without token
+ROW_TOKEN_HASH_KEYS = ["gws_forms_token1", "gws_forms_token2"]
+# Share of the progress bar of each step : reading the file, validating the rows, then writing the submissions
+READ_PROGRESS = 20
+VALIDATE_PROGRESS = 40
+WRITE_PROGRESS = 95
+
+
+@task_decorator("FormResponsesImporter", human_name="Form responses importer",
+                short_description="Imports responses collected offline as submissions of a form",
+                style=TypingStyle.material_icon(material_icon_name="upload_file", background_color="#413ebb"))
+class FormResponsesImporter(Task):
+    """
+    FormResponsesImporter writes responses collected offline (on paper, in a spreadsheet...) to the Answers
+    folder of a form, as if they were submitted with the forms dashboard.
+
+    The responses file is an Excel or CSV file with one row per response and one column per question, named
+    after the question or `{section} - {question}` as in the table of the FormSubmissionsAggregator. An
+    optional `Session token` column gives the token of each response, a token is generated otherwise.
+
+    The rows are checked as the dashboard checks the answers : the required questions, the numbers and their
+    min and max values, the allowed values and the question conditions (the answers of the hidden questions
+    are not stored). The checks are done column by column for all the rows at once. The valid rows are
+    appended to the submissions, the other rows are listed in the rejection report with one line per error.
+
+    The import can be run again with the same file, or with the rejected rows fixed : the responses whose
+    token is already submitted are skipped. A response without token gets a token computed from its row
+    number and its answers.
+
+    Input : the responses file, the JSONDict containing the questions and the Answers folder of the form.
+    Output : a Table with the errors of the rejected rows and a copy of the Answers folder with the imported
+    submissions.
+    """
+
+    input_specs: InputSpecs = InputSpecs({
+        'responses_file': InputSpec(File, human_name="Responses file (Excel or CSV)"),
+        'questions_file': InputSpec(JSONDict, human_name="JSONDict containing the questions"),
+        'answers_folder': InputSpec(Folder, human_name="Answers folder")
+    })
+    output_specs: OutputSpecs = OutputSpecs({
+        'rejections': OutputSpec(Table, human_name="Rejected rows"),
+        'answers_folder': OutputSpec(Folder, human_name="Answers")
+    })
+    config_specs: ConfigSpecs = ConfigSpecs({})
+
+    def run(self, params, inputs: TaskInputs) -> TaskOutputs:
+        questions = inputs['questions_file'].get_data()["questions"]
+        dependency_graph = compile_dependency_graph(questions)
+
+        self.update_progress_value(0, "Reading the responses file")
+        start = time.perf_counter()
+        dataframe = self._read_responses(inputs['responses_file'].path)
+        read_time = time.perf_counter() - start
+        self.update_progress_value(READ_PROGRESS, f"{len(dataframe)} rows read")
+
+        # match the columns of the file to the questions
+        column_names = [next((name for name in [get_question_column_name(question.get("section", ""),
+                                                                         question["question"]),
+                                                question["question"]] if name in dataframe.columns), None)
+                        for question in questions]
+        unknown_columns = set(dataframe.columns) - set(column_names) - {TOKEN_COLUMN}
+        if unknown_columns:
+            self.log_warning_message(f"Columns not matching a question are ignored : {sorted(unknown_columns)}")
+
+        start = time.perf_counter()
+        answers, errors = [], []
+        visible: List[pd.Series] = []
+        for index, question in enumerate(questions):
+            column = dataframe[column_names[index]] if column_names[index] is not None \
+                else pd.Series(None, index=dataframe.index, dtype=object)
+            question_answers, question_errors = self._read_answers(question, column)
+            condition = dependency_graph["conditions"][index]
+            if condition is None:
+                question_visible = pd.Series(True, index=dataframe.index)
+            else:
+                controller_index = condition["question_index"]
+                question_visible = visible[controller_index] & self._evaluate_condition(
+                    condition["operator"], condition["value"], answers[controller_index])
+            if question.get("required"):
+                question_errors = question_errors.mask(question_visible & question_answers.isna(),
+                                                       "Required")
+            # the answers of the hidden questions are not checked
+            question_errors = question_errors.where(question_visible)
+            answers.append(question_answers)
+            visible.append(question_visible)
+            errors.append(question_errors.rename(get_question_column_name(question.get("section", ""),
+                                                                          question["question"])))
+        errors_frame = pd.concat(errors, axis=1) if errors else pd.DataFrame(index=dataframe.index)
+        rejected = errors_frame.notna().any(axis=1)
+        validate_time = time.perf_counter() - start
+        self.update_progress_value(VALIDATE_PROGRESS, f"{int(rejected.sum())} rows rejected")
+
+        # one line per error of the rejected rows, the row number of the file (the header is the first row)
+        rejections = errors_frame[rejected].reset_index(names=ROW_COLUMN) \
+            .melt(id_vars=ROW_COLUMN, var_name=QUESTION_COLUMN, value_name=ERROR_COLUMN) \
+            .dropna(subset=[ERROR_COLUMN]).sort_values(ROW_COLUMN, kind="stable").reset_index(drop=True)
+        rejections[ROW_COLUMN] = rejections[ROW_COLUMN] + 2
+
+        start = time.perf_counter()
+        answers_folder = Folder(os.path.join(self.create_tmp_dir(), "Answers"))
+        answers_folder.name = "Answers"
+        shutil.copytree(inputs['answers_folder'].path, answers_folder.path)
+        written_count = self._write_submissions(answers_folder.path, questions, dataframe,
+                                                answers, visible, ~rejected)
+        write_time = time.perf_counter() - start
+
+        self.log_info_message(f"{written_count} responses imported, {int(rejected.sum())} rows rejected "
+                              f"(read {read_time:.2f}s, validation {validate_time:.2f}s, write {write_time:.2f}s)")
+        return {'rejections': Table(rejections), 'answers_folder': answers_folder}
+
+    def _read_responses(self, path: str) -> pd.DataFrame:
+        if path.lower().endswith((".csv", ".txt")):
+            # keep the texts as written, they are converted per question
+            dataframe = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+        else:
+            dataframe = pd.read_excel(path, dtype=object)
+        dataframe.columns = [str(column).strip() for column in dataframe.columns]
+        return dataframe.reset_index(drop=True)
+
+    def _read_answers(self, question: dict, column: pd.Series) -> tuple:
+        """Convert a column to the answers of the question, return the answers and the errors of the rows"""
+        errors = pd.Series(None, index=column.index, dtype=object)
+        texts = to_texts(column)
+        empty = texts.isna()
+        allowed_values = question.get("allowed_values")
+
+        if allowed_values:
+            allowed_values = [answer_to_str(value) for value in allowed_values]
+            if question.get("multiselect"):
+                # the selected values are separated by commas, the empty values are dropped
+                texts = texts.str.replace(r"\s*,[\s,]*", ",", regex=True).str.strip(", ")
+                answers = texts.where(texts != "", None).str.split(",")
+                values = answers.explode()
+                invalid = (values.notna() & ~values.isin(allowed_values)).groupby(level=0).any()
+            else:
+                answers = texts
+                invalid = ~empty & ~texts.isin(allowed_values)
+            return answers, errors.mask(invalid, "Not an allowed value")
+
+        if question.get("response_type") in ("numeric", "range"):
+            numbers = pd.to_numeric(texts, errors="coerce")
+            errors = errors.mask(~empty & numbers.isna(), "Not a number")
+            if question.get("min_value") is not None:
+                errors = errors.mask(numbers < float(question["min_value"]), f"Lower than {question['min_value']}")
+            if question.get("max_value") is not None:
+                errors = errors.mask(numbers > float(question["max_value"]), f"Greater than {question['max_value']}")
+            return numbers.astype(object).where(numbers.notna(), None), errors
+
+        return texts, errors
+
+    def _evaluate_condition(self, operator: str, value, answers: pd.Series) -> pd.Series:
+        """Evaluate a condition for all the rows, as gws_forms.form_conditions.evaluate_condition"""
+        empty = answers.isna()
+        if operator == "answered":
+            return ~empty
+        # the multiselect answers are lists, their values are compared one by one
+        values = to_texts(answers.explode())
+        if operator in ("equals", "not_equals"):
+            joined = values.groupby(level=0).agg(lambda group: ",".join(group.dropna())) \
+                if values.index.has_duplicates else values
+            result = joined == answer_to_str(value)
+            result = result if operator == "equals" else ~result
+        elif operator == "in":
+            condition_values = [answer_to_str(v) for v in (value if isinstance(value, list) else [value])]
+            result = values.isin(condition_values).groupby(level=0).any()
+        elif operator == "contains":
+            result = values.str.contains(answer_to_str(value), regex=False).fillna(False) \
+                .astype(bool).groupby(level=0).any()
+        else:
+            numbers = pd.to_numeric(values, errors="coerce")
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                return pd.Series(False, index=answers.index)
+            result = numbers > number if operator == "greater_than" else numbers < number
+            # a list of several values is not a number
+            result = result.groupby(level=0).all() if values.index.has_duplicates else result
+        return result.reindex(answers.index, fill_value=False).astype(bool) & ~empty
+
+    def _write_submissions(self, answers_path: str, questions: list, dataframe: pd.DataFrame,
+                           answers: List[pd.Series], visible: List[pd.Series], valid: pd.Series) -> int:
+        prepare_form_folder(answers_path)
+        valid_rows = np.flatnonzero(valid.to_numpy())
+        if not len(valid_rows):
+            return 0
+
+        # the tokens of the rows without token do not change when the file is imported again
+        file_tokens = to_texts(dataframe[TOKEN_COLUMN]).iloc[valid_rows].tolist() \
+            if TOKEN_COLUMN in dataframe.columns else [None] * len(valid_rows)
+        row_tokens = _get_row_tokens(dataframe.iloc[valid_rows])
+        tokens = [token if token is not None else row_token for token, row_token in zip(file_tokens, row_tokens)]
+
+        # the responses already submitted, by a previous import or in the file, are skipped
+        submitted_directory = os.path.join(answers_path, SUBMITTED_SESSIONS_DIR)
+        ledger = SubmissionLedger(submitted_directory)
+        submitted_tokens = {record["token"] for record in ledger.iter_records()}
+        new_rows = []
+        for index, token in enumerate(tokens):
+            if token not in submitted_tokens:
+                submitted_tokens.add(token)
+                new_rows.append(index)
+        if len(new_rows) < len(tokens):
+            self.log_info_message(f"{len(tokens) - len(new_rows)} responses already submitted are skipped")
+        if not new_rows:
+            return 0
+        timestamp = datetime.now(tz=pytz.timezone('Europe/Paris')).strftime(SESSION_TIMESTAMP_FORMAT)
+
+        # the answers of the visible questions of the valid rows, None for the hidden questions
+        columns = [answers[index].where(visible[index], np.nan).iloc[valid_rows].tolist()
+                   for index in range(len(questions))]
+        question_keys = [(question.get("section", ""), question["question"]) for question in questions]
+
+        for start in range(0, len(new_rows), WRITE_BATCH_SIZE):
+            end = min(start + WRITE_BATCH_SIZE, len(new_rows))
+            ledger.append_many([
+                (tokens[row], [{"section": section, "question": question_text, "answer": column[row]}
+                               for (section, question_text), column in zip(question_keys, columns)
+                               if not _is_missing(column[row])], timestamp)
+                for row in new_rows[start:end]
+            ])
+            self.update_progress_value(
+                VALIDATE_PROGRESS + (WRITE_PROGRESS - VALIDATE_PROGRESS) * end / len(new_rows),
+                f"{end}/{len(new_rows)} responses imported")
+
+        # the derived files are updated once for all the imported submissions
+        SubmissionsSearchIndex(submitted_directory).sync()
+        SubmissionsArrowCache(submitted_directory, questions).sync()
+        SubmissionChangeFeed(submitted_directory).sync()
+        return len(new_rows)
+
+
+def to_texts(column: pd.Series) -> pd.Series:
+    """Return the stripped texts of a column, None for the empty cells. The integer numbers read from
+    Excel as floats are written without decimals, as in the form conditions."""
+    texts = column.astype(object).where(column.notna(), None)
+    is_float = texts.map(type) == float
+    if is_float.any():
+        texts = texts.where(~is_float, texts[is_float].map(answer_to_str))
+    texts = texts.where(texts.isna(), texts.astype(str).str.strip())
+    return texts.where(texts != "", None)
+
+
+def _get_row_tokens(dataframe: pd.DataFrame) -> List[str]:
+    """Return a token for each row computed from its row number and its cells, hashed column by column"""
+    hashes = [pd.util.hash_pandas_object(dataframe, index=True, hash_key=key).to_numpy()
+              for key in ROW_TOKEN_HASH_KEYS]
+    return [f"{first:016x}{second:016x}" for first, second in zip(*hashes)]
+
+
+def _is_missing(answer) -> bool:
+    return answer is None or (isinstance(answer, float) and np.isnan(answer))
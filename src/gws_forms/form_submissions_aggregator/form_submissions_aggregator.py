@@ -0,0 +1,110 @@
+import os
+
+import pandas as pd
+from gws_core import (
+    ConfigSpecs,
+    Folder,
+    InputSpec,
+    InputSpecs,
+    JSONDict,
+    OutputSpec,
+    OutputSpecs,
+    Table,
+    Task,
+    TaskInputs,
+    TaskOutputs,
+    TypingStyle,
+    task_decorator,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.form_registry import FORMS_DIR, list_form_folders
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import SUBMITTED_SESSIONS_DIR
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+    get_question_column_name,
+)
+
+FORM_COLUMN = "Form"
+SUBMISSION_COLUMN = "Submission"
+TOKEN_COLUMN = "Session token"
+TIMESTAMP_COLUMN = "Timestamp"
+
+
+@task_decorator("FormSubmissionsAggregator", human_name="Form submissions aggregator",
+                short_description="Aggregates the submissions of a form into a table with one row per submission",
+                style=TypingStyle.material_icon(material_icon_name="table_chart", background_color="#413ebb"))
+class FormSubmissionsAggregator(Task):
+    """
+    FormSubmissionsAggregator builds a table with one row per submission and one column per question
+    from the Answers folder generated by the Forms dashboard.
+
+    The aggregation is incremental : given the table of a previous run, only the submissions received
+    after its last submission (the watermark) are read from the ledger and appended to its rows.
+    The Answers folder is only read. For the Answers folder of a dashboard hosting several forms, the
+    submissions of all the forms are aggregated with the id of their form in a `Form` column, and the
+    watermark is kept per form.
+
+    Input : the Answers folder of the form, optionally the JSONDict containing the questions, used to
+    order the columns, and the table of a previous run.
+    Output : a Table.
+    """
+
+    input_specs: InputSpecs = InputSpecs({
+        'answers_folder': InputSpec(Folder, human_name="Answers folder"),
+        'questions_file': InputSpec(JSONDict, human_name="JSONDict containing the questions", optional=True),
+        'previous_table': InputSpec(Table, human_name="Submissions table of a previous run", optional=True)
+    })
+    output_specs: OutputSpecs = OutputSpecs({'table': OutputSpec(Table, human_name="Submissions table")})
+    config_specs: ConfigSpecs = ConfigSpecs({})
+
+    def run(self, params, inputs: TaskInputs) -> TaskOutputs:
+        answers_folder: Folder = inputs['answers_folder']
+        previous_table: Table = inputs.get('previous_table')
+        previous_dataframe = previous_table.get_data() if previous_table is not None else None
+
+        multi_form = os.path.isdir(os.path.join(answers_folder.path, FORMS_DIR))
+        base_columns = ([FORM_COLUMN] if multi_form else []) + [SUBMISSION_COLUMN, TOKEN_COLUMN, TIMESTAMP_COLUMN]
+
+        new_rows = []
+        for form_folder in list_form_folders(answers_folder.path):
+            form_id = os.path.basename(form_folder) if multi_form else None
+            watermark = 0
+            if previous_dataframe is not None and len(previous_dataframe) > 0:
+                form_submissions = previous_dataframe[SUBMISSION_COLUMN] if not multi_form \
+                    else previous_dataframe.loc[previous_dataframe[FORM_COLUMN] == form_id, SUBMISSION_COLUMN]
+                watermark = int(form_submissions.max()) if len(form_submissions) > 0 else 0
+
+            # Only read the submissions received since the previous run
+            ledger = SubmissionLedger(os.path.join(form_folder, SUBMITTED_SESSIONS_DIR))
+            form_rows = [self._record_to_row(record, form_id)
+                         for record in ledger.iter_records(from_seq=watermark + 1)]
+            self.log_info_message(f"{len(form_rows)} new submission(s) since submission #{watermark}"
+                                  + (f" for the form '{form_id}'" if multi_form else ""))
+            new_rows.extend(form_rows)
+
+        dataframes = [dataframe for dataframe in [previous_dataframe, pd.DataFrame(new_rows)]
+                      if dataframe is not None and len(dataframe) > 0]
+        dataframe = pd.concat(dataframes, ignore_index=True) if dataframes else pd.DataFrame(columns=base_columns)
+        if multi_form and len(dataframe) > 0:
+            dataframe = dataframe.sort_values([FORM_COLUMN, SUBMISSION_COLUMN], kind="stable")
+
+        questions_file: JSONDict = inputs.get('questions_file')
+        if questions_file is not None:
+            question_columns = [get_question_column_name(question.get("section", ""), question["question"])
+                                for question in questions_file.get_data()["questions"]]
+            dataframe = dataframe.reindex(columns=base_columns + question_columns)
+
+        return {'table': Table(dataframe.reset_index(drop=True))}
+
+    def _record_to_row(self, record: dict, form_id: str = None) -> dict:
+        row = {} if form_id is None else {FORM_COLUMN: form_id}
+        row.update({
+            SUBMISSION_COLUMN: record["seq"],
+            TOKEN_COLUMN: record["token"],
+            TIMESTAMP_COLUMN: record["timestamp"],
+        })
+        for question in record["questions"]:
+            answer = question.get("answer")
+            if isinstance(answer, list):
+                answer = ", ".join(str(value) for value in answer)
+            row[get_question_column_name(question.get("section", ""), question["question"])] = answer
+        return row
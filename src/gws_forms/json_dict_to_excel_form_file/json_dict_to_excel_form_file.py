@@ -0,0 +1,80 @@
+import os
+
+from gws_core import (
+    ConfigSpecs,
+    File,
+    InputSpec,
+    InputSpecs,
+    JSONDict,
+    OutputSpec,
+    OutputSpecs,
+    StrParam,
+    Task,
+    TaskInputs,
+    TaskOutputs,
+    task_decorator,
+)
+from gws_forms.excel_form_file_to_json_dict.excel_form_file_to_json_dict import (
+    EXCEL_FORM_COLUMNS,
+    EXCEL_FORM_CONDITION_COLUMNS,
+)
+from openpyxl import Workbook
+
+
+@task_decorator("JsonDictToExcelFormFile", human_name="Json Dict to Excel Form File",
+                short_description="Converts a JSON dictionary containing form questions to an Excel file")
+class JsonDictToExcelFormFile(Task):
+    """
+    JsonDictToExcelFormFile is the inverse of ExcelFormFileToJsonDict : it writes the questions of a JSONDict
+    in an Excel file with the columns read by ExcelFormFileToJsonDict, so the two tasks round-trip.
+
+    The questions created in the creation dashboard are also supported : `question_head` is used as title and
+    `helper_text` as description when the question has no title or description.
+
+    The rows are streamed to a write-only workbook so the memory used does not depend on the number of questions.
+    """
+
+    input_specs: InputSpecs = InputSpecs({'json_dict': InputSpec(JSONDict, human_name="JSON dictionary")})
+    output_specs: OutputSpecs = OutputSpecs({'excel_file': OutputSpec(File, human_name="Excel file")})
+    config_specs: ConfigSpecs = ConfigSpecs({'file_name': StrParam(
+        default_value='form_questions', short_description="Name of the Excel file, without extension")})
+
+    def run(self, params, inputs: TaskInputs) -> TaskOutputs:
+
+        questions = inputs['json_dict'].get_data()["questions"]
+
+        excel_file_path = os.path.join(self.create_tmp_dir(), f"{params['file_name']}.xlsx")
+
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Questions")
+        worksheet.append(EXCEL_FORM_COLUMNS + EXCEL_FORM_CONDITION_COLUMNS)
+        for question in questions:
+            worksheet.append(question_to_row(question))
+        workbook.save(excel_file_path)
+
+        self.log_info_message(f"{len(questions)} question(s) exported")
+        return {'excel_file': File(excel_file_path)}
+
+
+def question_to_row(question: dict) -> list:
+    allowed_values = question.get("allowed_values")
+    condition = question.get("condition") or {}
+    condition_value = condition.get("value")
+    if isinstance(condition_value, list):
+        condition_value = ",".join(str(value).strip() for value in condition_value)
+    return [
+        question.get("section") or None,
+        question.get("title") or question.get("question_head") or None,
+        question.get("question") or None,
+        question.get("description") or question.get("helper_text") or None,
+        question.get("response_type") or None,
+        bool(question.get("required", False)),
+        # the converter splits the allowed values on commas and strips them
+        ",".join(str(value).strip() for value in allowed_values) if allowed_values else None,
+        question.get("min_value"),
+        question.get("max_value"),
+        bool(question["multiselect"]) if question.get("multiselect") is not None else None,
+        condition.get("question"),
+        condition.get("operator") if condition else None,
+        condition_value,
+    ]
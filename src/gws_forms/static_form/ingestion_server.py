@@ -0,0 +1,292 @@
+import argparse
+import json
+import logging
+import mimetypes
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from gws_forms.dashboard._form_dashboard_code.session_management.form_answers import get_answered_questions
+from gws_forms.dashboard._form_dashboard_code.session_management.rate_limiter import RateLimiter
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    SESSION_TIMESTAMP_FORMAT,
+    SUBMITTED_SESSIONS_DIR,
+    prepare_form_folder,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_change_feed import (
+    SubmissionChangeFeed,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_arrow_cache import (
+    SubmissionsArrowCache,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_search_index import (
+    SubmissionsSearchIndex,
+)
+from gws_forms.form_conditions.form_conditions import get_visible_questions, is_empty_answer
+
+# Files of the folder generated by StaticFormGenerator
+FORM_PAGE_FILE = "index.html"
+FORM_DEFINITION_FILE = "form.json"
+SUBMISSIONS_PATH = "/submissions"
+# The submissions received within this time (in seconds) are written together
+BATCH_INTERVAL = 0.5
+MAX_BATCH_SIZE = 1000
+MAX_BODY_BYTES = 1024 * 1024
+# Rate limit of the submissions of a client address (bucket capacity, refilled tokens per second)
+CLIENT_RATE_LIMIT = (20, 1)
+MAX_SUBMISSION_ID_LENGTH = 64
+
+logger = logging.getLogger(__name__)
+
+
+def validate_answers(form: dict, answers: list) -> Tuple[Optional[List[dict]], Optional[str]]:
+    """Check the answers of a submission of the static form, as the form does in the browser.
+
+    Return the (section, question, answer) of the visible questions to store, or the error.
+    """
+    questions = form["questions"]
+    if not isinstance(answers, list) or len(answers) != len(questions):
+        return None, f"Expected a list of {len(questions)} answers"
+    visible = get_visible_questions(form["dependency_graph"], answers)
+    for index, question in enumerate(questions):
+        answer = answers[index]
+        if not visible[index] or is_empty_answer(answer):
+            if visible[index] and question.get("required"):
+                return None, f"Question '{question['question']}' is required"
+            continue
+        allowed_values = question.get("allowed_values")
+        selected_values = answer if isinstance(answer, list) else [answer]
+        if allowed_values and any(value not in allowed_values for value in selected_values):
+            return None, f"Invalid answer for question '{question['question']}'"
+        if question.get("response_type") in ("numeric", "range") and not allowed_values:
+            if not isinstance(answer, (int, float)) or isinstance(answer, bool):
+                return None, f"Question '{question['question']}' expects a number"
+            if question.get("min_value") is not None and answer < question["min_value"] \
+                    or question.get("max_value") is not None and answer > question["max_value"]:
+                return None, f"Answer of question '{question['question']}' is out of range"
+        elif not allowed_values and not isinstance(answer, str):
+            return None, f"Question '{question['question']}' expects a text"
+    return get_answered_questions(answers, questions, visible), None
+
+
+class SubmissionsWriter:
+    """Write the submissions received by the ingestion server to the Answers folder, in batches.
+
+    The submissions are queued by the request threads and written by a single thread : all the submissions
+    received within `BATCH_INTERVAL` are appended to the ledger with one lock and one fsync, then the search
+    index, the Arrow cache and the change feed are updated once for the batch.
+
+    The page retries the submissions it has no answer for, each one has an id given by the page. A submission
+    whose id is already in the ledger is not written again, its stored sequence id is returned.
+    """
+
+    answers_path: str
+    form: dict
+
+    _queue: queue.Queue
+    # sequence id of the submissions by submission id, only used by the writer thread
+    _submission_seqs: Dict[str, int]
+
+    def __init__(self, answers_path: str, form: dict):
+        self.answers_path = answers_path
+        self.form = form
+        self._queue = queue.Queue()
+        prepare_form_folder(answers_path)
+        self._submission_seqs = {
+            record["submission_id"]: record["seq"]
+            for record in SubmissionLedger(os.path.join(answers_path, SUBMITTED_SESSIONS_DIR)).iter_records()
+            if "submission_id" in record
+        }
+        threading.Thread(target=self._write_batches, daemon=True).start()
+
+    def submit(self, token: str, questions: list, submission_id: str = None) -> Future:
+        """Queue a submission, the future is resolved with its sequence id once it is written"""
+        future = Future()
+        timestamp = datetime.now(tz=pytz.timezone('Europe/Paris')).strftime(SESSION_TIMESTAMP_FORMAT)
+        self._queue.put(((token, questions, timestamp, submission_id), future))
+        return future
+
+    def _write_batches(self) -> None:
+        submitted_directory = os.path.join(self.answers_path, SUBMITTED_SESSIONS_DIR)
+        ledger = SubmissionLedger(submitted_directory)
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < MAX_BATCH_SIZE:
+                    batch.append(self._queue.get(timeout=BATCH_INTERVAL))
+            except queue.Empty:
+                pass
+
+            # the submissions already written, or sent twice in the batch, are not written again
+            new_submissions = {}
+            for submission, _ in batch:
+                submission_id = submission[3]
+                if submission_id is None:
+                    new_submissions[id(submission)] = submission
+                elif submission_id not in self._submission_seqs:
+                    new_submissions.setdefault(submission_id, submission)
+            try:
+                records = ledger.append_many(list(new_submissions.values()))
+            except Exception as exception:  # pylint: disable=broad-except
+                for _, future in batch:
+                    future.set_exception(exception)
+                continue
+            record_seqs = {}
+            for key, record in zip(new_submissions, records):
+                record_seqs[key] = record["seq"]
+                if record.get("submission_id") is not None:
+                    self._submission_seqs[record["submission_id"]] = record["seq"]
+            for submission, future in batch:
+                seq = self._submission_seqs[submission[3]] if submission[3] is not None \
+                    else record_seqs[id(submission)]
+                future.set_result(seq)
+
+            # the derived files can be rebuilt from the ledger, a failure does not lose a submission
+            try:
+                SubmissionsSearchIndex(submitted_directory).sync()
+                SubmissionsArrowCache(submitted_directory, self.form["questions"]).sync()
+                SubmissionChangeFeed(submitted_directory).sync()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error while updating the submissions indexes")
+
+
+class IngestionRequestHandler(BaseHTTPRequestHandler):
+    """Serve the static form page and receive the batches of submissions posted by the page"""
+
+    # set by create_ingestion_server
+    form_dir: str = None
+    form: dict = None
+    writer: SubmissionsWriter = None
+    rate_limiter: RateLimiter = None
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0]
+        if path in ("/", "/" + FORM_PAGE_FILE):
+            file_name, content_type = FORM_PAGE_FILE, "text/html; charset=utf-8"
+        elif path == "/" + str(self.form.get("banner")) and os.path.basename(path) == path[1:] \
+                and os.path.isfile(os.path.join(self.form_dir, path[1:])):
+            # the banner copied next to the page by the generator, the other files are not served
+            file_name = path[1:]
+            content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+        else:
+            self._send_json(404, {"error": "Not found"})
+            return
+        with open(os.path.join(self.form_dir, file_name), "rb") as f:
+            content = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Cache-Control", "public, max-age=300")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_OPTIONS(self) -> None:
+        # the page may be hosted elsewhere (e.g. on a CDN)
+        self.send_response(204)
+        self._send_cors_headers()
+        self.end_headers()
+
+    def do_POST(self) -> None:
+        if self.path != SUBMISSIONS_PATH:
+            self._send_json(404, {"error": "Not found"})
+            return
+        if not self.rate_limiter.allow(self.client_address[0]):
+            self._send_json(429, {"error": "Too many submissions"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "Request too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length))
+            submissions = body["submissions"]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": "Invalid request"})
+            return
+        if body.get("form_id") != self.form["id"] or not isinstance(submissions, list):
+            self._send_json(400, {"error": "Invalid request"})
+            return
+
+        futures = []
+        rejected = []
+        for index, submission in enumerate(submissions):
+            if not isinstance(submission, dict) or not submission.get("token"):
+                rejected.append({"index": index, "id": None, "error": "Missing token"})
+                continue
+            # the pages generated before the submission ids send none
+            submission_id = submission.get("id")
+            if submission_id is not None and (not isinstance(submission_id, str)
+                                              or len(submission_id) > MAX_SUBMISSION_ID_LENGTH):
+                rejected.append({"index": index, "id": None, "error": "Invalid submission id"})
+                continue
+            questions, error = validate_answers(self.form, submission.get("answers"))
+            if error is not None:
+                rejected.append({"index": index, "id": submission_id, "error": error})
+                continue
+            futures.append((submission_id, self.writer.submit(str(submission["token"])[:64], questions,
+                                                               submission_id)))
+
+        # answer once the submissions are written, the page keeps them until then
+        try:
+            accepted = [{"id": submission_id, "seq": future.result()} for submission_id, future in futures]
+        except Exception:  # pylint: disable=broad-except
+            self._send_json(503, {"error": "The submissions could not be saved"})
+            return
+        self._send_json(200, {"accepted": accepted, "rejected": rejected})
+
+    def _send_json(self, status: int, content: dict) -> None:
+        data = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self._send_cors_headers()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_cors_headers(self) -> None:
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+
+    def log_message(self, format, *args) -> None:  # pylint: disable=redefined-builtin
+        # the requests are not logged, there is one per respondent
+        pass
+
+
+def create_ingestion_server(form_dir: str, answers_path: str, host: str = "0.0.0.0",
+                            port: int = 8080) -> ThreadingHTTPServer:
+    """Create the server of a static form generated by StaticFormGenerator, the answers are written
+    to `answers_path` with the layout of the Answers folder of the forms dashboard"""
+    with open(os.path.join(form_dir, FORM_DEFINITION_FILE), "r", encoding="utf-8") as f:
+        form = json.load(f)
+    handler = type("FormIngestionRequestHandler", (IngestionRequestHandler,), {
+        "form_dir": form_dir,
+        "form": form,
+        "writer": SubmissionsWriter(answers_path, form),
+        "rate_limiter": RateLimiter(*CLIENT_RATE_LIMIT),
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a static form and write its submissions")
+    parser.add_argument("form_dir", help="Folder generated by the StaticFormGenerator task")
+    parser.add_argument("answers_dir", help="Answers folder where the submissions are written")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = create_ingestion_server(args.form_dir, args.answers_dir, args.host, args.port)
+    print(f"Serving the form on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+
+from gws_core import (
+    ConfigParams,
+    ConfigSpecs,
+    File,
+    Folder,
+    InputSpec,
+    InputSpecs,
+    JSONDict,
+    OutputSpec,
+    OutputSpecs,
+    StrParam,
+    Task,
+    TaskInputs,
+    TaskOutputs,
+    Text,
+    TextParam,
+    TypingStyle,
+    task_decorator,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.form_registry import create_form_id
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import prepare_form_folder
+from gws_forms.dashboard.streamlit_generator import prepare_banner
+from gws_forms.form_conditions.form_conditions import compile_dependency_graph
+from gws_forms.static_form.ingestion_server import FORM_DEFINITION_FILE, FORM_PAGE_FILE, SUBMISSIONS_PATH
+
+# Template of the form page, the form definition replaces the placeholder
+FORM_TEMPLATE_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), "_static_form_code", "form.html")
+FORM_DATA_PLACEHOLDER = "__FORM_DATA__"
+
+
+@task_decorator(
+    "StaticFormGenerator",
+    human_name="Static form",
+    short_description="Task to generate a static HTML form for forms with many respondents",
+    style=TypingStyle.material_icon(material_icon_name="dynamic_form", background_color="#413ebb"),
+)
+class StaticFormGenerator(Task):
+    """
+    StaticFormGenerator compiles the questions into a single static HTML page, an alternative to the Streamlit
+    forms dashboard when a form has many respondents at the same time. The page renders the form, evaluates the
+    question conditions and validates the answers in the browser, the server only receives the submissions.
+
+    The answers are kept in the browser and the submissions are posted in batches to an ingestion endpoint,
+    retried until accepted. The ingestion server of the brick serves the page and writes the submissions to the
+    Answers folder, with the same layout as the forms dashboard (ledger, search index, change feed...) :
+
+    `python -m gws_forms.static_form.ingestion_server <static form folder> <answers folder> --port 8080`
+
+    Input :  a JSONDict containing the questions and optionally a banner.
+    Output : the static form folder (index.html and form.json) and the Answers folder.
+    """
+
+    input_specs: InputSpecs = InputSpecs(
+        {
+            "questions_file": InputSpec(JSONDict, human_name="JSONDict containing the questions"),
+            "banner": InputSpec([File, Text], human_name="Banner", optional=True),
+        }
+    )
+    output_specs: OutputSpecs = OutputSpecs(
+        {
+            "static_form": OutputSpec(Folder, human_name="Static form"),
+            "answers_folder": OutputSpec(Folder, human_name="Answers"),
+        }
+    )
+    config_specs: ConfigSpecs = ConfigSpecs(
+        {
+            "title": StrParam(human_name="Title", short_description="Title of the form", optional=False),
+            "description": TextParam(
+                human_name="Description", short_description="Description of the form", optional=False
+            ),
+            "ingestion_url": StrParam(
+                human_name="Ingestion url",
+                short_description="Url the submissions are posted to, the ingestion server serving the page by default",
+                default_value=SUBMISSIONS_PATH,
+            ),
+        }
+    )
+
+    def run(self, params: ConfigParams, inputs: TaskInputs) -> TaskOutputs:
+        questions = inputs["questions_file"].get_data()["questions"]
+        static_form = Folder(self.create_tmp_dir())
+        static_form.name = "Static form"
+
+        banner = inputs.get("banner")
+        banner_url = None
+        if banner is not None:
+            # the optimized banner, or the original file, is served next to the page
+            banner_file = prepare_banner(self, banner) or (banner if isinstance(banner, File) else None)
+            if banner_file is not None:
+                banner_url = os.path.basename(banner_file.path)
+                shutil.copyfile(banner_file.path, os.path.join(static_form.path, banner_url))
+            else:
+                banner_url = banner.get_data()
+
+        form = {
+            "id": create_form_id(params["title"], []),
+            "title": params["title"],
+            "description": params["description"],
+            "banner": banner_url,
+            "ingestion_url": params["ingestion_url"],
+            "questions": questions,
+            "dependency_graph": compile_dependency_graph(questions),
+        }
+        # the definition is read by the ingestion server to validate the submissions
+        with open(os.path.join(static_form.path, FORM_DEFINITION_FILE), "w", encoding="utf-8") as f:
+            json.dump(form, f, ensure_ascii=False)
+
+        with open(FORM_TEMPLATE_PATH, "r", encoding="utf-8") as f:
+            template = f.read()
+        # escape the closing tags so the data can not end the script element
+        form_data = json.dumps(form, ensure_ascii=False).replace("</", "<\\/")
+        with open(os.path.join(static_form.path, FORM_PAGE_FILE), "w", encoding="utf-8") as f:
+            f.write(template.replace(FORM_DATA_PLACEHOLDER, form_data))
+        self.log_info_message(f"Static form generated with {len(questions)} questions")
+
+        answers_folder = Folder(self.create_tmp_dir())
+        answers_folder.name = "Answers"
+        prepare_form_folder(answers_folder.path)
+
+        return {"static_form": static_form, "answers_folder": answers_folder}
@@ -0,0 +1,75 @@
+"""Measure the startup cost of the form dashboard.
+
+Run it with `python tests/benchmarks/form_dashboard_startup.py`. It reports :
+- the import time of the modules imported by the form dashboard (the imports of its main.py,
+  gws_core and gws_streamlit_main included), in a fresh interpreter,
+- the time to prepare a form folder for the first session of the process and for the next sessions.
+"""
+import ast
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+DASHBOARD_MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "gws_forms",
+                              "dashboard", "_form_dashboard_code", "main.py")
+REPEAT = 5
+LEGACY_SUBMISSIONS = 200
+
+
+def get_dashboard_imports() -> list:
+    """Return the module level imports of the dashboard, so the benchmark imports what the app imports"""
+    with open(DASHBOARD_MAIN, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure_imports(imports: list) -> float:
+    """Return the best time (in seconds) to run the imports in a fresh interpreter"""
+    code = "import time; start = time.perf_counter(); " + "; ".join(imports) \
+        + "; print(time.perf_counter() - start)"
+    timings = []
+    for _ in range(REPEAT):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def measure_prepare_form_folder() -> tuple:
+    """Return the time of the first and of the next preparations of a form folder"""
+    from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+        SUBMITTED_SESSIONS_DIR,
+        prepare_form_folder,
+    )
+
+    with tempfile.TemporaryDirectory() as form_folder:
+        # submissions saved as one file each, imported in the ledger by the first preparation
+        submitted_directory = os.path.join(form_folder, SUBMITTED_SESSIONS_DIR)
+        os.makedirs(submitted_directory)
+        for index in range(LEGACY_SUBMISSIONS):
+            with open(os.path.join(submitted_directory, f"session_{index}.json"), "w", encoding="utf-8") as f:
+                json.dump({"questions": [], "timestamp": "01-01-2025-00-00-00"}, f)
+
+        start = time.perf_counter()
+        prepare_form_folder(form_folder)
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            prepare_form_folder(form_folder)
+        return first, (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    print(f"Dashboard imports : {measure_imports(get_dashboard_imports()) * 1000:.1f} ms")
+
+    first, next_ = measure_prepare_form_folder()
+    print(f"Form folder preparation, first session : {first * 1000:.2f} ms "
+          f"({LEGACY_SUBMISSIONS} legacy submissions)")
+    print(f"Form folder preparation, next sessions : {next_ * 1000:.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
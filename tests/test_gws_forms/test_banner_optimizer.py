@@ -0,0 +1,47 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard.banner_optimizer import (
+    BANNER_MAX_WIDTH,
+    BANNER_RESOURCE_NAME,
+    find_banner_path,
+    optimize_banner,
+)
+from PIL import Image
+
+
+class TestBannerOptimizer(BaseTestCase):
+    """Unit tests for the optimization of the form banner."""
+
+    def test_optimize_banner(self):
+        """Test that a large banner is downscaled to the page width and recompressed in WebP."""
+        directory = tempfile.mkdtemp()
+        image_path = os.path.join(directory, "banner.png")
+        Image.effect_noise((2 * BANNER_MAX_WIDTH, 400), 64).convert("RGB").save(image_path)
+
+        banner_path = optimize_banner(image_path, directory)
+        self.assertIsNotNone(banner_path)
+        self.assertLess(os.path.getsize(banner_path), os.path.getsize(image_path))
+        with Image.open(banner_path) as banner:
+            self.assertEqual(banner.format, "WEBP")
+            self.assertEqual(banner.size, (BANNER_MAX_WIDTH, 200))
+
+    def test_banner_not_optimized(self):
+        """Test that a file which is not an image is used as is."""
+        directory = tempfile.mkdtemp()
+        svg_path = os.path.join(directory, "banner.svg")
+        with open(svg_path, "w", encoding="utf-8") as f:
+            f.write('<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"></svg>')
+        self.assertIsNone(optimize_banner(svg_path, directory))
+
+    def test_find_banner_path(self):
+        """Test that the banner is found among the sources of the app by its name, not its position."""
+        banner = SimpleNamespace(name=BANNER_RESOURCE_NAME, path="/app/banner.webp")
+        answers_folder = SimpleNamespace(name="Answers", path="/app/answers")
+        questions = SimpleNamespace(name="Questions")
+
+        self.assertEqual(find_banner_path([questions, answers_folder, banner]), "/app/banner.webp")
+        self.assertEqual(find_banner_path([banner, answers_folder]), "/app/banner.webp")
+        self.assertIsNone(find_banner_path([questions, answers_folder]))
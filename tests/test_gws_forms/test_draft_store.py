@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import threading
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard_creation._dashboard_code.session_management.draft_store import (
+    DraftStore,
+    apply_diff,
+    compute_diff,
+)
+
+
+def _questions(count: int) -> list:
+    return [{"section": "S", "question": f"Q{index}", "response_type": "short_text"} for index in range(count)]
+
+
+class TestDraftStore(BaseTestCase):
+    """Unit tests for the versioned drafts of the creation dashboard."""
+
+    def test_diff_round_trip(self):
+        """Test that applying the diff of two lists of questions to the first gives the second."""
+        old_questions = _questions(3)
+        updated = [dict(question) for question in old_questions]
+        updated[1]["question"] = "Q1 edited"
+        updated[1]["required"] = True
+        del updated[2]["response_type"]
+
+        for new_questions in [old_questions, updated, updated + _questions(2), updated[:1], []]:
+            ops = compute_diff(old_questions, new_questions)
+            self.assertEqual(apply_diff(old_questions, ops), new_questions)
+        self.assertEqual(compute_diff(old_questions, old_questions), [])
+        # only the modified fields are stored
+        self.assertEqual(compute_diff(old_questions, updated)[0],
+                         {"op": "update", "index": 1, "fields": {"question": "Q1 edited", "required": True},
+                          "removed": []})
+        # the diff does not modify the old questions
+        self.assertEqual(old_questions, _questions(3))
+
+    def test_versions_restored(self):
+        """Test that each version is restored across the snapshots and the diffs."""
+        directory = tempfile.mkdtemp()
+        store = DraftStore(directory, rebase_interval=3)
+        draft_id = store.create_draft_id("Alice")
+        for count in range(1, 8):
+            store.save(draft_id, _questions(count), "Alice")
+
+        self.assertEqual(store.get_meta(draft_id)["snapshots"], [1, 4, 7])
+        for version in range(1, 8):
+            self.assertEqual(store.load(draft_id, version), _questions(version))
+
+    def test_versions_listed_from_meta(self):
+        """Test that the versions are listed from draft.json without reading the snapshots."""
+        directory = tempfile.mkdtemp()
+        store = DraftStore(directory, rebase_interval=2)
+        draft_id = store.create_draft_id("Alice")
+        for count in range(1, 4):
+            store.save(draft_id, _questions(count), "Alice")
+        # saving the same questions does not create a version
+        store.save(draft_id, _questions(3), "Alice")
+
+        draft_path = os.path.join(directory, draft_id)
+        for file_name in os.listdir(draft_path):
+            if file_name.startswith("snapshot-"):
+                os.remove(os.path.join(draft_path, file_name))
+        self.assertEqual([version["version"] for version in store.list_versions(draft_id)], [1, 2, 3])
+
+    def test_versions_of_drafts_without_dates(self):
+        """Test that the versions of a draft saved before the dates were kept in draft.json are listed."""
+        directory = tempfile.mkdtemp()
+        store = DraftStore(directory, rebase_interval=2)
+        draft_id = store.create_draft_id("Alice")
+        for count in range(1, 4):
+            store.save(draft_id, _questions(count), "Alice")
+        expected_versions = store.list_versions(draft_id)
+
+        meta_path = os.path.join(directory, draft_id, DraftStore.META_FILE)
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        del meta["versions"]
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        self.assertEqual(store.list_versions(draft_id), expected_versions)
+
+        store.save(draft_id, _questions(4), "Alice")
+        self.assertEqual([version["version"] for version in store.get_meta(draft_id)["versions"]], [1, 2, 3, 4])
+
+    def test_concurrent_saves(self):
+        """Test that the sessions saving the same draft at the same time each get a version."""
+        directory = tempfile.mkdtemp()
+        store = DraftStore(directory, rebase_interval=3)
+        draft_id = store.create_draft_id("Alice")
+        threads = [threading.Thread(target=DraftStore(directory, rebase_interval=3).save,
+                                    args=(draft_id, _questions(count), "Alice")) for count in range(1, 9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([version["version"] for version in store.list_versions(draft_id)], list(range(1, 9)))
+        self.assertEqual(sorted(len(store.load(draft_id, version)) for version in range(1, 9)), list(range(1, 9)))
+        self.assertFalse([f for f in os.listdir(os.path.join(directory, draft_id)) if f.endswith(".tmp")])
+
+    def test_legacy_import_interrupted(self):
+        """Test that a legacy file imported again after an interrupted import does not duplicate the draft."""
+        directory = tempfile.mkdtemp()
+        legacy_path = os.path.join(directory, "session-Alice-01_01_2025-12h00.json")
+        with open(legacy_path, "w", encoding="utf-8") as f:
+            json.dump({"questions": _questions(2)}, f)
+        store = DraftStore(directory)
+        # crash after the save, before the file is removed
+        store.save(store.create_draft_id("Alice", key="session-Alice-01_01_2025-12h00.json"), _questions(2), "Alice")
+
+        self.assertEqual(store.import_legacy_files(), 1)
+        self.assertEqual(len(store.list_draft_ids()), 1)
+        self.assertEqual(store.list_versions(store.list_draft_ids()[0])[-1]["version"], 1)
+        self.assertFalse(os.path.exists(legacy_path))
@@ -1,7 +1,13 @@
 import os
+import tempfile
+from unittest.mock import patch
 
+import pandas as pd
 from gws_core import BaseTestCase, File, JSONDict, TaskRunner
 from gws_forms.excel_form_file_to_json_dict.excel_form_file_to_json_dict import (
+    CONVERT_PROGRESS,
+    EXCEL_FORM_COLUMNS,
+    PROGRESS_UPDATES,
     ExcelFormFileToJsonDict,
 )
 
@@ -189,3 +195,43 @@ class TestExcelFormFileToJsonDict(BaseTestCase):
         q2 = data["questions"][1]
         self.assertEqual(q2["title"], "Q2")
         self.assertFalse(q2["required"])
+
+    def test_condition_columns_are_optional(self):
+        """Test that files without the condition columns give questions without condition."""
+        excel_path = os.path.join(TESTDATA_DIR, "form_questions.xlsx")
+
+        runner = TaskRunner(
+            task_type=ExcelFormFileToJsonDict,
+            inputs={"excel_file": File(path=excel_path)},
+            params={"language": "en"},
+        )
+        outputs = runner.run()
+
+        for question in outputs["json_dict"].get_data()["questions"]:
+            self.assertNotIn("condition", question)
+
+    def test_large_form_progress(self):
+        """Test that a sheet with many rows is converted with bounded progress updates and a timing log."""
+        rows = [[f"Section {index // 10}", f"T{index}", f"Question {index}", "", "numeric", index % 2 == 0,
+                 None, 0, index, None] for index in range(250)]
+        excel_path = os.path.join(tempfile.mkdtemp(), "large_form.xlsx")
+        pd.DataFrame(rows, columns=EXCEL_FORM_COLUMNS).to_excel(excel_path, index=False)
+
+        with patch.object(ExcelFormFileToJsonDict, "update_progress_value", autospec=True) as update_progress, \
+                patch.object(ExcelFormFileToJsonDict, "log_info_message", autospec=True) as log_info:
+            runner = TaskRunner(task_type=ExcelFormFileToJsonDict, inputs={"excel_file": File(path=excel_path)},
+                                params={"language": "en"})
+            questions = runner.run()["json_dict"].get_data()["questions"]
+
+        self.assertEqual(len(questions), 250)
+        self.assertEqual(questions[7], {"section": "Section 0", "title": "T7", "question": "Question 7",
+                                        "description": "", "response_type": "numeric", "required": False,
+                                        "min_value": 0, "max_value": 7})
+        progress_values = [call.args[1] for call in update_progress.call_args_list]
+        self.assertEqual(progress_values[0], 0)
+        self.assertAlmostEqual(progress_values[-1], CONVERT_PROGRESS)
+        self.assertLessEqual(len(progress_values), PROGRESS_UPDATES + 2)
+        self.assertEqual(progress_values, sorted(progress_values))
+        messages = [call.args[1] for call in log_info.call_args_list]
+        self.assertIn("250 rows read, 250 questions built (0 with a condition)", messages)
+        self.assertTrue(any(message.startswith("Timing : read ") for message in messages))
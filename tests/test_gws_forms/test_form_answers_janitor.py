@@ -0,0 +1,72 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+
+from gws_core import BaseTestCase, Folder, TaskRunner
+from gws_forms.dashboard._form_dashboard_code.session_management.funnel_statistics import FunnelStatistics
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    get_session_path,
+    load_session,
+    save_draft,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+from gws_forms.form_answers_janitor.form_answers_janitor import FormAnswersJanitor
+
+
+class TestFormAnswersJanitor(BaseTestCase):
+    """Unit tests for the FormAnswersJanitor task."""
+
+    def test_clean_answers_folder(self):
+        """Test that submitted drafts are deleted, idle drafts archived and their tokens pruned."""
+        answers_path = tempfile.mkdtemp()
+        sessions_dir = os.path.join(answers_path, "saved_sessions")
+        submitted_dir = os.path.join(answers_path, "submitted_sessions")
+        os.makedirs(sessions_dir)
+        os.makedirs(submitted_dir)
+        with open(os.path.join(answers_path, "sessions-token.json"), "w", encoding="utf8") as f:
+            json.dump({"a@test.com": 111111, "b@test.com": 222222, "c@test.com": 333333}, f)
+
+        for token in ["111111", "222222", "333333"]:
+            save_draft([token], sessions_dir, token,
+                       get_progress=lambda answers: {"S": {"answered": 1, "required": 0, "required_answered": 0}})
+        self.assertEqual(FunnelStatistics(sessions_dir).read()["started"], 3)
+        # 111111 submitted after its last save
+        SubmissionLedger(submitted_dir).append("111111", [{"section": "S", "question": "Q1", "answer": "111111"}],
+                                               "01-01-2100-00-00-00")
+        # 222222 not modified for 100 days
+        idle_time = time.time() - 100 * 24 * 3600
+        os.utime(get_session_path(sessions_dir, "222222"), (idle_time, idle_time))
+
+        runner = TaskRunner(task_type=FormAnswersJanitor,
+                            inputs={"answers_folder": Folder(answers_path)}, params={"idle_days": 90})
+        report = runner.run()["report"].get_data()
+
+        self.assertEqual(report["Submitted drafts deleted"].tolist(), [1])
+        self.assertEqual(report["Idle drafts archived"].tolist(), [1])
+        self.assertEqual(report["Tokens pruned"].tolist(), [2])
+        self.assertEqual(load_session(sessions_dir, "111111")["answers"], [])
+        self.assertEqual(load_session(sessions_dir, "222222")["answers"], [])
+        self.assertEqual(load_session(sessions_dir, "333333")["version"], 1)
+        # the removed drafts are no longer counted as started, their lock files are kept
+        self.assertEqual(FunnelStatistics(sessions_dir).read(),
+                         {"started": 1, "submitted_drafts": 0, "submitted_tokens": 0, "submitted_tokens_seq": 0,
+                          "sections": {"S": {"started": 1, "completed": 1}}})
+        self.assertTrue(os.path.exists(get_session_path(sessions_dir, "111111")[:-len(".json")] + ".lock"))
+        with open(os.path.join(answers_path, "sessions-token.json"), "r", encoding="utf8") as f:
+            self.assertEqual(json.load(f), {"c@test.com": 333333})
+
+        archive_dir = os.path.join(sessions_dir, "archive")
+        archived = []
+        for file_name in os.listdir(archive_dir):
+            with gzip.open(os.path.join(archive_dir, file_name), "rt", encoding="utf-8") as f:
+                archived.extend(json.loads(line) for line in f)
+        self.assertEqual([line["token"] for line in archived], ["222222"])
+
+        # the second run does not check the same submissions again
+        report = TaskRunner(task_type=FormAnswersJanitor, inputs={"answers_folder": Folder(answers_path)},
+                            params={"idle_days": 90}).run()["report"].get_data()
+        self.assertEqual(report["Submitted drafts deleted"].tolist(), [0])
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+
+from gws_core import BaseTestCase, Folder, TaskRunner
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    get_session_path,
+    load_session,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+from gws_forms.form_answers_layout_migrator.form_answers_layout_migrator import (
+    FormAnswersLayoutMigrator,
+)
+
+
+class TestFormAnswersLayoutMigrator(BaseTestCase):
+    """Unit tests for the FormAnswersLayoutMigrator task."""
+
+    def _write_json(self, path: str, data: dict):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def test_migrate_single_form_answers(self):
+        """Test that flat drafts are moved to their shard and submission files imported in the ledger."""
+        answers_path = tempfile.mkdtemp()
+        sessions_dir = os.path.join(answers_path, "saved_sessions")
+        submitted_dir = os.path.join(answers_path, "submitted_sessions")
+        os.makedirs(sessions_dir)
+        os.makedirs(submitted_dir)
+
+        for token in ["111111", "222222", "333333"]:
+            self._write_json(os.path.join(sessions_dir, f"session_{token}.json"),
+                             {"questions": [{"question": "Q1", "answer": token}]})
+        self._write_json(os.path.join(submitted_dir, "session_111111_01-01-2025-10-00-00.json"),
+                         {"questions": [{"question": "Q1", "answer": "A"}], "timestamp": "01-01-2025-10-00-00"})
+
+        runner = TaskRunner(task_type=FormAnswersLayoutMigrator,
+                            inputs={"answers_folder": Folder(answers_path)}, params={})
+        report = runner.run()["report"].get_data()
+
+        self.assertEqual(report["Drafts moved"].sum(), 3)
+        self.assertEqual(report["Submissions imported"].sum(), 1)
+
+        for token in ["111111", "222222", "333333"]:
+            self.assertTrue(os.path.exists(get_session_path(sessions_dir, token)))
+            self.assertFalse(os.path.exists(os.path.join(sessions_dir, f"session_{token}.json")))
+            self.assertEqual(load_session(sessions_dir, token)["questions"][0]["answer"], token)
+
+        ledger = SubmissionLedger(submitted_dir)
+        self.assertEqual(ledger.count(), 1)
+        self.assertEqual(ledger.get(1)["token"], "111111")
+
+    def test_migrate_is_idempotent(self):
+        """Test that migrating an already migrated folder does nothing."""
+        answers_path = tempfile.mkdtemp()
+        sessions_dir = os.path.join(answers_path, "saved_sessions")
+        os.makedirs(sessions_dir)
+        self._write_json(os.path.join(sessions_dir, "session_111111.json"), {"questions": []})
+
+        for expected_moved in [1, 0]:
+            runner = TaskRunner(task_type=FormAnswersLayoutMigrator,
+                                inputs={"answers_folder": Folder(answers_path)}, params={})
+            report = runner.run()["report"].get_data()
+            self.assertEqual(report["Drafts moved"].sum(), expected_moved)
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+
+from gws_core import BaseTestCase, Folder, JSONDict, TaskRunner
+from gws_forms.dashboard._form_dashboard_code.session_management.answers_migration import (
+    compute_question_mapping,
+    get_form_fingerprint,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.funnel_statistics import FunnelStatistics
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    get_session_path,
+    load_session,
+    save_draft,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+from gws_forms.form_answers_migrator.form_answers_migrator import FormAnswersMigrator
+
+OLD_QUESTIONS = [
+    {"section": "Personal Info", "question": "What is your nmae?", "required": True},
+    {"section": "Personal Info", "question": "Do you smoke?", "required": False},
+    {"section": "Health", "question": "How many hours do you sleep?", "required": False},
+    {"id": "q4", "section": "Health", "question": "Favourite sport", "required": False},
+]
+NEW_QUESTIONS = [
+    {"section": "Health", "question": "Do you smoke?", "required": False},
+    {"id": "q4", "section": "Health", "question": "What is your favourite sport?", "required": False},
+    {"section": "Personal Info", "question": "What is your name?", "required": True},
+    {"section": "Health", "question": "Do you drink coffee?", "required": False},
+]
+
+
+class TestFormAnswersMigrator(BaseTestCase):
+    """Unit tests for the question mapping and the FormAnswersMigrator task."""
+
+    def test_question_mapping(self):
+        """Test that the questions are matched by id, by question and by similarity."""
+        mapping = compute_question_mapping(OLD_QUESTIONS, NEW_QUESTIONS)
+        self.assertEqual(mapping[0][:2], (2, "fuzzy"))
+        self.assertEqual(mapping[1], (0, "question", 1.0))
+        self.assertIsNone(mapping[2])
+        self.assertEqual(mapping[3], (1, "id", 1.0))
+
+    def test_migrate_answers(self):
+        """Test that the drafts and the submissions are migrated to the new questions, once."""
+        answers_path = tempfile.mkdtemp()
+        sessions_dir = os.path.join(answers_path, "saved_sessions")
+        submitted_dir = os.path.join(answers_path, "submitted_sessions")
+        os.makedirs(sessions_dir)
+        os.makedirs(submitted_dir)
+        save_draft(["Alice", "no", 8, "swim"], sessions_dir, "111111")
+        # a draft saved before the answers arrays
+        legacy_path = get_session_path(sessions_dir, "222222")
+        os.makedirs(os.path.dirname(legacy_path), exist_ok=True)
+        with open(legacy_path, "w", encoding="utf-8") as f:
+            json.dump({"questions": [{"section": "Personal Info", "question": "Do you smoke?", "answer": "yes"}]}, f)
+        # a draft saved before the shards
+        save_draft(["Erin", "yes", 6, None], sessions_dir, "333333")
+        os.replace(get_session_path(sessions_dir, "333333"), os.path.join(sessions_dir, "session_333333.json"))
+        # a draft already saved with the new form, without progress
+        save_draft(["no", None, "Fay", None], sessions_dir, "444444",
+                   form_fingerprint=get_form_fingerprint(NEW_QUESTIONS))
+        ledger = SubmissionLedger(submitted_dir, segment_max_bytes=200)
+        for name in ["Bob", "Carol", "Dan"]:
+            ledger.append(name, [{"section": "Personal Info", "question": "What is your nmae?", "answer": name},
+                                 {"section": "Health", "question": "How many hours do you sleep?", "answer": 7}],
+                          "01-01-2025-00-00-00")
+
+        old_questions, new_questions = JSONDict(), JSONDict()
+        old_questions.data = {"questions": OLD_QUESTIONS}
+        new_questions.data = {"questions": NEW_QUESTIONS}
+        # the migrated folder is migrated again
+        input_path = answers_path
+        for _ in range(2):
+            runner = TaskRunner(task_type=FormAnswersMigrator,
+                                inputs={"answers_folder": Folder(input_path), "old_questions_file": old_questions,
+                                        "new_questions_file": new_questions},
+                                params={"max_workers": 2})
+            outputs = runner.run()
+            mapping = outputs["mapping"].get_data()
+            input_path = outputs["answers_folder"].path
+
+        # the input folder is not modified
+        self.assertEqual(load_session(sessions_dir, "111111")["answers"], ["Alice", "no", 8, "swim"])
+        self.assertEqual(SubmissionLedger(submitted_dir).get(1)["questions"][0]["question"], "What is your nmae?")
+        sessions_dir = os.path.join(input_path, "saved_sessions")
+        submitted_dir = os.path.join(input_path, "submitted_sessions")
+
+        self.assertEqual(mapping["Match"].tolist(), ["fuzzy", "question", "removed", "id", "added"])
+        self.assertEqual(load_session(sessions_dir, "111111")["answers"], ["no", "swim", "Alice", None])
+        self.assertEqual(load_session(sessions_dir, "222222")["answers"], ["yes", None, None, None])
+        self.assertEqual(load_session(sessions_dir, "333333")["answers"], ["yes", None, "Erin", None])
+        self.assertEqual(FunnelStatistics(sessions_dir).read()["started"], 3)
+
+        records = list(SubmissionLedger(submitted_dir).iter_records())
+        self.assertEqual([record["token"] for record in records], ["Bob", "Carol", "Dan"])
+        # the answers of the removed question are kept in the submissions
+        self.assertEqual(records[2]["questions"], [
+            {"section": "Personal Info", "question": "What is your name?", "answer": "Dan"},
+            {"section": "Health", "question": "How many hours do you sleep?", "answer": 7}])
+        self.assertEqual(SubmissionLedger(submitted_dir).get(2)["token"], "Carol")
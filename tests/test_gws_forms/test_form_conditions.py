@@ -0,0 +1,88 @@
+from gws_core import BaseTestCase
+from gws_forms.form_conditions.form_conditions import (
+    compile_dependency_graph,
+    evaluate_condition,
+    get_visible_questions,
+    update_visible_questions,
+)
+
+
+def _question(question: str, condition: dict = None) -> dict:
+    data = {"section": "S", "question": question, "response_type": "short_text", "required": False}
+    if condition:
+        data["condition"] = condition
+    return data
+
+
+class TestFormConditions(BaseTestCase):
+    """Unit tests for the question conditions."""
+
+    def test_evaluate_condition(self):
+        """Test the condition operators."""
+        self.assertTrue(evaluate_condition("equals", "yes", "yes"))
+        self.assertFalse(evaluate_condition("equals", "yes", None))
+        self.assertTrue(evaluate_condition("equals", 3.0, 3))
+        self.assertTrue(evaluate_condition("not_equals", "yes", "no"))
+        self.assertTrue(evaluate_condition("in", ["red", "blue"], ["green", "blue"]))
+        self.assertTrue(evaluate_condition("contains", "red", ["red", "green"]))
+        self.assertTrue(evaluate_condition("greater_than", 18, 20))
+        self.assertFalse(evaluate_condition("less_than", 18, "not a number"))
+        self.assertTrue(evaluate_condition("answered", None, "text"))
+        self.assertFalse(evaluate_condition("answered", None, []))
+
+    def test_compile_dependency_graph(self):
+        """Test that the conditions are resolved and the linked questions grouped."""
+        questions = [
+            _question("Do you smoke?"),
+            _question("How many per day?", {"question": "Do you smoke?", "operator": "equals", "value": "yes"}),
+            _question("Since when?", {"question": "How many per day?", "operator": "answered"}),
+            _question("Name?"),
+        ]
+
+        graph = compile_dependency_graph(questions)
+
+        self.assertIsNone(graph["conditions"][0])
+        self.assertEqual(graph["conditions"][1]["question_index"], 0)
+        self.assertEqual(graph["dependents"], [[1], [2], [], []])
+        self.assertEqual(graph["groups"], [[0, 1, 2]])
+
+    def test_invalid_reference(self):
+        """Test that a condition on a later or unknown question is rejected."""
+        with self.assertRaises(ValueError):
+            compile_dependency_graph([
+                _question("First?", {"question": "Second?", "operator": "answered"}),
+                _question("Second?"),
+            ])
+
+    def test_visible_questions(self):
+        """Test that a question depending on a hidden question is hidden."""
+        graph = compile_dependency_graph([
+            _question("Do you smoke?"),
+            _question("How many per day?", {"question": "Do you smoke?", "operator": "equals", "value": "yes"}),
+            _question("Since when?", {"question": "How many per day?", "operator": "answered"}),
+        ])
+
+        self.assertEqual(get_visible_questions(graph, ["no", "10", None]), [True, False, False])
+        self.assertEqual(get_visible_questions(graph, ["yes", "10", None]), [True, True, True])
+
+    def test_update_visible_questions(self):
+        """Test that a changed answer updates the visibility of its dependents only, as a full evaluation."""
+        graph = compile_dependency_graph([
+            _question("Do you smoke?"),
+            _question("How many per day?", {"question": "Do you smoke?", "operator": "equals", "value": "yes"}),
+            _question("Since when?", {"question": "How many per day?", "operator": "answered"}),
+            _question("Name?"),
+        ])
+        answers = ["yes", "10", None, None]
+        visible = get_visible_questions(graph, answers)
+
+        answers[0] = "no"
+        self.assertEqual(sorted(update_visible_questions(graph, answers, visible, 0)), [1, 2])
+        self.assertEqual(visible, get_visible_questions(graph, answers))
+
+        answers[3] = "Alice"
+        self.assertEqual(update_visible_questions(graph, answers, visible, 3), [])
+
+        answers[0] = "yes"
+        self.assertEqual(sorted(update_visible_questions(graph, answers, visible, 0)), [1, 2])
+        self.assertEqual(visible, [True, True, True, True])
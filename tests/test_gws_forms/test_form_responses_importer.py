@@ -0,0 +1,96 @@
+import os
+import tempfile
+
+from gws_core import BaseTestCase, File, Folder, JSONDict, TaskRunner
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+from gws_forms.form_responses_importer.form_responses_importer import FormResponsesImporter
+
+QUESTIONS = [
+    {"section": "Personal Info", "question": "What is your name?", "response_type": "text", "required": True},
+    {"section": "Health", "question": "Do you smoke?", "response_type": "text", "allowed_values": ["yes", "no"],
+     "required": True},
+    {"section": "Health", "question": "Cigarettes per day", "response_type": "numeric", "min_value": 1,
+     "max_value": 100, "required": True, "condition": {"question": "Do you smoke?", "value": "yes"}},
+    {"section": "Health", "question": "Sports", "response_type": "text", "allowed_values": ["run", "swim"],
+     "multiselect": True},
+]
+
+
+class TestFormResponsesImporter(BaseTestCase):
+    """Unit tests for the FormResponsesImporter task."""
+
+    def test_import_responses(self):
+        """Test that the valid rows are submitted and the invalid rows reported."""
+        responses_path = os.path.join(tempfile.mkdtemp(), "responses.csv")
+        with open(responses_path, "w", encoding="utf-8") as f:
+            f.write("Session token,What is your name?,Health - Do you smoke?,Cigarettes per day,Sports\n"
+                    "111111,Alice,no,,\"run, swim\"\n"
+                    ",Bob,yes,10,\n"
+                    "333333,,maybe,,\n"
+                    "444444,Dan,yes,,fly\n"
+                    "555555,Eve,no,500,\n")
+        json_dict = JSONDict()
+        json_dict.data = {"questions": QUESTIONS}
+        input_path = tempfile.mkdtemp()
+
+        runner = TaskRunner(task_type=FormResponsesImporter,
+                            inputs={"responses_file": File(responses_path), "questions_file": json_dict,
+                                    "answers_folder": Folder(input_path)},
+                            params={})
+        outputs = runner.run()
+        rejections = outputs["rejections"].get_data()
+        answers_path = outputs["answers_folder"].path
+
+        self.assertEqual(rejections.values.tolist(), [
+            [4, "Personal Info - What is your name?", "Required"],
+            [4, "Health - Do you smoke?", "Not an allowed value"],
+            [5, "Health - Cigarettes per day", "Required"],
+            [5, "Health - Sports", "Not an allowed value"],
+        ])
+
+        records = list(SubmissionLedger(os.path.join(answers_path, "submitted_sessions")).iter_records())
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]["token"], "111111")
+        self.assertEqual(records[0]["questions"][-1]["answer"], ["run", "swim"])
+        # the hidden question is not stored, whatever its answer
+        self.assertNotIn("Cigarettes per day", [question["question"] for question in records[0]["questions"]])
+        self.assertEqual(len(records[2]["questions"]), 2)
+        self.assertEqual(records[1]["questions"][2]["answer"], 10)
+        self.assertEqual(len(records[1]["token"]), 32)
+
+        # the input folder is not modified, a new import of the same file adds no submission
+        self.assertEqual(os.listdir(input_path), [])
+        runner = TaskRunner(task_type=FormResponsesImporter,
+                            inputs={"responses_file": File(responses_path), "questions_file": json_dict,
+                                    "answers_folder": Folder(answers_path)},
+                            params={})
+        answers_path = runner.run()["answers_folder"].path
+        tokens = [record["token"]
+                  for record in SubmissionLedger(os.path.join(answers_path, "submitted_sessions")).iter_records()]
+        self.assertEqual(tokens, [record["token"] for record in records])
+
+    def test_import_questions_without_section(self):
+        """Test that the questions without section are imported, with a stable token for each row."""
+        responses_path = os.path.join(tempfile.mkdtemp(), "responses.csv")
+        with open(responses_path, "w", encoding="utf-8") as f:
+            f.write("Name,Age\nAlice,30\nBob,40\n")
+        json_dict = JSONDict()
+        json_dict.data = {"questions": [{"question": "Name", "response_type": "text"},
+                                        {"question": "Age", "response_type": "numeric"}]}
+
+        tokens = []
+        for _ in range(2):
+            runner = TaskRunner(task_type=FormResponsesImporter,
+                                inputs={"responses_file": File(responses_path), "questions_file": json_dict,
+                                        "answers_folder": Folder(tempfile.mkdtemp())},
+                                params={})
+            answers_path = runner.run()["answers_folder"].path
+            records = list(SubmissionLedger(os.path.join(answers_path, "submitted_sessions")).iter_records())
+            tokens.append([record["token"] for record in records])
+
+        self.assertEqual(records[1]["questions"], [{"section": "", "question": "Name", "answer": "Bob"},
+                                                   {"section": "", "question": "Age", "answer": 40}])
+        self.assertEqual(tokens[0], tokens[1])
+        self.assertNotEqual(tokens[0][0], tokens[0][1])
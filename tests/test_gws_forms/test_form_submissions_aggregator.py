@@ -0,0 +1,111 @@
+import os
+import tempfile
+
+from gws_core import BaseTestCase, Folder, JSONDict, Table, TaskRunner
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+from gws_forms.form_submissions_aggregator.form_submissions_aggregator import (
+    FormSubmissionsAggregator,
+)
+
+
+def _questions(name: str, smoker: str) -> list:
+    return [
+        {"section": "Personal Info", "question": "What is your name?", "answer": name},
+        {"section": "Health", "question": "Do you smoke?", "answer": smoker},
+    ]
+
+
+class TestFormSubmissionsAggregator(BaseTestCase):
+    """Unit tests for the FormSubmissionsAggregator task."""
+
+    def _create_answers_folder(self) -> str:
+        answers_path = tempfile.mkdtemp()
+        os.makedirs(os.path.join(answers_path, "submitted_sessions"))
+        return answers_path
+
+    def _run(self, answers_path: str, questions_file: JSONDict = None, previous_table: Table = None) -> Table:
+        inputs = {"answers_folder": Folder(answers_path)}
+        if questions_file is not None:
+            inputs["questions_file"] = questions_file
+        if previous_table is not None:
+            inputs["previous_table"] = previous_table
+        runner = TaskRunner(task_type=FormSubmissionsAggregator, inputs=inputs, params={})
+        return runner.run()["table"]
+
+    def test_one_row_per_submission(self):
+        """Test that each submission becomes a row with one column per question."""
+        answers_path = self._create_answers_folder()
+        ledger = SubmissionLedger(os.path.join(answers_path, "submitted_sessions"))
+        ledger.append(token="111111", questions=_questions("Alice", "no"), timestamp="01-01-2025-10-00-00")
+        ledger.append(token="222222", questions=_questions("Bob", "yes"), timestamp="01-01-2025-11-00-00")
+
+        dataframe = self._run(answers_path).get_data()
+
+        self.assertEqual(len(dataframe), 2)
+        self.assertEqual(list(dataframe["Submission"]), [1, 2])
+        self.assertEqual(list(dataframe["Personal Info - What is your name?"]), ["Alice", "Bob"])
+        self.assertEqual(list(dataframe["Health - Do you smoke?"]), ["no", "yes"])
+
+    def test_incremental_runs(self):
+        """Test that a run given the previous table only adds the submissions received since its watermark."""
+        answers_path = self._create_answers_folder()
+        ledger = SubmissionLedger(os.path.join(answers_path, "submitted_sessions"))
+        ledger.append(token="111111", questions=_questions("Alice", "no"), timestamp="01-01-2025-10-00-00")
+
+        previous_table = self._run(answers_path)
+        self.assertEqual(len(previous_table.get_data()), 1)
+        # the rows of the previous table are kept as they are, the submission is not read again
+        previous_table.get_data().loc[0, "Personal Info - What is your name?"] = "Alice (checked)"
+
+        ledger.append(token="222222", questions=_questions("Bob", "yes"), timestamp="01-01-2025-11-00-00")
+        dataframe = self._run(answers_path, previous_table=previous_table).get_data()
+
+        self.assertEqual(len(dataframe), 2)
+        self.assertEqual(list(dataframe["Session token"]), ["111111", "222222"])
+        self.assertEqual(list(dataframe["Personal Info - What is your name?"]), ["Alice (checked)", "Bob"])
+        # the Answers folder is not modified
+        self.assertEqual(sorted(os.listdir(answers_path)), ["submitted_sessions"])
+
+    def test_columns_ordered_by_questions_file(self):
+        """Test that the questions file defines the question columns and their order."""
+        answers_path = self._create_answers_folder()
+        ledger = SubmissionLedger(os.path.join(answers_path, "submitted_sessions"))
+        ledger.append(token="111111", questions=_questions("Alice", "no"), timestamp="01-01-2025-10-00-00")
+
+        questions_file = JSONDict({"questions": [
+            {"section": "Health", "question": "Do you smoke?"},
+            {"section": "Personal Info", "question": "What is your name?"},
+        ]})
+        dataframe = self._run(answers_path, questions_file).get_data()
+
+        self.assertEqual(list(dataframe.columns), [
+            "Submission", "Session token", "Timestamp",
+            "Health - Do you smoke?", "Personal Info - What is your name?"])
+
+    def test_empty_answers_folder(self):
+        """Test that an Answers folder without submission gives an empty table."""
+        dataframe = self._run(self._create_answers_folder()).get_data()
+        self.assertEqual(len(dataframe), 0)
+
+    def test_multi_form_answers(self):
+        """Test that the submissions of each form of a multi form dashboard are aggregated with their form."""
+        answers_path = tempfile.mkdtemp()
+        for form_id, names in [("survey", ["Alice", "Bob"]), ("feedback", ["Carol"])]:
+            ledger = SubmissionLedger(os.path.join(answers_path, "forms", form_id, "submitted_sessions"))
+            os.makedirs(ledger.directory)
+            for name in names:
+                ledger.append(token=name, questions=_questions(name, "no"), timestamp="01-01-2025-10-00-00")
+
+        previous_table = self._run(answers_path)
+        dataframe = previous_table.get_data()
+        self.assertEqual(list(dataframe["Form"]), ["feedback", "survey", "survey"])
+        self.assertEqual(list(dataframe["Submission"]), [1, 1, 2])
+        self.assertEqual(list(dataframe["Session token"]), ["Carol", "Alice", "Bob"])
+
+        # the watermark is kept per form
+        SubmissionLedger(os.path.join(answers_path, "forms", "feedback", "submitted_sessions")).append(
+            token="Dan", questions=_questions("Dan", "yes"), timestamp="01-01-2025-11-00-00")
+        dataframe = self._run(answers_path, previous_table=previous_table).get_data()
+        self.assertEqual(list(dataframe["Session token"]), ["Carol", "Dan", "Alice", "Bob"])
@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard._form_dashboard_code.session_management.funnel_statistics import FunnelStatistics
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    load_funnel,
+    mark_draft_submitted,
+    remove_draft,
+    save_draft,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+
+
+def _get_progress(answers: list) -> dict:
+    # section A has 2 required questions (Q1, Q2), section B has no required question (Q3)
+    answered = [answer is not None for answer in answers]
+    return {"A": {"answered": sum(answered[:2]), "required": 2, "required_answered": sum(answered[:2])},
+            "B": {"answered": int(answered[2]), "required": 0, "required_answered": 0}}
+
+
+class TestFunnelStatistics(BaseTestCase):
+    """Unit tests for the completion funnel of the drafts."""
+
+    def test_funnel_is_updated_on_save(self):
+        """Test that the funnel counts the drafts started and the sections started and completed."""
+        sessions_dir = tempfile.mkdtemp()
+        save_draft(["x", None, None], sessions_dir, "111111", get_progress=_get_progress)
+        save_draft(["x", "y", "z"], sessions_dir, "222222", get_progress=_get_progress)
+        # the first draft completes section A
+        save_draft(["x", "y", None], sessions_dir, "111111", get_progress=_get_progress)
+
+        self.assertEqual(FunnelStatistics(sessions_dir).read(), {
+            "started": 2,
+            "submitted_drafts": 0,
+            "submitted_tokens": 0,
+            "submitted_tokens_seq": 0,
+            "sections": {"A": {"started": 2, "completed": 2}, "B": {"started": 1, "completed": 1}},
+        })
+
+        # an answer removed from section A uncompletes it
+        save_draft(["x", None, None], sessions_dir, "111111", get_progress=_get_progress)
+        self.assertEqual(FunnelStatistics(sessions_dir).read()["sections"]["A"], {"started": 2, "completed": 1})
+
+    def test_respondents_counted_once(self):
+        """Test that a token with a draft and submissions is counted once in the respondents."""
+        answers_path = tempfile.mkdtemp()
+        sessions_dir = os.path.join(answers_path, "saved_sessions")
+        submitted_dir = os.path.join(answers_path, "submitted_sessions")
+        os.makedirs(submitted_dir)
+        ledger = SubmissionLedger(submitted_dir)
+        for token in ["111111", "222222"]:
+            save_draft(["x", "y", None], sessions_dir, token, get_progress=_get_progress)
+        # 111111 submits twice, 333333 submits without draft (imported)
+        for token in ["111111", "111111", "333333"]:
+            ledger.append(token, [{"section": "A", "question": "Q1", "answer": "x"}], "01-01-2025-00-00-00")
+        mark_draft_submitted(sessions_dir, "111111", submitted_dir)
+        mark_draft_submitted(sessions_dir, "111111", submitted_dir)
+        self.assertEqual(FunnelStatistics(sessions_dir).read()["submitted_tokens"], 2)
+
+        funnel = load_funnel(sessions_dir, submitted_dir)
+        self.assertEqual((funnel["started"], funnel["submitted"]), (2, 3))
+        self.assertEqual((funnel["submitted_tokens"], funnel["respondents"]), (2, 3))
+
+        # the submitted draft is removed by the janitor
+        remove_draft(sessions_dir, "111111")
+        funnel = load_funnel(sessions_dir, submitted_dir)
+        self.assertEqual((funnel["started"], funnel["submitted_drafts"], funnel["respondents"]), (1, 0, 3))
+
+        # only the new submissions are read, a token that submitted again is counted once
+        ledger.append("222222", [{"section": "A", "question": "Q1", "answer": "x"}], "01-01-2025-00-00-00")
+        ledger.append("333333", [{"section": "A", "question": "Q1", "answer": "x"}], "01-01-2025-00-00-00")
+        funnel = load_funnel(sessions_dir, submitted_dir)
+        self.assertEqual((funnel["submitted_tokens"], funnel["submitted_tokens_seq"]), (3, 5))
+        self.assertEqual(FunnelStatistics(sessions_dir).sync_submitted_tokens(submitted_dir), 0)
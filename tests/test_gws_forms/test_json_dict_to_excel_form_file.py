@@ -0,0 +1,81 @@
+import os
+
+import pandas as pd
+from gws_core import BaseTestCase, File, JSONDict, TaskRunner
+from gws_forms.excel_form_file_to_json_dict.excel_form_file_to_json_dict import (
+    EXCEL_FORM_COLUMNS,
+    EXCEL_FORM_CONDITION_COLUMNS,
+    ExcelFormFileToJsonDict,
+)
+from gws_forms.json_dict_to_excel_form_file.json_dict_to_excel_form_file import (
+    JsonDictToExcelFormFile,
+)
+
+TESTDATA_DIR = os.path.join(os.path.dirname(__file__), "..", "testdata")
+
+
+class TestJsonDictToExcelFormFile(BaseTestCase):
+    """Unit tests for the JsonDictToExcelFormFile task."""
+
+    def _to_json_dict(self, excel_file: File) -> dict:
+        runner = TaskRunner(
+            task_type=ExcelFormFileToJsonDict,
+            inputs={"excel_file": excel_file},
+            params={"language": "en"},
+        )
+        return runner.run()["json_dict"].get_data()
+
+    def _to_excel_file(self, data: dict) -> File:
+        runner = TaskRunner(
+            task_type=JsonDictToExcelFormFile,
+            inputs={"json_dict": JSONDict(data)},
+            params={"file_name": "form_questions"},
+        )
+        return runner.run()["excel_file"]
+
+    def test_columns(self):
+        """Test that the exported file has the columns read by ExcelFormFileToJsonDict."""
+        excel_file = self._to_excel_file({"questions": [
+            {"section": "A", "title": "Q1", "question": "First question?", "description": "Desc 1",
+             "response_type": "text", "required": True}]})
+
+        dataframe = pd.read_excel(excel_file.path)
+        self.assertEqual(list(dataframe.columns), EXCEL_FORM_COLUMNS + EXCEL_FORM_CONDITION_COLUMNS)
+        self.assertEqual(len(dataframe), 1)
+
+    def test_round_trip(self):
+        """Test that converting, exporting and converting again gives the same questions."""
+        for file_name in ["form_questions.xlsx", "form_minimal.xlsx"]:
+            data = self._to_json_dict(File(path=os.path.join(TESTDATA_DIR, file_name)))
+
+            round_trip_data = self._to_json_dict(self._to_excel_file(data))
+
+            self.assertEqual(round_trip_data, data, msg=f"Round trip failed for {file_name}")
+
+    def test_creation_dashboard_questions(self):
+        """Test that the questions of the creation dashboard use question_head and helper_text."""
+        excel_file = self._to_excel_file({"questions": [
+            {"section": "A", "subsection": "", "question_head": "Smoker", "question": "Do you smoke?",
+             "helper_text": "Yes or no", "response_type": "option", "allowed_values": ["yes", " no"],
+             "multiselect": False, "min_value": None, "max_value": None, "required": True}]})
+
+        question = self._to_json_dict(excel_file)["questions"][0]
+        self.assertEqual(question["title"], "Smoker")
+        self.assertEqual(question["description"], "Yes or no")
+        self.assertEqual(question["allowed_values"], ["yes", "no"])
+        self.assertFalse(question["multiselect"])
+        self.assertNotIn("min_value", question)
+
+    def test_round_trip_conditions(self):
+        """Test that the question conditions are exported and converted back."""
+        data = {"language": "en", "questions": [
+            {"section": "Health", "title": "Smoker", "question": "Do you smoke?", "description": "",
+             "response_type": "select", "required": True, "allowed_values": ["yes", "no"]},
+            {"section": "Health", "title": "Cigarettes", "question": "How many cigarettes per day?",
+             "description": "", "response_type": "number", "required": False,
+             "condition": {"question": "Do you smoke?", "operator": "in", "value": ["yes", "sometimes"]}},
+        ]}
+
+        round_trip_data = self._to_json_dict(self._to_excel_file(data))
+
+        self.assertEqual(round_trip_data, data)
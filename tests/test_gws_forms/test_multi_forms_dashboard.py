@@ -0,0 +1,65 @@
+import json
+import os
+
+from gws_core import BaseTestCase, Folder, JSONDict, ResourceSet, TaskRunner
+from gws_forms.dashboard._form_dashboard_code.session_management.form_registry import (
+    create_form_id,
+    list_form_folders,
+    load_form_definition,
+)
+from gws_forms.dashboard.streamlit_generator import StreamlitMultiFormsDashboardGenerator
+
+QUESTIONS = [
+    {"section": "S1", "question": "Q1", "response_type": "text", "allowed_values": ["Yes", "No"]},
+    {"section": "S1", "question": "Q2", "response_type": "numeric",
+     "condition": {"question": "Q1", "operator": "equals", "value": "Yes"}},
+]
+
+
+class TestMultiFormsDashboard(BaseTestCase):
+    """Unit tests for the dashboard hosting several forms and its form registry."""
+
+    def test_create_form_id(self):
+        """Test that the form ids are url friendly and unique."""
+        self.assertEqual(create_form_id("Health survey 2025!", []), "health-survey-2025")
+        self.assertEqual(create_form_id("Health survey", ["health-survey", "health-survey-2"]), "health-survey-3")
+        self.assertEqual(create_form_id("???", []), "form")
+
+    def test_generate_multi_forms_dashboard(self):
+        """Test that each form has its definition in its own folder and is listed in the app params."""
+        survey, feedback, other = JSONDict(), JSONDict(), JSONDict()
+        survey.data = {"questions": QUESTIONS, "title": "Health survey", "description": "Yearly survey"}
+        feedback.data = {"questions": QUESTIONS[:1]}
+        other.data = {"questions": []}
+        resource_set = ResourceSet()
+        resource_set.add_resource(survey, "Survey")
+        resource_set.add_resource(feedback, "Feedback")
+        resource_set.add_resource(other, "Feedback 2")
+        runner = TaskRunner(task_type=StreamlitMultiFormsDashboardGenerator,
+                            inputs={"questions_files": resource_set},
+                            params={"title": "Forms", "description": "All the forms", "results_visible": True})
+        streamlit_app = runner.run()["streamlit_form_app"]
+
+        params = streamlit_app.get_params()
+        self.assertTrue(params["multi_form"])
+        self.assertIsNone(params["banner"])
+        self.assertEqual(params["forms"], [
+            {"id": "survey", "title": "Health survey", "description": "Yearly survey"},
+            {"id": "feedback", "title": "Feedback", "description": ""},
+            {"id": "feedback-2", "title": "Feedback 2", "description": ""},
+        ])
+
+        answers_path = next(resource.path for resource in streamlit_app.get_resources().values()
+                            if isinstance(resource, Folder))
+        self.assertEqual([os.path.basename(path) for path in list_form_folders(answers_path)],
+                         ["feedback", "feedback-2", "survey"])
+        definition = load_form_definition(answers_path, "survey")
+        self.assertEqual(definition["questions"], QUESTIONS)
+        self.assertEqual(definition["dependency_graph"]["conditions"][1]["question_index"], 0)
+        with open(os.path.join(answers_path, "forms", "feedback", "form.json"), "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["title"], "Feedback")
+
+    def test_list_single_form_folder(self):
+        """Test that the Answers folder of a single form app is its only form folder."""
+        answers_path = os.path.dirname(os.path.abspath(__file__))
+        self.assertEqual(list_form_folders(answers_path), [answers_path])
@@ -0,0 +1,53 @@
+from gws_core import BaseTestCase
+from gws_forms.dashboard_creation._dashboard_code.components.questions_grid import (
+    apply_row_deltas,
+    questions_to_rows,
+)
+
+
+def _questions() -> list:
+    return [
+        {"section": "A", "question": "Name", "response_type": "short_text", "required": True},
+        {"section": "A", "question": "Color", "response_type": "option", "allowed_values": ["red", "blue"]},
+        {"section": "B", "question": "Age", "response_type": "numeric", "min_value": 0, "max_value": 120},
+    ]
+
+
+class TestQuestionsGrid(BaseTestCase):
+    """Unit tests for the editable grid of the questions of the creation dashboard."""
+
+    def test_rows_round_trip(self):
+        """Test that the grid rows of unedited questions give back the same questions."""
+        questions = _questions()
+        rows = questions_to_rows(questions)
+        self.assertEqual(list(rows["allowed_values"]), ["", "red,blue", ""])
+
+        deltas = {"edited_rows": {index: {} for index in range(len(questions))}}
+        self.assertEqual(apply_row_deltas(questions, deltas), (0, False))
+        self.assertEqual(questions, _questions())
+
+    def test_edited_rows(self):
+        """Test that only the edited cells are applied, and applying the same edits again changes nothing."""
+        questions = _questions()
+        deltas = {"edited_rows": {1: {"allowed_values": "red,green", "required": True}},
+                  "added_rows": [], "deleted_rows": []}
+
+        self.assertEqual(apply_row_deltas(questions, deltas), (1, False))
+        self.assertEqual(questions[1]["allowed_values"], ["red", "green"])
+        self.assertTrue(questions[1]["required"])
+        self.assertEqual(questions[0], _questions()[0])
+        self.assertEqual(questions[2], _questions()[2])
+
+        # the deltas of the editor are cumulative
+        self.assertEqual(apply_row_deltas(questions, deltas), (0, False))
+
+    def test_added_and_deleted_rows(self):
+        """Test that the deleted rows are removed and the added rows appended once their question is set."""
+        questions = _questions()
+        deltas = {"edited_rows": {2: {"max_value": 99}}, "deleted_rows": [0],
+                  "added_rows": [{"section": "B", "question": "City"}, {"section": "B"}]}
+
+        self.assertEqual(apply_row_deltas(questions, deltas), (1, True))
+        self.assertEqual([question["question"] for question in questions], ["Color", "Age", "City"])
+        self.assertEqual(questions[1]["max_value"], 99)
+        self.assertEqual(questions[2], {"section": "B", "question": "City", "response_type": "short_text"})
@@ -0,0 +1,36 @@
+import time
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard._form_dashboard_code.session_management.rate_limiter import (
+    AdmissionControl,
+    RateLimiter,
+)
+
+
+class TestRateLimiter(BaseTestCase):
+    """Unit tests for the rate limiter and the admission control."""
+
+    def test_token_bucket(self):
+        """Test that a key is limited to the bucket capacity and refilled over time."""
+        rate_limiter = RateLimiter(capacity=2, refill_per_second=20)
+        self.assertTrue(rate_limiter.allow("a"))
+        self.assertTrue(rate_limiter.allow("a"))
+        self.assertFalse(rate_limiter.allow("a"))
+        # the other keys have their own bucket
+        self.assertTrue(rate_limiter.allow("b"))
+
+        time.sleep(0.1)
+        self.assertTrue(rate_limiter.allow("a"))
+
+    def test_admission_control(self):
+        """Test that new sessions wait until an active session leaves."""
+        admission_control = AdmissionControl(max_active=2, idle_timeout=0.1)
+        self.assertTrue(admission_control.admit("s1"))
+        self.assertTrue(admission_control.admit("s2"))
+        self.assertFalse(admission_control.admit("s3"))
+        # an admitted session stays admitted
+        self.assertTrue(admission_control.admit("s1"))
+
+        time.sleep(0.15)
+        self.assertTrue(admission_control.admit("s3"))
+        self.assertEqual(admission_control.count_active(), 1)
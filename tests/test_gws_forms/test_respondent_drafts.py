@@ -0,0 +1,94 @@
+import tempfile
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard._form_dashboard_code.session_management.answers_migration import (
+    load_draft_answers,
+    save_form_questions,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.form_answers import (
+    freeze_form,
+    get_answered_questions,
+    get_draft_answers,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    load_session,
+    save_draft,
+)
+
+FORM_QUESTIONS = [
+    {"section": "S", "question": "Q1", "required": True},
+    {"section": "S", "question": "Q2", "required": False},
+    {"section": "S", "question": "Q3", "required": False},
+]
+
+
+class TestRespondentDrafts(BaseTestCase):
+    """Unit tests for the versioned respondent drafts."""
+
+    def test_save_draft_increments_version(self):
+        """Test that a draft is saved with a new version only when the answers change."""
+        sessions_dir = tempfile.mkdtemp()
+        self.assertEqual(load_session(sessions_dir, "111111"), {"answers": [], "version": 0})
+
+        draft, changed = save_draft(["A", None, None], sessions_dir, "111111",
+                                    base=load_session(sessions_dir, "111111"))
+        self.assertTrue(changed)
+        self.assertEqual(draft["version"], 1)
+
+        draft, changed = save_draft(["A", None, None], sessions_dir, "111111", base=draft)
+        self.assertFalse(changed)
+        self.assertEqual(load_session(sessions_dir, "111111")["version"], 1)
+
+    def test_concurrent_drafts_are_merged(self):
+        """Test that two tabs editing the same draft keep the answers of both."""
+        sessions_dir = tempfile.mkdtemp()
+        base, _ = save_draft(["A", "B", None], sessions_dir, "111111")
+
+        # both tabs edit the draft from the same version
+        save_draft(["A2", "B", None], sessions_dir, "111111", base=base)
+        draft, changed = save_draft(["A", "B", "C"], sessions_dir, "111111", base=base)
+
+        self.assertTrue(changed)
+        self.assertEqual(draft["version"], 3)
+        self.assertEqual(load_session(sessions_dir, "111111")["answers"], ["A2", "B", "C"])
+
+    def test_draft_answers(self):
+        """Test the conversion of the drafts saved as question dicts and of the submitted answers."""
+        form_questions = freeze_form(FORM_QUESTIONS)
+        legacy_draft = {"questions": [{"section": "S", "question": "Q2", "answer": "B", "required": False}]}
+        self.assertEqual(get_draft_answers(legacy_draft, form_questions), [None, "B", None])
+        # the form got a question since the draft was saved
+        self.assertEqual(get_draft_answers({"answers": ["A", "B"]}, form_questions), ["A", "B", None])
+
+        self.assertEqual(get_answered_questions(["A", "B", None], form_questions, [True, False, True]), [
+            {"section": "S", "question": "Q1", "answer": "A"},
+            {"section": "S", "question": "Q3", "answer": None},
+        ])
+        with self.assertRaises(TypeError):
+            form_questions[0]["answer"] = "A"
+
+    def test_draft_of_another_form_version(self):
+        """Test that the answers of a draft saved with another version of the form are moved to its questions."""
+        sessions_dir = tempfile.mkdtemp()
+        fingerprint = save_form_questions(sessions_dir, freeze_form(FORM_QUESTIONS))
+        save_draft(["A", "B", "C"], sessions_dir, "111111", form_fingerprint=fingerprint)
+        draft = load_session(sessions_dir, "111111")
+        self.assertEqual(load_draft_answers(sessions_dir, draft, FORM_QUESTIONS), ["A", "B", "C"])
+
+        # a question inserted at the start and Q2 removed
+        new_questions = [{"section": "S", "question": "Q0", "required": False}] + \
+            [question for question in FORM_QUESTIONS if question["question"] != "Q2"]
+        answers = load_draft_answers(sessions_dir, draft, new_questions)
+        self.assertEqual(answers, [None, "A", "C"])
+
+        # the draft saved with the new form is not merged with the positions of the old form
+        new_fingerprint = save_form_questions(sessions_dir, new_questions)
+        saved_draft, changed = save_draft(answers, sessions_dir, "111111", base={"answers": answers, "version": 0},
+                                          form_fingerprint=new_fingerprint)
+        self.assertTrue(changed)
+        self.assertEqual((saved_draft["answers"], saved_draft["form"]), ([None, "A", "C"], new_fingerprint))
+        self.assertEqual(load_draft_answers(sessions_dir, saved_draft, new_questions), [None, "A", "C"])
+
+        # the answers of a draft saved with an unknown form cannot be matched
+        unknown_draft = {"answers": ["A", "B", "C"], "version": 1, "form": "unknown"}
+        self.assertEqual(load_draft_answers(sessions_dir, unknown_draft, new_questions), [None, None, None])
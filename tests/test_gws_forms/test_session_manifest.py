@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import threading
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard_creation._dashboard_code.session_management.draft_store import DraftStore
+from gws_forms.dashboard_creation._dashboard_code.session_management.session_manifest import SessionManifest
+
+
+def _questions(count: int) -> list:
+    return [{"section": "S", "question": f"Q{index}", "response_type": "short_text"} for index in range(count)]
+
+
+class TestSessionManifest(BaseTestCase):
+    """Unit tests for the manifest of the saved sessions of the creation dashboard."""
+
+    def test_update_and_list(self):
+        """Test that the sessions are listed most recently modified first and filtered by name or owner."""
+        directory = tempfile.mkdtemp()
+        store = DraftStore(directory)
+        store.save("alice-1", _questions(2), "Alice")
+        store.save("bob-1", _questions(3), "Bob")
+        store.save("alice-2", _questions(1), "Alice")
+        store.save("alice-1", _questions(4), "Alice")
+
+        manifest = SessionManifest(directory)
+        entries = manifest.list_entries()
+        self.assertEqual([entry["name"] for entry in entries], ["alice-1", "alice-2", "bob-1"])
+        self.assertEqual(entries[0]["question_count"], 4)
+        self.assertEqual(entries[0]["owner"], "Alice")
+        self.assertGreater(entries[0]["size"], 0)
+        self.assertEqual([entry["name"] for entry in manifest.list_entries(" BOB ")], ["bob-1"])
+        self.assertEqual([entry["name"] for entry in manifest.list_entries("alice-2")], ["alice-2"])
+
+        store.delete("alice-2")
+        self.assertEqual([entry["name"] for entry in manifest.list_entries("alice")], ["alice-1"])
+
+    def test_concurrent_updates(self):
+        """Test that the sessions saved at the same time are all listed."""
+        directory = tempfile.mkdtemp()
+        threads = [threading.Thread(target=DraftStore(directory).save, args=(f"draft-{index}", _questions(1), "Alice"))
+                   for index in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(SessionManifest(directory).list_entries()), 10)
+
+    def test_rebuild_after_deletion(self):
+        """Test that the manifest is rebuilt from the drafts after it or a draft was deleted."""
+        directory = tempfile.mkdtemp()
+        store = DraftStore(directory)
+        store.save("alice-1", _questions(2), "Alice")
+        store.save("bob-1", _questions(3), "Bob")
+
+        os.remove(os.path.join(directory, SessionManifest.MANIFEST_FILE))
+        self.assertFalse(SessionManifest(directory).exists())
+        store.rebuild_manifest()
+        self.assertEqual(sorted(entry["name"] for entry in SessionManifest(directory).list_entries()),
+                         ["alice-1", "bob-1"])
+
+        # a draft removed from the folder by hand
+        shutil.rmtree(os.path.join(directory, "bob-1"))
+        store.rebuild_manifest()
+        entries = SessionManifest(directory).list_entries()
+        self.assertEqual([entry["name"] for entry in entries], ["alice-1"])
+        self.assertEqual(entries[0]["question_count"], 2)
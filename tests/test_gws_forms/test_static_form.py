@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+from gws_core import BaseTestCase, File, JSONDict, TaskRunner
+from gws_forms.dashboard._form_dashboard_code.session_management.session_functions import (
+    SUBMITTED_SESSIONS_DIR,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+from gws_forms.form_conditions.form_conditions import compile_dependency_graph
+from gws_forms.static_form.ingestion_server import SubmissionsWriter, create_ingestion_server, validate_answers
+from gws_forms.static_form.static_form_generator import StaticFormGenerator
+from PIL import Image
+
+QUESTIONS = [
+    {"section": "S1", "question": "Q1", "response_type": "text", "allowed_values": ["Yes", "No"],
+     "required": True},
+    {"section": "S1", "question": "Q2", "response_type": "numeric", "min_value": 0, "max_value": 10,
+     "required": True, "condition": {"question": "Q1", "operator": "equals", "value": "Yes"}},
+    {"section": "S2", "question": "</script>", "response_type": "long_text"},
+]
+
+
+class TestStaticForm(BaseTestCase):
+    """Unit tests for the static form generator and its ingestion server."""
+
+    def test_generate_static_form(self):
+        """Test that the page and the form definition are generated."""
+        json_dict = JSONDict()
+        json_dict.data = {"questions": QUESTIONS}
+        runner = TaskRunner(task_type=StaticFormGenerator, inputs={"questions_file": json_dict},
+                            params={"title": "My form", "description": "Description"})
+        outputs = runner.run()
+
+        static_form_path = outputs["static_form"].path
+        with open(os.path.join(static_form_path, "form.json"), "r", encoding="utf-8") as f:
+            form = json.load(f)
+        self.assertEqual(form["id"], "my-form")
+        self.assertEqual(form["ingestion_url"], "/submissions")
+        self.assertEqual(form["dependency_graph"]["conditions"][1]["question_index"], 0)
+
+        with open(os.path.join(static_form_path, "index.html"), "r", encoding="utf-8") as f:
+            page = f.read()
+        self.assertNotIn("__FORM_DATA__", page)
+        # the question text can not close the script element of the data
+        self.assertEqual(page.count("</script>"), 2)
+        self.assertIn("<\\/script>", page)
+        self.assertTrue(os.path.isdir(os.path.join(outputs["answers_folder"].path, "submitted_sessions")))
+
+    def test_serve_page_and_banner(self):
+        """Test that the ingestion server serves the page and its banner, and no other file."""
+        banner_path = os.path.join(tempfile.mkdtemp(), "banner.png")
+        Image.new("RGB", (40, 10), "red").save(banner_path)
+        json_dict = JSONDict()
+        json_dict.data = {"questions": QUESTIONS}
+        runner = TaskRunner(task_type=StaticFormGenerator,
+                            inputs={"questions_file": json_dict, "banner": File(banner_path)},
+                            params={"title": "My form", "description": "Description"})
+        static_form_path = runner.run()["static_form"].path
+        with open(os.path.join(static_form_path, "form.json"), "r", encoding="utf-8") as f:
+            banner = json.load(f)["banner"]
+
+        server = create_ingestion_server(static_form_path, tempfile.mkdtemp(), host="127.0.0.1", port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(url + "/") as response:
+                self.assertIn(b"My form", response.read())
+            with urllib.request.urlopen(f"{url}/{banner}") as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("image/"))
+                with open(os.path.join(static_form_path, banner), "rb") as f:
+                    self.assertEqual(response.read(), f.read())
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                urllib.request.urlopen(url + "/form.json")
+            self.assertEqual(context.exception.code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_validate_answers(self):
+        """Test that the submissions are checked as in the browser."""
+        form = {"questions": QUESTIONS, "dependency_graph": compile_dependency_graph(QUESTIONS)}
+
+        questions, error = validate_answers(form, ["Yes", 5, "comment"])
+        self.assertIsNone(error)
+        self.assertEqual([question["answer"] for question in questions], ["Yes", 5, "comment"])
+
+        # the hidden question is not required and not stored
+        questions, error = validate_answers(form, ["No", None, None])
+        self.assertIsNone(error)
+        self.assertEqual([question["question"] for question in questions], ["Q1", "</script>"])
+
+        self.assertIsNotNone(validate_answers(form, ["Yes", None, None])[1])
+        self.assertIsNotNone(validate_answers(form, ["Yes", 11, None])[1])
+        self.assertIsNotNone(validate_answers(form, ["Maybe", None, None])[1])
+        self.assertIsNotNone(validate_answers(form, ["Yes", 5])[1])
+
+    def test_append_many(self):
+        """Test that a batch of submissions is appended to the ledger at once."""
+        ledger = SubmissionLedger(tempfile.mkdtemp())
+        records = ledger.append_many([
+            (str(index), [{"section": "S1", "question": "Q1", "answer": "Yes"}], "01-01-2025-00-00-00")
+            for index in range(5)
+        ])
+        self.assertEqual([record["seq"] for record in records], list(range(1, 6)))
+        self.assertEqual(ledger.count(), 5)
+        self.assertEqual(ledger.get(3)["token"], "2")
+
+    def test_writer_deduplicates_submissions(self):
+        """Test that a submission sent again with the same id is written once."""
+        answers_path = tempfile.mkdtemp()
+        questions = [{"section": "S1", "question": "Q1", "answer": "Yes"}]
+        writer = SubmissionsWriter(answers_path, {"questions": QUESTIONS})
+        futures = [writer.submit("token", questions, "id-1"), writer.submit("token", questions, "id-1"),
+                   writer.submit("token", questions), writer.submit("token", questions, "id-2")]
+        self.assertEqual([future.result(timeout=10) for future in futures], [1, 1, 2, 3])
+
+        # the ids of the written submissions are read from the ledger after a restart
+        writer = SubmissionsWriter(answers_path, {"questions": QUESTIONS})
+        self.assertEqual(writer.submit("token", questions, "id-2").result(timeout=10), 3)
+        ledger = SubmissionLedger(os.path.join(answers_path, SUBMITTED_SESSIONS_DIR))
+        self.assertEqual(ledger.count(), 3)
+        self.assertEqual(ledger.get(1)["submission_id"], "id-1")
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_change_feed import (
+    SubmissionChangeFeed,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+
+
+class TestSubmissionChangeFeed(BaseTestCase):
+    """Unit tests for the change feed of the submissions."""
+
+    def test_tail_feed_from_offset(self):
+        """Test that a consumer reads the new events from its offset and finds the payloads."""
+        submitted_dir = tempfile.mkdtemp()
+        ledger = SubmissionLedger(submitted_dir)
+        feed = SubmissionChangeFeed(submitted_dir)
+        ledger.append("111111", [{"section": "S", "question": "Q1", "answer": "A"}], "01-01-2025-10-00-00")
+        ledger.append("222222", [{"section": "S", "question": "Q1", "answer": "B"}], "01-01-2025-11-00-00")
+        self.assertEqual(feed.sync(), 2)
+        self.assertEqual(feed.sync(), 0)
+
+        events, offset = feed.read(0, limit=1)
+        self.assertEqual([event["seq"] for event in events], [1])
+        events, offset = feed.read(offset)
+        self.assertEqual([(event["seq"], event["token"]) for event in events], [(2, "222222")])
+
+        payload = events[0]["payload"]
+        with open(os.path.join(submitted_dir, payload["segment"]), "rb") as f:
+            f.seek(payload["offset"])
+            self.assertEqual(json.loads(f.read(payload["length"]))["questions"][0]["answer"], "B")
+
+        # nothing new until the next submission
+        self.assertEqual(feed.read(offset), ([], offset))
+        ledger.append("333333", [], "01-01-2025-12-00-00")
+        feed.sync()
+        self.assertEqual([event["seq"] for event in feed.read(offset)[0]], [3])
+
+    def test_partial_line_is_not_read(self):
+        """Test that an interrupted append is neither returned nor breaking the next events."""
+        submitted_dir = tempfile.mkdtemp()
+        ledger = SubmissionLedger(submitted_dir)
+        feed = SubmissionChangeFeed(submitted_dir)
+        ledger.append("111111", [], "01-01-2025-10-00-00")
+        feed.sync()
+        with open(os.path.join(submitted_dir, "changes.jsonl"), "ab") as f:
+            f.write(b'{"seq": 2, "tok')
+        self.assertEqual(len(feed.read(0)[0]), 1)
+
+        ledger.append("222222", [], "01-01-2025-11-00-00")
+        self.assertEqual(feed.sync(), 1)
+        self.assertEqual([event["seq"] for event in feed.read(0)[0]], [1, 2])
@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+
+
+def _questions(answer: str) -> list:
+    return [{"section": "S", "question": "Q", "answer": answer}]
+
+
+class TestSubmissionLedger(BaseTestCase):
+    """Unit tests for the submission ledger."""
+
+    def test_segment_rotation(self):
+        """Test that the segments are rotated and the submissions read across the segments."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory, segment_max_bytes=200)
+        for index in range(10):
+            ledger.append(str(index), _questions("a" * 50), "01-01-2025-00-00-00")
+
+        segments = [f for f in os.listdir(directory) if f.startswith("segment-")]
+        self.assertGreater(len(segments), 1)
+        self.assertEqual(ledger.count(), 10)
+        self.assertEqual([record["seq"] for record in ledger.iter_records()], list(range(1, 11)))
+        self.assertEqual([record["token"] for record in ledger.iter_records(from_seq=8)], ["7", "8", "9"])
+        self.assertEqual(ledger.get(5)["token"], "4")
+        self.assertIsNone(ledger.get(11))
+
+    def test_interrupted_append(self):
+        """Test that the line and the partial index entry of an interrupted append are dropped."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory)
+        ledger.append("1", _questions("first"), "01-01-2025-00-00-00")
+        ledger.append("2", _questions("second"), "01-01-2025-00-00-00")
+
+        # crash after the segment write : the line is written, its index entry partially
+        with open(os.path.join(directory, "segment-000001.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": 3, "token": "orphan", "timestamp": "", "questions": []}) + "\n")
+        with open(os.path.join(directory, "ledger.idx"), "ab") as f:
+            f.write(b"\x03\x00")
+
+        # the orphan line is never read
+        self.assertEqual(ledger.count(), 2)
+        self.assertEqual([record["token"] for record in ledger.iter_records()], ["1", "2"])
+
+        record = ledger.append("3", _questions("third"), "01-01-2025-00-00-00")
+        self.assertEqual(record["seq"], 3)
+        self.assertEqual(ledger.get(3)["token"], "3")
+        self.assertEqual([record["token"] for record in ledger.iter_records()], ["1", "2", "3"])
+        with open(os.path.join(directory, "segment-000001.jsonl"), "r", encoding="utf-8") as f:
+            self.assertNotIn("orphan", f.read())
+
+    def test_rewrite_once(self):
+        """Test that a rewrite run again after its index swap is not applied twice and removes the old segments."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory, segment_max_bytes=100)
+        for answer in ["a", "b", "c"]:
+            ledger.append(answer, _questions(answer), "01-01-2025-00-00-00")
+        with open(os.path.join(directory, "segment-000001.jsonl"), "r", encoding="utf-8") as f:
+            old_segment = f.read()
+
+        # the renames are chained, applying them twice would give "R"
+        def rename(questions):
+            return [{**question, "question": {"Q": "P", "P": "R"}[question["question"]]} for question in questions]
+        self.assertEqual(ledger.rewrite(rename, rewrite_id="Q-P"), 3)
+
+        # crash after the index swap : the old segments are still there
+        with open(os.path.join(directory, "segment-000001.jsonl"), "w", encoding="utf-8") as f:
+            f.write(old_segment)
+        self.assertEqual(ledger.rewrite(rename, rewrite_id="Q-P"), 3)
+        self.assertEqual([record["questions"][0]["question"] for record in ledger.iter_records()], ["P"] * 3)
+        self.assertEqual([record["token"] for record in ledger.iter_records()], ["a", "b", "c"])
+        self.assertFalse(os.path.exists(os.path.join(directory, "segment-000001.jsonl")))
+
+    def test_rewrite_during_iteration(self):
+        """Test that an iteration continues on the new segments of a rewrite and raises on a missing segment."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory, segment_max_bytes=100)
+        for answer in ["a", "b", "c"]:
+            ledger.append(answer, _questions(answer), "01-01-2025-00-00-00")
+
+        records = ledger.iter_records()
+        self.assertEqual(next(records)["questions"][0]["question"], "Q")
+        ledger.rewrite(lambda questions: [{**question, "question": "P"} for question in questions], rewrite_id="Q-P")
+        self.assertEqual([(record["token"], record["questions"][0]["question"]) for record in records],
+                         [("b", "P"), ("c", "P")])
+        self.assertEqual(ledger.get(2)["questions"][0]["question"], "P")
+
+        for file_name in os.listdir(directory):
+            if file_name.startswith("segment-"):
+                os.remove(os.path.join(directory, file_name))
+        with self.assertRaises(FileNotFoundError):
+            list(ledger.iter_records())
+        with self.assertRaises(FileNotFoundError):
+            ledger.get(2)
+
+    def test_import_legacy_files_once(self):
+        """Test that a legacy file whose import was interrupted after the append is not imported twice."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory)
+        for token in ["111111", "222222"]:
+            with open(os.path.join(directory, f"session_{token}_01-01-2025.json"), "w", encoding="utf-8") as f:
+                json.dump({"questions": _questions(token), "timestamp": "01-01-2025-00-00-00"}, f)
+        self.assertEqual(ledger.import_legacy_files(), 2)
+
+        # interrupted import : the file was appended but not moved to the legacy folder
+        legacy_path = os.path.join(directory, "legacy", "session_222222_01-01-2025.json")
+        os.replace(legacy_path, os.path.join(directory, "legacy", "importing", "session_222222_01-01-2025.json"))
+        self.assertEqual(ledger.import_legacy_files(), 0)
+        self.assertEqual(ledger.count(), 2)
+        self.assertTrue(os.path.exists(legacy_path))
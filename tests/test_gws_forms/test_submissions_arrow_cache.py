@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+
+import pyarrow as pa
+from gws_core import BaseTestCase
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import SubmissionLedger
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_arrow_cache import (
+    SubmissionsArrowCache,
+)
+
+QUESTIONS = [
+    {"section": "S", "question": "Name", "response_type": "short_text"},
+    {"section": "S", "question": "Age", "response_type": "numeric"},
+    {"section": "S", "question": "Colors", "response_type": "option", "multiselect": True,
+     "allowed_values": ["red", "blue"]},
+]
+
+
+def _append(ledger: SubmissionLedger, token: str, name: str, age, colors: list) -> None:
+    ledger.append(token, [{"section": "S", "question": "Name", "answer": name},
+                          {"section": "S", "question": "Age", "answer": age},
+                          {"section": "S", "question": "Colors", "answer": colors}], "01-01-2025-00-00-00")
+
+
+class TestSubmissionsArrowCache(BaseTestCase):
+    """Unit tests for the Arrow cache of the submissions."""
+
+    def test_sync_and_read(self):
+        """Test that the new submissions are appended to the cache with the types of the questions."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory)
+        cache = SubmissionsArrowCache(directory, QUESTIONS)
+        _append(ledger, "1", "Alice", "30", ["red"])
+
+        self.assertEqual(cache.sync(), 1)
+        self.assertEqual(cache.sync(), 0)
+        _append(ledger, "2", "Bob", "", "blue")
+        self.assertEqual(cache.sync(), 1)
+
+        table = cache.read_table()
+        self.assertEqual(table.column("seq").to_pylist(), [1, 2])
+        self.assertEqual(table.column("S - Age").type, pa.float64())
+        self.assertEqual(table.column("S - Age").to_pylist(), [30.0, None])
+        self.assertEqual(table.column("S - Colors").to_pylist(), [["red"], ["blue"]])
+
+    def test_parts_merged_by_tiers(self):
+        """Test that the last parts are merged when they are in the same tier."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory)
+        cache = SubmissionsArrowCache(directory, QUESTIONS, merge_factor=2)
+        for index in range(7):
+            _append(ledger, str(index), f"name {index}", index, [])
+            cache.sync()
+
+        part_files = sorted(f for f in os.listdir(os.path.join(directory, SubmissionsArrowCache.CACHE_DIR))
+                            if f.startswith("part-"))
+        self.assertEqual(part_files, ["part-000000000001-000000000004.arrow", "part-000000000005-000000000006.arrow",
+                                      "part-000000000007-000000000007.arrow"])
+        self.assertEqual(cache.read_table().column("seq").to_pylist(), list(range(1, 8)))
+
+    def test_sync_without_ledger_files(self):
+        """Test that a sync raises and adds no part when the ledger files are missing."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory)
+        _append(ledger, "1", "Alice", "30", ["red"])
+        os.remove(os.path.join(directory, "segment-000001.jsonl"))
+
+        with self.assertRaises(FileNotFoundError):
+            SubmissionsArrowCache(directory, QUESTIONS).sync()
+        self.assertEqual(SubmissionsArrowCache(directory, QUESTIONS).read_table().num_rows, 0)
+
+    def test_cache_rebuilt_by_another_process(self):
+        """Test that the parts replaced by another process are read again, not served from memory."""
+        directory = tempfile.mkdtemp()
+        ledger = SubmissionLedger(directory)
+        _append(ledger, "1", "Alice", "30", ["red"])
+        cache = SubmissionsArrowCache(directory, QUESTIONS)
+        cache.sync()
+        self.assertEqual(cache.read_table().column("S - Age").type, pa.float64())
+
+        # another process rebuilds the cache for the new questions, the part has the same name
+        new_questions = [{**question, "response_type": "short_text"} if question["question"] == "Age" else question
+                         for question in QUESTIONS]
+        shutil.rmtree(os.path.join(directory, SubmissionsArrowCache.CACHE_DIR))
+        new_cache = SubmissionsArrowCache(directory, new_questions)
+        new_cache.sync()
+
+        table = new_cache.read_table()
+        self.assertEqual(table.column("S - Age").type, pa.string())
+        self.assertEqual(table.column("S - Age").to_pylist(), ["30"])
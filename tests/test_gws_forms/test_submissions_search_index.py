@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from gws_core import BaseTestCase
+from gws_forms.dashboard._form_dashboard_code.session_management.submission_ledger import (
+    SubmissionLedger,
+)
+from gws_forms.dashboard._form_dashboard_code.session_management.submissions_search_index import (
+    SubmissionsSearchIndex,
+)
+
+
+def _submit(ledger: SubmissionLedger, token: str, answer: str):
+    ledger.append(token, [{"section": "S", "question": "Comment", "answer": answer}], "01-01-2025-10-00-00")
+
+
+class TestSubmissionsSearchIndex(BaseTestCase):
+    """Unit tests for the full-text index of the submissions."""
+
+    def test_search_ranks_and_highlights(self):
+        """Test that the submissions are ranked by relevance and the terms highlighted."""
+        submitted_dir = tempfile.mkdtemp()
+        ledger = SubmissionLedger(submitted_dir)
+        _submit(ledger, "111111", "The delivery was late")
+        _submit(ledger, "222222", "Late delivery, very late, the package was damaged")
+        _submit(ledger, "333333", "Everything was perfect")
+
+        search_index = SubmissionsSearchIndex(submitted_dir)
+        self.assertEqual(search_index.sync(), 3)
+        results = search_index.search("LATE")
+        self.assertEqual([result["seq"] for result in results], [2, 1])
+        self.assertEqual(results[1]["highlights"], [("S - Comment", "The delivery was **late**")])
+        self.assertEqual(search_index.search("unknown"), [])
+
+    def test_incremental_sync_and_compaction(self):
+        """Test that new submissions are indexed in new segments merged by tiers of similar sizes."""
+        submitted_dir = tempfile.mkdtemp()
+        ledger = SubmissionLedger(submitted_dir)
+        search_index = SubmissionsSearchIndex(submitted_dir, merge_factor=2)
+        for index in range(7):
+            _submit(ledger, str(index), f"answer number{index} café")
+            self.assertEqual(search_index.sync(), 1)
+        self.assertEqual(search_index.sync(), 0)
+
+        # 7 submissions : segments of 4, 2 and 1 submissions
+        self.assertEqual([(segment[0], segment[1]) for segment in search_index._list_segments()],
+                         [(1, 4), (5, 6), (7, 7)])
+        self.assertEqual(len(search_index.search("cafe")), 7)
+        self.assertEqual([result["seq"] for result in search_index.search("number3")], [4])
+
+    def test_sync_without_ledger_files(self):
+        """Test that a sync raises and indexes nothing when the ledger files of the counted submissions are missing."""
+        submitted_dir = tempfile.mkdtemp()
+        ledger = SubmissionLedger(submitted_dir)
+        _submit(ledger, "1", "answer")
+        for file_name in os.listdir(submitted_dir):
+            if file_name.startswith("segment-"):
+                os.remove(os.path.join(submitted_dir, file_name))
+
+        with self.assertRaises(FileNotFoundError):
+            SubmissionsSearchIndex(submitted_dir).sync()